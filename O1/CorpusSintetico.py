@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import random
+from collections import Counter
+from xml.sax.saxutils import escape
+
+CARPETA = os.path.dirname(os.path.abspath(__file__))
+CORPUS_BILINGUE = os.path.join(CARPETA, 'corpora', 'corpus_bilingue.json')
+CORPUS_MONOLINGUE = os.path.join(CARPETA, 'corpora', 'corpus_monolingue.json')
+PALABRAS_POR_BLOQUE = 8     # Toolbox parte las glosas interlineales largas en varios bloques \tx/\mb/\ps/\gn
+
+def es_afijo(morfema):
+    return morfema[:1] in ('-', '=')
+
+def agrupar_palabras(mb, pos, gn):
+    """
+        Agrupa las columnas alineadas de un registro (morfema, POS, glosa) en palabras: un afijo (-x) o clítico (=x) se une a la palabra anterior.
+        Devuelve una lista de palabras; cada palabra es una tupla de (morfema, pos, glosa).
+    """
+    palabras = []
+    for columna in zip(mb, pos, gn):
+        if palabras and es_afijo(columna[0]):
+            palabras[-1] = palabras[-1] + (columna,)
+        else:
+            palabras.append((columna,))
+    return palabras
+
+def forma_superficial(palabra):
+    """
+        Forma escrita de una palabra a partir de sus morfemas (no=n -> non, kenti-hoko=bi -> kentihokobi).
+    """
+    return ''.join(morfema.lstrip('-=') for morfema, _, _ in palabra).replace('_', ' ')
+
+class ModeloCorpus:
+    """
+        Distribuciones observadas en los corpus de O1/corpora que usa el generador:
+        palabras analizadas (morfemas, POS y glosas), longitudes de las oraciones, hablantes,
+        registros por archivo, proporción de registros sin análisis morfológico y proporción de registros de ELAN.
+    """
+
+    def __init__(self, bilingue=CORPUS_BILINGUE, monolingue=CORPUS_MONOLINGUE):
+        self.palabras = []
+        self.sin_analisis = []
+        analizados = total = 0
+        with open(bilingue, encoding='utf-8') as f:
+            for line in f:
+                registro = json.loads(line)
+                total += 1
+                mb, pos, gn = (registro.get(c) or '' for c in ('morpheme_break', 'pos', 'gloss_es'))
+                mb, pos, gn = mb.split(), pos.split(), gn.split()
+                if mb and len(mb) == len(pos) == len(gn):
+                    self.palabras += agrupar_palabras(mb, pos, gn)
+                    analizados += 1
+                elif not mb:
+                    self.sin_analisis.append((registro['transcription'], registro.get('free_translation') or ''))
+
+        longitudes, hablantes, por_archivo = Counter(), Counter(), Counter()
+        with open(monolingue, encoding='utf-8') as f:
+            for line in f:
+                registro = json.loads(line)
+                longitudes[len(registro['transcription'].split())] += 1
+                hablantes[registro['speaker']] += 1
+                por_archivo[registro['file']] += 1
+        self.longitudes, self.pesos_longitud = zip(*longitudes.items())
+        self.hablantes, self.pesos_hablante = zip(*hablantes.items())
+        self.registros_por_archivo = max(1, round(sum(por_archivo.values()) / len(por_archivo)))
+        self.n_registros = sum(por_archivo.values())
+        # Proporción de registros (no de palabras): los registros con análisis desalineado también cuentan
+        self.n_analizados = analizados
+        self.proporcion_sin_analisis = len(self.sin_analisis) / (total or 1)
+        self.proporcion_eaf = sum(n for archivo, n in por_archivo.items() if archivo.endswith('.eaf')) / self.n_registros
+
+    def registro(self, rng):
+        """
+            Genera un registro: dict con transcription, morpheme_break, pos, gloss_es y free_translation
+            (las tres columnas interlineales vacías cuando el registro no tiene análisis).
+        """
+        if self.sin_analisis and rng.random() < self.proporcion_sin_analisis:
+            transcripcion, traduccion = rng.choice(self.sin_analisis)
+            return {'transcription': transcripcion, 'morpheme_break': [], 'pos': [], 'gloss_es': [],
+                    'free_translation': traduccion}
+
+        n = rng.choices(self.longitudes, self.pesos_longitud)[0]
+        palabras = [rng.choice(self.palabras) for _ in range(max(n, 1))]
+        morfemas = [columna for palabra in palabras for columna in palabra]
+        # Traducción libre aproximada: las glosas léxicas de las raíces (sin etiquetas gramaticales como 1SG)
+        traduccion = ' '.join(gn.replace('.', ' ') for mb, _, gn in morfemas if not es_afijo(mb) and not gn.isupper())
+        return {
+            'transcription': ' '.join(forma_superficial(palabra) for palabra in palabras),
+            'morpheme_break': [mb for mb, _, _ in morfemas],
+            'pos': [pos for _, pos, _ in morfemas],
+            'gloss_es': [gn for _, _, gn in morfemas],
+            'palabras': palabras,
+            'free_translation': traduccion,
+        }
+
+def alinear(palabras):
+    """
+        Líneas \\tx, \\mb, \\ps y \\gn de un bloque Toolbox, con las columnas alineadas como las escribe Toolbox.
+    """
+    tx, mb, ps, gn = [], [], [], []
+    for palabra in palabras:
+        anchos = [max(len(m), len(p), len(g)) + 1 for m, p, g in palabra]
+        mb += [m.ljust(a) for (m, _, _), a in zip(palabra, anchos)]
+        ps += [p.ljust(a) for (_, p, _), a in zip(palabra, anchos)]
+        gn += [g.ljust(a) for (_, _, g), a in zip(palabra, anchos)]
+        tx.append(forma_superficial(palabra).ljust(sum(anchos)))
+    return [f'\\tx {"".join(tx).rstrip()}', f'\\mb {"".join(mb).rstrip()}', f'\\ps {"".join(ps).rstrip()}',
+            f'\\gn {"".join(gn).rstrip()}']
+
+def escribirTxt(ruta, nombre, registros, hablante):
+    """
+        Escribe un texto interlineal de Toolbox con los registros dados.
+    """
+    with open(os.path.join(ruta, nombre), 'w', encoding='utf-8') as f:
+        f.write('\\_sh v3.0  400  Text\n\\_DateStampHasFourDigitYear\n\n\\id ' + nombre[:-4] + '\n')
+        for i, registro in enumerate(registros, 1):
+            f.write(f'\n\\ref {i:04d}\n\\ELANParticipant {hablante}\n\\trs {registro["transcription"]}\n')
+            palabras = registro.get('palabras') or []
+            if not palabras:
+                f.write(f'\\tx {registro["transcription"]}\n\n')
+            for inicio in range(0, len(palabras), PALABRAS_POR_BLOQUE):
+                f.write('\n'.join(alinear(palabras[inicio:inicio + PALABRAS_POR_BLOQUE])) + '\n\n')
+            f.write(f'\\ft {registro["free_translation"]}\n')
+
+def escribirEaf(ruta, nombre, registros, hablantes):
+    """
+        Escribe un documento ELAN (.eaf) con una transcripción (trs@), sus palabras (tx@), análisis
+        (mb@, ps@, gn@) y traducción libre (ft@) por hablante. Los registros se reparten entre los hablantes.
+    """
+    ids = iter(range(1, 10 ** 9))
+    tiempo = 0
+    slots, tiers = [], {}
+    for i, registro in enumerate(registros):
+        hablante = hablantes[i % len(hablantes)]
+        trs = f'a{next(ids)}'
+        slots.append((tiempo, tiempo + 1500 + 300 * len(registro['transcription'].split())))
+        tiempo = slots[-1][1] + 200
+        anotaciones = tiers.setdefault(hablante, {'trs': [], 'tx': [], 'mb': [], 'ps': [], 'gn': [], 'ft': []})
+        anotaciones['trs'].append((trs, len(slots), registro['transcription']))
+        tx = f'a{next(ids)}'
+        anotaciones['tx'].append((tx, trs, registro['transcription']))
+        if registro['morpheme_break']:
+            mb = f'a{next(ids)}'
+            anotaciones['mb'].append((mb, tx, ' '.join(registro['morpheme_break'])))
+            anotaciones['ps'].append((f'a{next(ids)}', mb, ' '.join(registro['pos'])))
+            anotaciones['gn'].append((f'a{next(ids)}', mb, ' '.join(registro['gloss_es'])))
+        anotaciones['ft'].append((f'a{next(ids)}', trs, registro['free_translation']))
+
+    lineas = ['<?xml version="1.0" encoding="UTF-8"?>',
+              '<ANNOTATION_DOCUMENT AUTHOR="" DATE="2013-01-01T00:00:00-05:00" FORMAT="3.0" VERSION="3.0">',
+              '    <HEADER MEDIA_FILE="" TIME_UNITS="milliseconds">',
+              '        <PROPERTY NAME="lastUsedAnnotationId">%d</PROPERTY>' % (next(ids) - 1),
+              '    </HEADER>',
+              '    <TIME_ORDER>']
+    for n, (inicio, fin) in enumerate(slots, 1):
+        lineas.append(f'        <TIME_SLOT TIME_SLOT_ID="ts{2 * n - 1}" TIME_VALUE="{inicio}"/>')
+        lineas.append(f'        <TIME_SLOT TIME_SLOT_ID="ts{2 * n}" TIME_VALUE="{fin}"/>')
+    lineas.append('    </TIME_ORDER>')
+
+    for hablante, anotaciones in tiers.items():
+        participante = escape(hablante, {'"': '&quot;'})
+        lineas.append(f'    <TIER LINGUISTIC_TYPE_REF="transcripcion" PARTICIPANT="{participante}" TIER_ID="trs@{participante}">')
+        for anotacion_id, n, valor in anotaciones['trs']:
+            lineas += ['        <ANNOTATION>',
+                       f'            <ALIGNABLE_ANNOTATION ANNOTATION_ID="{anotacion_id}" TIME_SLOT_REF1="ts{2 * n - 1}" TIME_SLOT_REF2="ts{2 * n}">',
+                       f'                <ANNOTATION_VALUE>{escape(valor)}</ANNOTATION_VALUE>',
+                       '            </ALIGNABLE_ANNOTATION>',
+                       '        </ANNOTATION>']
+        lineas.append('    </TIER>')
+        for tier, padre in (('tx', 'trs'), ('mb', 'tx'), ('ps', 'mb'), ('gn', 'mb'), ('ft', 'trs')):
+            lineas.append(f'    <TIER LINGUISTIC_TYPE_REF="{tier}" PARENT_REF="{padre}@{participante}" '
+                          f'PARTICIPANT="{participante}" TIER_ID="{tier}@{participante}">')
+            for anotacion_id, referencia, valor in anotaciones[tier]:
+                lineas += ['        <ANNOTATION>',
+                           f'            <REF_ANNOTATION ANNOTATION_ID="{anotacion_id}" ANNOTATION_REF="{referencia}">',
+                           f'                <ANNOTATION_VALUE>{escape(valor)}</ANNOTATION_VALUE>',
+                           '            </REF_ANNOTATION>',
+                           '        </ANNOTATION>']
+            lineas.append('    </TIER>')
+    lineas.append('</ANNOTATION_DOCUMENT>')
+
+    with open(os.path.join(ruta, nombre), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lineas) + '\n')
+
+def generarCorpus(ruta, escala=1.0, semilla=0, proporcion_eaf=None, modelo=None):
+    """
+        Genera una colección sintética de textos Toolbox (.txt) y documentos ELAN (.eaf) en `ruta`,
+        con `escala` veces el número de registros de los corpus de O1/corpora.
+        El vocabulario, las etiquetas POS, los patrones de morfemas, las longitudes y los hablantes se
+        muestrean de esos corpus. La misma semilla produce siempre los mismos archivos.
+        Devuelve un dict con el número de archivos y de registros escritos.
+    """
+    modelo = modelo or ModeloCorpus()
+    rng = random.Random(semilla)
+    if proporcion_eaf is None:
+        proporcion_eaf = modelo.proporcion_eaf
+    os.makedirs(ruta, exist_ok=True)
+
+    total = max(1, round(modelo.n_registros * escala))
+    n_archivos = max(1, round(total / modelo.registros_por_archivo))
+    resumen = {'txt': 0, 'eaf': 0, 'registros': total, 'escala': escala, 'semilla': semilla}
+    for n in range(n_archivos):
+        inicio, fin = n * total // n_archivos, (n + 1) * total // n_archivos
+        registros = [modelo.registro(rng) for _ in range(fin - inicio)]
+        if rng.random() < proporcion_eaf:
+            hablantes = list(dict.fromkeys(rng.choices(modelo.hablantes, modelo.pesos_hablante, k=2)))
+            escribirEaf(ruta, f'SINT-{n:05d}.eaf', registros, hablantes)
+            resumen['eaf'] += 1
+        else:
+            escribirTxt(ruta, f'SINT-{n:05d}.txt', registros, rng.choices(modelo.hablantes, modelo.pesos_hablante)[0])
+            resumen['txt'] += 1
+
+    with open(os.path.join(ruta, 'sintetico.json'), 'w', encoding='utf-8') as f:
+        json.dump(resumen, f)
+    return resumen
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético de textos Toolbox y documentos ELAN.")
+    parser.add_argument('ruta', help="Carpeta de salida")
+    parser.add_argument('--escala', type=float, default=1.0, help="Múltiplo del tamaño de los corpus de O1/corpora")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--proporcion-eaf', type=float, help="Proporción de archivos .eaf")
+    args = parser.parse_args()
+
+    resumen = generarCorpus(args.ruta, args.escala, args.semilla, args.proporcion_eaf)
+    print(f"{resumen['registros']} registros en {resumen['txt']} archivos .txt y {resumen['eaf']} archivos .eaf")
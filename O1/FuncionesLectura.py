@@ -1,7 +1,8 @@
 import os
 import re
-import pandas as pd
-from langdetect import detect
+from contextlib import nullcontext
+from types import SimpleNamespace
+# pandas y langdetect se importan dentro de las funciones que los usan: importarlos tarda segundos
 
 def procesarOracion(bloque):
     """
@@ -204,65 +205,80 @@ def clean_text(text):
     """
     return re.sub(r'\(\d\)', '', text).strip()
 
+# Campos del diccionario Toolbox (SFM) que se conservan: marcador -> columna
+CAMPOS_LEXICON = {
+    'lx': 'lex_isc',
+    'lc': 'lex_citation',
+    'ps': 'pos',
+    'gn': 'gloss_es',
+    'rn': 'gloss_es',
+    'dn': 'def_es',
+}
+COLUMNAS_LEXICON = ['lex_isc', 'lex_citation', 'pos', 'gloss_es', 'def_es']
+# Columnas que se repiten en cada acepción (\\sn) de una entrada
+COLUMNAS_ACEPCION = ('gloss_es', 'def_es')
+
+def iter_lexicon(file, encoding='utf-8'):
+    """
+        Lee un diccionario Toolbox (SFM) línea por línea y devuelve una entrada (dict) por cada \\lx.
+        Como en el parse_txt original, se conserva el primer valor de cada columna; las líneas sin marcador
+        continúan el campo anterior. La lista 'senses' guarda la glosa y la definición de cada acepción:
+        una acepción nueva empieza en \\sn o cuando se repite una glosa o una definición.
+    """
+    entry = None
+    column = None
+    value = []
+
+    def guardar():
+        if entry is None or not column:
+            return
+        texto = ' '.join(value).strip()
+        if column in ('lex_isc', 'lex_citation'):
+            texto = clean_text(texto)
+        if column in COLUMNAS_ACEPCION:
+            acepciones = entry['senses']
+            if not acepciones or column in acepciones[-1]:
+                acepciones.append({})
+            acepciones[-1][column] = texto
+        entry.setdefault(column, texto)
+
+    def terminar():
+        entry['senses'] = [acepcion for acepcion in entry['senses'] if acepcion]
+        return entry
+
+    with open(file, 'r', encoding=encoding) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            marker_match = re.match(r'^\\(\S+)\s*(.*)$', line)
+            if marker_match is None:
+                # Continuación del campo actual
+                if column:
+                    value.append(line)
+                continue
+
+            guardar()
+            marker, texto = marker_match.groups()
+            if marker == 'lx':
+                if entry:
+                    yield terminar()
+                entry = {'senses': []}
+            elif marker == 'sn' and entry is not None and entry['senses'] and entry['senses'][-1]:
+                entry['senses'].append({})
+            column = CAMPOS_LEXICON.get(marker)
+            value = [texto]
+
+    guardar()
+    if entry:
+        yield terminar()
+
 def parse_txt(file):
     """
         Function created by Amy Trujillo (@amyyy09)
     """
-    data = []
-    with open(file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-        
-    current_entry = {}
-    current_tag = None
-    current_value = []
-
-    for line in lines:
-        line = line.strip()
-        if line.startswith('\\lx'):
-            if current_entry:
-                if current_tag:
-                    current_entry[current_tag] = ' '.join(current_value).strip()
-                data.append(current_entry)
-            current_entry = {'lex_isc': clean_text(line.strip('\\lx').strip())}
-            current_tag = None
-            current_value = []
-        elif line.startswith('\\lc'):
-            current_entry['lex_citation'] = clean_text(line.strip('\\lc').strip())
-            current_tag = None
-            current_value = []
-        elif line.startswith('\\ps'):
-            current_entry['pos'] = line.strip('\\ps').strip()
-            current_tag = None
-        elif line.startswith('\\gn') and 'gloss_es' not in current_entry:
-            if current_tag:
-                current_entry[current_tag] = ' '.join(current_value).strip()
-            current_tag = 'gloss_es'
-            current_value = [line.strip('\\gn').strip()]
-        elif line.startswith('\\rn') and 'gloss_es' not in current_entry:
-            if current_tag:
-                current_entry[current_tag] = ' '.join(current_value).strip()
-            current_tag = 'gloss_es'
-            current_value = [line.strip('\\rn').strip()]
-        elif line.startswith('\\dn') and 'def_es' not in current_entry:
-            if current_tag:
-                current_entry[current_tag] = ' '.join(current_value).strip()
-            current_tag = 'def_es'
-            current_value = [line.strip('\\dn').strip()]
-        elif line.startswith('\\'):
-            if current_tag:
-                current_entry[current_tag] = ' '.join(current_value).strip()
-            current_tag = None
-        else:
-            if current_tag:
-                current_value.append(line)
-
-    if current_entry:
-        if current_tag:
-            current_entry[current_tag] = ' '.join(current_value).strip()
-        data.append(current_entry)
-    
-    df = pd.DataFrame(data, columns=['lex_isc', 'lex_citation', 'pos', 'gloss_es', 'def_es'])
-    return df
+    import pandas as pd
+    return pd.DataFrame(list(iter_lexicon(file)), columns=COLUMNAS_LEXICON)
 
 
 
@@ -270,43 +286,67 @@ def is_spanish(text):
     """
         Function created by Harvy Martínez (@xnehil)
     """
+    from langdetect import detect
     try:
         return detect(text) == 'es'
     except:
         return False
     
-def leerCorpus(ruta="../textos", limpiar=True):
+def etapa(profiler, nombre, filas=None):
+    """
+        Etapa medida por un perfilador (O2/R4/profiling.py, StageProfiler); sin perfilador no hace nada.
+    """
+    if profiler is None:
+        return nullcontext(SimpleNamespace(rows_in=filas, rows_out=None))
+    return profiler.stage(nombre, rows_in=filas)
+
+def leerCorpus(ruta="../textos", limpiar=True, profiler=None):
     """
         Function created by Harvy Martínez (@xnehil)
     """
+    import pandas as pd
     data = {}
-    leerTxt(ruta=ruta, data=data)
-    leerEaf(ruta=ruta, data=data)
-    df = pd.DataFrame(data).transpose().reset_index(drop=True)
+    with etapa(profiler, 'leerTxt') as e:
+        leerTxt(ruta=ruta, data=data)
+        e.rows_out = len(data)
+    with etapa(profiler, 'leerEaf', len(data)) as e:
+        leerEaf(ruta=ruta, data=data)
+        e.rows_out = len(data)
+    with etapa(profiler, 'DataFrame', len(data)) as e:
+        df = pd.DataFrame(data).transpose().reset_index(drop=True)
+        e.rows_out = len(df)
     #Limpiar 
     if limpiar:
         print(f"Antes de limpiar: {df.shape}")
-        df = df[~df['transcription'].apply(is_spanish)]
+        with etapa(profiler, 'is_spanish', len(df)) as e:
+            df = df[~df['transcription'].apply(is_spanish)]
+            e.rows_out = len(df)
         print(f"Después de limpiar: {df.shape}")
         df = df[df['transcription'].str.strip() != '']
         
-    #Cualquier campo vacío o cadena vacía debe ser null
-    df = df.replace('', None)
-    df = df.replace('\\mb', None)
-    #Eliminar filas con None en id, speaker, transcription, free_translation, file
-    df = df.dropna(subset=['id', 'speaker', 'transcription', 'free_translation', 'file'])
-    print(f"Después de limpiar: {df.shape}")
-    #Id debe ser file sin la extensión seguido de un guión y el id
-    df['id'] = df['file'].str.replace('.txt' or '.eaf', '', regex=False) + '_' + df['id'].astype(str)
+    with etapa(profiler, 'limpieza', len(df)) as e:
+        #Cualquier campo vacío o cadena vacía debe ser null
+        df = df.replace('', None)
+        df = df.replace('\\mb', None)
+        #Eliminar filas con None en id, speaker, transcription, free_translation, file
+        df = df.dropna(subset=['id', 'speaker', 'transcription', 'free_translation', 'file'])
+        print(f"Después de limpiar: {df.shape}")
+        #Id debe ser file sin la extensión seguido de un guión y el id
+        df['id'] = df['file'].str.replace('.txt' or '.eaf', '', regex=False) + '_' + df['id'].astype(str)
 
-    df = df[['id', 'speaker', 'transcription', 'text', 'morpheme_break', 'pos', 'gloss_es', 'free_translation', 'file']]
+        df = df[['id', 'speaker', 'transcription', 'text', 'morpheme_break', 'pos', 'gloss_es', 'free_translation', 'file']]
+        e.rows_out = len(df)
 
     # Estándarizar las etiquetas POS
-    df = standardize_pos_tag(df)
+    with etapa(profiler, 'standardize_pos_tag', len(df)) as e:
+        df = standardize_pos_tag(df)
+        e.rows_out = len(df)
 
     df_monolingual = df[['id', 'speaker', 'transcription', 'morpheme_break', 'pos', 'file']]
 
-    df_bilingual = get_bilingual(df)
+    with etapa(profiler, 'get_bilingual', len(df)) as e:
+        df_bilingual = get_bilingual(df)
+        e.rows_out = len(df_bilingual)
 
     return df_monolingual, df_bilingual
 
@@ -0,0 +1,165 @@
+import argparse
+import gc
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+from estructura import MultilingualCorpus
+from profiling import StageProfiler
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+LECTURA_FOLDER = THIS_FOLDER.parents[1] / "O1"
+COLUMNS = ("id", "speaker", "transcription", "morpheme_break", "pos", "gloss_es", "free_translation", "file")
+
+
+def _lectura():
+    """Import the O1 readers and the synthetic corpus generator."""
+    if str(LECTURA_FOLDER) not in sys.path:
+        sys.path.append(str(LECTURA_FOLDER))
+    import CorpusSintetico
+    import FuncionesLectura
+    return CorpusSintetico, FuncionesLectura
+
+
+def prepare(folder, scale, seed=0):
+    """
+    Generate the synthetic collection of a scale, unless it was already generated with the same seed.
+
+    Args:
+        folder (Path): Folder of the collection.
+        scale (float): Multiple of the size of the O1/corpora corpora.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        dict: Summary of the collection (files, records, scale, seed).
+    """
+    CorpusSintetico, _ = _lectura()
+    summary_path = folder / "sintetico.json"
+    if summary_path.is_file():
+        with open(summary_path, "r", encoding="utf-8") as f:
+            summary = json.load(f)
+        if summary["escala"] == scale and summary["semilla"] == seed:
+            return summary
+    for path in folder.glob("SINT-*"):
+        path.unlink()
+    return CorpusSintetico.generarCorpus(str(folder), scale, seed)
+
+
+def write_records(data, path):
+    """Write the records read by leerTxt/leerEaf as the JSON Lines file Corpus.read expects."""
+    with open(path, "w", encoding="utf-8") as f:
+        for record in data.values():
+            f.write(json.dumps({column: record.get(column) or None for column in COLUMNS}, ensure_ascii=False) + "\n")
+
+
+def run_scale(folder, profiler, leer_corpus=False):
+    """
+    Run the ingestion pipeline over a synthetic collection, one profiler stage per step.
+
+    Stages: leerTxt, leerEaf, MultilingualCorpus.read, MultilingualCorpus.clean, process_words,
+    and optionally the whole leerCorpus (needs pandas and langdetect).
+
+    Args:
+        folder (Path): Folder of the collection.
+        profiler (StageProfiler): The profiler.
+        leer_corpus (bool, optional): Whether to also run leerCorpus. Defaults to False.
+    """
+    _, FuncionesLectura = _lectura()
+    data = {}
+    with profiler.stage("leerTxt") as stage:
+        FuncionesLectura.leerTxt(ruta=str(folder), data=data)
+        stage.rows_out = len(data)
+    with profiler.stage("leerEaf") as stage:
+        eaf_data = {}
+        FuncionesLectura.leerEaf(ruta=str(folder), data=eaf_data)
+        stage.rows_out = len(eaf_data)
+    data.update(eaf_data)
+
+    records_path = folder / "records.json"
+    write_records(data, records_path)
+    del data
+    gc.collect()
+
+    corpus = MultilingualCorpus(root_directory=str(folder), text_column="transcription", file_column="file",
+                                pos_column="pos", mb_column="morpheme_break", id_column="id", languages=["es"],
+                                gloss_columns={"es": "gloss_es"}, ft_columns={"es": "free_translation"},
+                                speaker_column="speaker")
+    corpus.read(str(records_path), profiler=profiler)
+    corpus.clean(profiler=profiler)
+    del corpus
+    gc.collect()
+
+    if leer_corpus:
+        with profiler.stage("leerCorpus") as stage:
+            _, df_bilingual = FuncionesLectura.leerCorpus(ruta=str(folder), limpiar=False, profiler=profiler)
+            stage.rows_out = len(df_bilingual)
+
+
+def summarize(profiler):
+    """
+    Throughput and peak memory of every stage of a run.
+
+    Returns:
+        list: One dict per stage, in the order the stages finished.
+    """
+    stages = []
+    for record in profiler.records:
+        rows = record.rows_in if record.rows_in is not None else record.rows_out
+        stages.append({
+            "stage": "/".join(record.path),
+            "wall_seconds": round(record.wall, 4),
+            "cpu_seconds": round(record.cpu, 4),
+            "rows_in": record.rows_in,
+            "rows_out": record.rows_out,
+            "records_per_second": round(rows / record.wall) if rows and record.wall else None,
+            "memory_peak_mb": round(record.memory_peak / 2 ** 20, 2) if record.memory_peak is not None else None,
+        })
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every ingestion stage on synthetic corpora of growing size.")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated multiples of the O1/corpora size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", help="Where the synthetic collections are kept (default: a temporary folder)")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--trace", help="Write a Chrome trace of every run to this file prefix (<prefix>-<scale>x.json)")
+    parser.add_argument("--leer-corpus", action="store_true", help="Also run leerCorpus (needs pandas and langdetect)")
+    parser.add_argument("--no-memory", action="store_true", help="Do not trace memory (tracemalloc slows the stages down)")
+    args = parser.parse_args()
+
+    work_dir = Path(args.work_dir or tempfile.mkdtemp(prefix="corpus-benchmark-"))
+    report = {"seed": args.seed, "scales": {}}
+    for scale in [float(s) for s in args.scales.split(",")]:
+        folder = work_dir / f"{scale:g}x"
+        folder.mkdir(parents=True, exist_ok=True)
+        summary = prepare(folder, scale, args.seed)
+        size = sum(path.stat().st_size for path in folder.glob("SINT-*"))
+
+        with StageProfiler(trace_memory=not args.no_memory) as profiler:
+            run_scale(folder, profiler, leer_corpus=args.leer_corpus)
+        if args.trace:
+            profiler.save_trace(f"{args.trace}-{scale:g}x.json")
+
+        stages = summarize(profiler)
+        report["scales"][f"{scale:g}"] = {"records": summary["registros"], "txt_files": summary["txt"],
+                                          "eaf_files": summary["eaf"], "bytes": size, "stages": stages}
+        print(f"\n{scale:g}x: {summary['registros']} records, {summary['txt'] + summary['eaf']} files, "
+              f"{size / 2 ** 20:.1f} MB")
+        print(f"{'stage':<45} {'wall s':>8} {'cpu s':>8} {'rows':>9} {'rec/s':>10} {'peak MB':>8}")
+        for stage in stages:
+            rows = stage["rows_in"] if stage["rows_in"] is not None else stage["rows_out"]
+            print(f"{stage['stage']:<45} {stage['wall_seconds']:>8.3f} {stage['cpu_seconds']:>8.3f} "
+                  f"{rows if rows is not None else '-':>9} {stage['records_per_second'] or '-':>10} "
+                  f"{stage['memory_peak_mb'] if stage['memory_peak_mb'] is not None else '-':>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if not args.work_dir:
+        print(f"\nSynthetic corpora kept in {work_dir}")
+
+
+if __name__ == "__main__":
+    main()
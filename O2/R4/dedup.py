@@ -0,0 +1,252 @@
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def normalize_text(text):
+    """
+    Lowercase a text, drop punctuation and accents and collapse whitespace.
+
+    Punctuation is dropped as Corpus.clean does; accents are folded too, since re-transcriptions
+    of an utterance often differ only in them (ishon / ishón).
+    """
+    text = unicodedata.normalize("NFKD", (text or '').lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r'[^\w\s]', '', text)
+    return " ".join(text.split())
+
+
+def shingles(text, size=3):
+    """
+    Character shingles of a normalized text, padded with a space on both sides.
+
+    The padding gives the first and last characters as many shingles as the others, so an edit at
+    either end of a short utterance weighs as much as one in the middle.
+
+    Args:
+        text (str): Normalized text.
+        size (int, optional): Shingle length. Defaults to 3.
+
+    Returns:
+        set: The shingles; an empty text has none.
+    """
+    if not text:
+        return set()
+    text = f" {text} "
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def deletion_keys(text):
+    """The text and every string obtained by deleting one of its characters."""
+    return {text} | {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+def within_one_edit(a, b):
+    """Whether two strings are at most one insertion, deletion or substitution apart."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_bands(threshold, num_perm):
+    """
+    Choose the number of LSH bands for a similarity threshold.
+
+    Two signatures collide in some band with probability 1 - (1 - s^r)^b, which rises steeply around
+    s = (1 / b)^(1 / r). The banding whose midpoint is the closest below the threshold is used, so
+    recall is favoured; candidates are verified with the exact Jaccard similarity afterwards.
+
+    Args:
+        threshold (float): Jaccard similarity threshold.
+        num_perm (int): Signature length.
+
+    Returns:
+        tuple: (bands, rows) with bands * rows == num_perm.
+    """
+    options = [(bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0]
+    below = [option for option in options if (1 / option[0]) ** (1 / option[1]) <= threshold]
+    return max(below or options, key=lambda option: (1 / option[0]) ** (1 / option[1]))
+
+
+class MinHasher:
+    """
+    MinHash signatures of shingle sets.
+
+    Shingles are hashed with CRC32, so signatures are stable across runs and processes, and the
+    `num_perm` universal hash functions are applied to all the shingles of a text at once.
+
+    Attributes:
+        num_perm (int): Signature length.
+        a (np.ndarray): Multipliers of the hash functions.
+        b (np.ndarray): Offsets of the hash functions.
+    """
+
+    def __init__(self, num_perm=128, seed=1):
+        """
+        Initializes a MinHasher instance.
+
+        Args:
+            num_perm (int, optional): Signature length. Defaults to 128.
+            seed (int, optional): Seed of the hash functions. Defaults to 1.
+        """
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        # Multipliers below 2^32 keep a * hash inside 64 bits
+        self.a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingle_set):
+        """
+        MinHash signature of a shingle set.
+
+        Args:
+            shingle_set (set): Shingles.
+
+        Returns:
+            np.ndarray: uint32 array of length num_perm; an empty set gets the maximum value everywhere.
+        """
+        if not shingle_set:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64,
+                             count=len(shingle_set))
+        values = (hashes[:, None] * self.a + self.b) % MERSENNE_PRIME & MAX_HASH
+        return values.min(axis=0).astype(np.uint32)
+
+
+def near_duplicate_clusters(texts, threshold=0.8, num_perm=128, shingle_size=3, single_edits=True,
+                            min_edit_length=6, seed=1):
+    """
+    Group texts that are re-transcriptions of each other.
+
+    Texts are normalized first (case, punctuation, accents), and texts that become identical are
+    merged directly. Texts that are one character edit apart are then found exactly through shared
+    single-deletion keys, which catches short utterances whose shingle overlap is too small for a
+    fixed threshold. Finally MinHash signatures are split into LSH bands; within every band bucket
+    each text is compared with the bucket's first text only, and linked if their exact Jaccard
+    similarity reaches the threshold. Linked texts are merged transitively (union-find), so a
+    cluster can chain re-transcriptions of one utterance.
+
+    Args:
+        texts (list): Texts, e.g. the transcriptions of a corpus.
+        threshold (float, optional): Jaccard similarity threshold of the shingle sets. Defaults to 0.8.
+        num_perm (int, optional): MinHash signature length. Defaults to 128.
+        shingle_size (int, optional): Character shingle length. Defaults to 3.
+        single_edits (bool, optional): Whether texts one character edit apart are near-duplicates. Defaults to True.
+        min_edit_length (int, optional): Minimum normalized length for the single-edit rule, so that
+            distinct short words (iki / ika) are not merged. Defaults to 6.
+        seed (int, optional): Seed of the hash functions. Defaults to 1.
+
+    Returns:
+        list: Clusters of two or more text indices, each sorted, ordered by their first index.
+    """
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        parent[find(j)] = find(i)
+
+    # Identical normalized texts: one representative each
+    normalized = [normalize_text(text) for text in texts]
+    first = {}
+    for i, text in enumerate(normalized):
+        if text:
+            union(first.setdefault(text, i), i)
+    unique = list(first.values())
+
+    if single_edits:
+        by_key = {}
+        for i in unique:
+            # A deletion can take a text of min_edit_length one character below it
+            if len(normalized[i]) >= min_edit_length - 1:
+                for key in deletion_keys(normalized[i]):
+                    by_key.setdefault(key, []).append(i)
+        for members in by_key.values():
+            head = normalized[members[0]]
+            for j in members[1:]:
+                if (find(j) != find(members[0]) and max(len(head), len(normalized[j])) >= min_edit_length
+                        and within_one_edit(head, normalized[j])):
+                    union(members[0], j)
+
+    hasher = MinHasher(num_perm, seed)
+    sets = [shingles(normalized[i], shingle_size) for i in unique]
+    signatures = np.array([hasher.signature(s) for s in sets], dtype=np.uint32).reshape(len(unique), num_perm)
+    bands, rows = lsh_bands(threshold, num_perm)
+    for band in range(bands):
+        buckets = {}
+        for position, key in enumerate(signatures[:, band * rows:(band + 1) * rows]):
+            buckets.setdefault(key.tobytes(), []).append(position)
+        for members in buckets.values():
+            head = members[0]
+            for position in members[1:]:
+                if find(unique[position]) != find(unique[head]) and jaccard(sets[head], sets[position]) >= threshold:
+                    union(unique[head], unique[position])
+
+    clusters = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted((members for members in clusters.values() if len(members) > 1), key=lambda members: members[0])
+
+
+def keep_one(n_items, clusters):
+    """
+    Indices that remain after collapsing each cluster to its first member.
+
+    Args:
+        n_items (int): Number of items.
+        clusters (list): Clusters as returned by near_duplicate_clusters.
+
+    Returns:
+        list: Sorted indices to keep.
+    """
+    dropped = {i for members in clusters for i in members[1:]}
+    return [i for i in range(n_items) if i not in dropped]
+
+
+def cross_duplicates(train_texts, test_texts, threshold=0.8, **kwargs):
+    """
+    Test texts that are near-duplicates of some training text.
+
+    Use it to drop leaked sentences from an evaluation split before training embeddings or
+    evaluating BDI.
+
+    Args:
+        train_texts (list): Training texts.
+        test_texts (list): Test texts.
+        threshold (float, optional): Jaccard similarity threshold. Defaults to 0.8.
+        **kwargs: Passed to near_duplicate_clusters.
+
+    Returns:
+        list: Sorted indices into test_texts.
+    """
+    n_train = len(train_texts)
+    leaked = set()
+    for members in near_duplicate_clusters(list(train_texts) + list(test_texts), threshold, **kwargs):
+        if members[0] < n_train:
+            leaked.update(i - n_train for i in members if i >= n_train)
+    return sorted(leaked)
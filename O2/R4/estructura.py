@@ -2,6 +2,15 @@ import os
 import uuid
 import json
 import re
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+
+def _stage(profiler, name, rows_in=None):
+    """Stage of a profiler (see profiling.StageProfiler), or a no-op context when profiling is off."""
+    if profiler is None:
+        return nullcontext(SimpleNamespace(rows_in=rows_in, rows_out=None))
+    return profiler.stage(name, rows_in=rows_in)
 
 class CorpusEntry:
     """
@@ -12,9 +21,10 @@ class CorpusEntry:
         text (str): The text of the corpus entry.
         words (list): A list of WordEntry objects associated with the corpus entry.
         id (str): A unique identifier for the corpus entry.
+        speaker (str): The speaker of the corpus entry, if known.
     """
 
-    def __init__(self, file, text, words=None, entry_id=None):
+    def __init__(self, file, text, words=None, entry_id=None, speaker=None):
         """
         Initializes a CorpusEntry instance.
 
@@ -23,11 +33,13 @@ class CorpusEntry:
             text (str): The text of the corpus entry.
             words (list, optional): A list of WordEntry objects. Defaults to an empty list if not provided.
             entry_id (str, optional): A unique identifier for the corpus entry. Defaults to a new UUID if not provided.
+            speaker (str, optional): The speaker of the corpus entry. Defaults to None.
         """
         self.file = file
         self.text = text
         self.words = words if words is not None else []
         self.id = entry_id if entry_id else str(uuid.uuid4())
+        self.speaker = speaker
 
     def __str__(self):
         """
@@ -169,10 +181,11 @@ class Corpus:
         pos_column (str): The column name for the part-of-speech tags in the JSON file.
         mb_column (str): The column name for the morpheme breaks in the JSON file.
         id_column (str): The column name for the entry ID in the JSON file.
+        speaker_column (str): The column name for the speaker in the JSON file.
     """
 
     def __init__(self, root_directory, link=None, encoding="utf-8", lengua_principal=None, n_entries=0, text_column=None, 
-                 file_column=None, pos_column=None, mb_column=None, id_column=None):
+                 file_column=None, pos_column=None, mb_column=None, id_column=None, speaker_column=None):
         """
         Initializes a Corpus instance.
 
@@ -187,6 +200,7 @@ class Corpus:
             pos_column (str, optional): The column name for the part-of-speech tags in the JSON file. Defaults to None.
             mb_column (str, optional): The column name for the morpheme breaks in the JSON file. Defaults to None.
             id_column (str, optional): The column name for the entry ID in the JSON file. Defaults to None.
+            speaker_column (str, optional): The column name for the speaker in the JSON file. Defaults to None.
         """
         self.root_directory = root_directory
         self.link = link
@@ -199,6 +213,7 @@ class Corpus:
         self.pos_column = pos_column
         self.mb_column = mb_column
         self.id_column = id_column
+        self.speaker_column = speaker_column
 
     def __str__(self):
         """
@@ -234,14 +249,16 @@ class Corpus:
         self.entries.append(entry)
         self.n_entries += 1
 
-    def read(self, file):
+    def read(self, file, profiler=None):
         """
         Reads entries from a JSON file and adds them to the corpus.
 
         Args:
             file (str): The path to the JSON file.
+            profiler (StageProfiler, optional): Profiler that records the stage. Defaults to None.
         """
-        with open(file, 'r', encoding=self.encoding) as f:
+        n_entries = self.n_entries
+        with _stage(profiler, f"{type(self).__name__}.read") as stage, open(file, 'r', encoding=self.encoding) as f:
             for line in f:
                 item = json.loads(line.strip())
                 text = item.get(self.text_column)
@@ -249,16 +266,18 @@ class Corpus:
                 pos = item.get(self.pos_column) if self.pos_column else None
                 mb = item.get(self.mb_column) if self.mb_column else None
                 entry_id = item.get(self.id_column) if self.id_column else None
+                speaker = item.get(self.speaker_column) if self.speaker_column else None
 
                 # Create a single WordEntry with the entire text, mb, and pos
                 word_entry = WordEntry(word=text, mb=mb, pos=pos)
                 words = [word_entry]
 
                 # Create a CorpusEntry and add it to the corpus
-                corpus_entry = CorpusEntry(file=file, text=text, words=words, entry_id=entry_id)
+                corpus_entry = CorpusEntry(file=file, text=text, words=words, entry_id=entry_id, speaker=speaker)
                 self.add_entry(corpus_entry)
+            stage.rows_out = self.n_entries - n_entries
 
-    def clean(self, process_words=True, remove_duplicates=True, min_length=1):
+    def clean(self, process_words=True, remove_duplicates=True, min_length=1, profiler=None):
         """
         Cleans the corpus by removing entries with words shorter than the minimum length and optionally removing duplicates.
 
@@ -266,7 +285,21 @@ class Corpus:
             process_words (bool, optional): Whether to process the words in each entry. Defaults to True.
             remove_duplicates (bool, optional): Whether to remove duplicate entries. Defaults to True.
             min_length (int, optional): The minimum length of words to keep in the corpus. Defaults to 1.
+            profiler (StageProfiler, optional): Profiler that records the cleaning and word processing stages. Defaults to None.
         """
+        with _stage(profiler, f"{type(self).__name__}.clean", rows_in=len(self.entries)) as stage:
+            self._clean_entries(remove_duplicates, min_length)
+            stage.rows_out = len(self.entries)
+
+        # Process the words in each entry if required
+        if process_words:
+            with _stage(profiler, "process_words", rows_in=len(self.entries)) as stage:
+                for entry in self.entries:
+                    entry.process_words()
+                stage.rows_out = sum(len(entry.words) for entry in self.entries)
+
+    def _clean_entries(self, remove_duplicates, min_length):
+        """Normalizes the entry texts, dropping the entries shorter than min_length and optionally the duplicates."""
         unique_texts = set()
         unique_entries = []
 
@@ -298,11 +331,98 @@ class Corpus:
         if remove_duplicates:
             self.entries = unique_entries
 
-        # Process the words in each entry if required
-        if process_words:
-            for entry in self.entries:
-                entry.process_words()
-            
+    def find_near_duplicates(self, threshold=0.8, num_perm=128, shingle_size=3):
+        """
+        Finds clusters of entries whose texts are near-duplicates (identical after normalization, one character
+        edit apart, or similar character shingles by MinHash/LSH).
+
+        Args:
+            threshold (float, optional): Jaccard similarity of the character shingles. Defaults to 0.8.
+            num_perm (int, optional): MinHash signature length. Defaults to 128.
+            shingle_size (int, optional): Character shingle length. Defaults to 3.
+
+        Returns:
+            list: Clusters of two or more CorpusEntry objects, in corpus order.
+        """
+        from dedup import near_duplicate_clusters
+
+        clusters = near_duplicate_clusters([entry.text for entry in self.entries], threshold=threshold,
+                                           num_perm=num_perm, shingle_size=shingle_size)
+        return [[self.entries[i] for i in members] for members in clusters]
+
+    def remove_near_duplicates(self, threshold=0.8, num_perm=128, shingle_size=3):
+        """
+        Keeps only the first entry of every cluster of near-duplicates.
+
+        Args:
+            threshold (float, optional): Jaccard similarity of the character shingles. Defaults to 0.8.
+            num_perm (int, optional): MinHash signature length. Defaults to 128.
+            shingle_size (int, optional): Character shingle length. Defaults to 3.
+
+        Returns:
+            list: The clusters that were collapsed, as lists of CorpusEntry objects.
+        """
+        clusters = self.find_near_duplicates(threshold, num_perm, shingle_size)
+        dropped = {id(entry) for members in clusters for entry in members[1:]}
+        self.entries = [entry for entry in self.entries if id(entry) not in dropped]
+        self.n_entries = len(self.entries)
+        return clusters
+
+
+    def statistics(self, processes=None, shard_size=2000, cache_dir=None, use_cache=True):
+        """
+        Computes morpheme, POS tag and tag-bigram frequencies, gloss coverage and per-file/per-speaker counts.
+
+        Args:
+            processes (int, optional): Worker processes; 1 counts in this process. Defaults to the number of CPUs.
+            shard_size (int, optional): Entries per shard. Defaults to 2000.
+            cache_dir (str, optional): Cache directory. Defaults to ".stats_cache" in the root directory.
+            use_cache (bool, optional): Whether to read and write the cache. Defaults to True.
+
+        Returns:
+            CorpusStatistics: The statistics (see stats.py).
+        """
+        from stats import compute_statistics
+
+        return compute_statistics(self, processes=processes, shard_size=shard_size, cache_dir=cache_dir,
+                                  use_cache=use_cache)
+
+    def sentences(self, segmenter=None):
+        """
+        Returns a restartable iterable over the tokenized (and optionally segmented) entries.
+
+        Args:
+            segmenter (optional): None for whitespace tokens, or a segmenter (see CorpusSentences).
+
+        Returns:
+            CorpusSentences: Iterable of token lists, one per entry, that can be iterated several times.
+        """
+        return CorpusSentences(self, segmenter)
+
+    def export_corpus_file(self, output_path, segmenter=None):
+        """
+        Writes the entries in gensim's corpus_file (LineSentence) format in one streaming pass.
+
+        Each entry becomes one line of space-separated tokens; entries without tokens are skipped.
+        The file is written next to its destination and moved into place when complete.
+
+        Args:
+            output_path (str): The path of the output file.
+            segmenter (optional): None for whitespace tokens, or a segmenter (see CorpusSentences).
+
+        Returns:
+            int: The number of lines written.
+        """
+        tmp_path = f"{output_path}.tmp"
+        n_lines = 0
+        with open(tmp_path, 'w', encoding=self.encoding) as f:
+            for tokens in self.sentences(segmenter):
+                if tokens:
+                    f.write(" ".join(tokens) + "\n")
+                    n_lines += 1
+        os.replace(tmp_path, output_path)
+        return n_lines
+
 
 class MultilingualCorpus(Corpus):
     """
@@ -319,6 +439,7 @@ class MultilingualCorpus(Corpus):
         pos_column (str): The column name for the part-of-speech tags in the JSON file.
         mb_column (str): The column name for the morpheme breaks in the JSON file.
         id_column (str): The column name for the entry ID in the JSON file.
+        speaker_column (str): The column name for the speaker in the JSON file.
         languages (list): A list of languages in the multilingual corpus.
         gloss_columns (dict): A dictionary mapping languages to their gloss column names.
         ft_columns (dict): A dictionary mapping languages to their free translation column names.
@@ -326,7 +447,7 @@ class MultilingualCorpus(Corpus):
 
     def __init__(self, root_directory, link=None, encoding="utf-8", lengua_principal=None, n_entries=0, text_column=None, 
                  file_column=None, pos_column=None, mb_column=None, id_column=None, languages=None, 
-                 gloss_columns=None, ft_columns=None):
+                 gloss_columns=None, ft_columns=None, speaker_column=None):
         """
         Initializes a MultilingualCorpus instance.
 
@@ -344,9 +465,10 @@ class MultilingualCorpus(Corpus):
             languages (list, optional): A list of languages in the multilingual corpus. Defaults to an empty list.
             gloss_columns (dict, optional): A dictionary mapping languages to their gloss column names. Defaults to an empty dictionary.
             ft_columns (dict, optional): A dictionary mapping languages to their free translation column names. Defaults to an empty dictionary.
+            speaker_column (str, optional): The column name for the speaker in the JSON file. Defaults to None.
         """
         super().__init__(root_directory, link, encoding, lengua_principal, n_entries, text_column, file_column, 
-                         pos_column, mb_column, id_column)
+                         pos_column, mb_column, id_column, speaker_column)
         self.languages = languages if languages is not None else []
         self.gloss_columns = gloss_columns if gloss_columns is not None else {}
         self.ft_columns = ft_columns if ft_columns is not None else {}
@@ -366,14 +488,16 @@ class MultilingualCorpus(Corpus):
         else:
             raise ValueError("Entry must be of type MultilingualCorpusEntry")
 
-    def read(self, file):
+    def read(self, file, profiler=None):
         """
         Reads entries from a JSON file and adds them to the corpus.
 
         Args:
             file (str): The path to the JSON file.
+            profiler (StageProfiler, optional): Profiler that records the stage. Defaults to None.
         """
-        with open(file, 'r', encoding=self.encoding) as f:
+        n_entries = self.n_entries
+        with _stage(profiler, f"{type(self).__name__}.read") as stage, open(file, 'r', encoding=self.encoding) as f:
             for line in f:
                 item = json.loads(line.strip())
                 text = item.get(self.text_column)
@@ -381,6 +505,7 @@ class MultilingualCorpus(Corpus):
                 pos = item.get(self.pos_column) if self.pos_column else None
                 mb = item.get(self.mb_column) if self.mb_column else None
                 entry_id = item.get(self.id_column) if self.id_column else None
+                speaker = item.get(self.speaker_column) if self.speaker_column else None
 
                 # Multilingual columns for free translation (ft)
                 ft = {lang: item.get(self.ft_columns[lang]) for lang in self.languages if lang in self.ft_columns}
@@ -393,10 +518,12 @@ class MultilingualCorpus(Corpus):
                 words = [word_entry]
 
                 # Create a MultilingualCorpusEntry and add it to the corpus
-                multilingual_entry = MultilingualCorpusEntry(file=file, text=text, words=words, entry_id=entry_id, ft=ft)
+                multilingual_entry = MultilingualCorpusEntry(file=file, text=text, words=words, entry_id=entry_id, ft=ft,
+                                                             speaker=speaker)
                 self.add_entry(multilingual_entry)
+            stage.rows_out = self.n_entries - n_entries
 
-    def clean(self, process_words=True, remove_duplicates=True, min_length=1):
+    def clean(self, process_words=True, remove_duplicates=True, min_length=1, profiler=None):
         """
         Cleans the corpus by removing entries with words shorter than the minimum length and optionally removing duplicates.
 
@@ -404,15 +531,19 @@ class MultilingualCorpus(Corpus):
             process_words (bool, optional): Whether to process the words in each entry. Defaults to True.
             remove_duplicates (bool, optional): Whether to remove duplicate entries. Defaults to True.
             min_length (int, optional): The minimum length of words to keep in the corpus. Defaults to 1.
+            profiler (StageProfiler, optional): Profiler that records the cleaning and word processing stages. Defaults to None.
         """
-        super().clean(process_words=False, remove_duplicates=remove_duplicates, min_length=min_length)
+        super().clean(process_words=False, remove_duplicates=remove_duplicates, min_length=min_length, profiler=profiler)
 
         # Clean the free translation fields
-        for entry in self.entries:
-            if process_words:
-                entry.process_words()
-            for lang in entry.ft:
-                entry.ft[lang] = entry.ft[lang].lower() if entry.ft[lang] else entry.ft[lang]
+        with _stage(profiler, "process_words" if process_words else "clean_translations",
+                    rows_in=len(self.entries)) as stage:
+            for entry in self.entries:
+                if process_words:
+                    entry.process_words()
+                for lang in entry.ft:
+                    entry.ft[lang] = entry.ft[lang].lower() if entry.ft[lang] else entry.ft[lang]
+            stage.rows_out = sum(len(entry.words) for entry in self.entries)
 
 class MultilingualCorpusEntry(CorpusEntry):
     """
@@ -424,9 +555,10 @@ class MultilingualCorpusEntry(CorpusEntry):
         words (list): A list of WordEntry objects associated with the corpus entry.
         id (str): A unique identifier for the corpus entry.
         ft (dict): A dictionary of free translations for different languages.
+        speaker (str): The speaker of the corpus entry, if known.
     """
 
-    def __init__(self, file, text, words=None, entry_id=None, ft=None):
+    def __init__(self, file, text, words=None, entry_id=None, ft=None, speaker=None):
         """
         Initializes a MultilingualCorpusEntry instance.
 
@@ -436,8 +568,9 @@ class MultilingualCorpusEntry(CorpusEntry):
             words (list, optional): A list of WordEntry objects. Defaults to an empty list if not provided.
             entry_id (str, optional): A unique identifier for the corpus entry. Defaults to None.
             ft (dict, optional): A dictionary of free translations for different languages. Defaults to an empty dictionary if not provided.
+            speaker (str, optional): The speaker of the corpus entry. Defaults to None.
         """
-        super().__init__(file, text, words, entry_id)
+        super().__init__(file, text, words, entry_id, speaker)
         self.ft = ft if ft is not None else {}
 
     def __str__(self):
@@ -621,4 +754,49 @@ class MultilingualWordEntry(WordEntry):
                 words_with_glosses[mb] = self.gloss['es'][i]
             i += 1
 
-        return words_with_glosses
\ No newline at end of file
+        return words_with_glosses
+
+class CorpusSentences:
+    """
+    Restartable iterator over the sentences of a corpus, for gensim's `sentences=` argument.
+
+    Every iteration walks the corpus entries again and yields the whitespace tokens of each entry's
+    text, segmented on the fly, so no list of sentences is ever built.
+
+    Attributes:
+        corpus (Corpus): The corpus, usually cleaned.
+        segment (callable): Function from a list of words to a list of tokens.
+    """
+
+    def __init__(self, corpus, segmenter=None):
+        """
+        Initializes a CorpusSentences instance.
+
+        Args:
+            corpus (Corpus): The corpus, usually cleaned.
+            segmenter (optional): None for whitespace tokens; an object with a `segment_words` method
+                (MorfessorSegmenter) or a `tokenize_words` method (BPETokenizer); or a function from a
+                list of words to a list of tokens.
+
+        Raises:
+            TypeError: If the segmenter is not supported.
+        """
+        self.corpus = corpus
+        if segmenter is None:
+            self.segment = list
+        elif hasattr(segmenter, "segment_words"):
+            self.segment = segmenter.segment_words
+        elif hasattr(segmenter, "tokenize_words"):
+            self.segment = segmenter.tokenize_words
+        elif callable(segmenter):
+            self.segment = segmenter
+        else:
+            raise TypeError(f"Unsupported segmenter: {segmenter!r}")
+
+    def __iter__(self):
+        for entry in self.corpus.entries:
+            words = entry.text.split() if entry.text else []
+            yield self.segment(words) if words else []
+
+    def __len__(self):
+        return len(self.corpus.entries)
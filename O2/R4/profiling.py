@@ -0,0 +1,196 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class StageRecord:
+    """
+    Measurements of one run of a pipeline stage.
+
+    Attributes:
+        name (str): The stage name.
+        path (tuple): Names of the enclosing stages and this one, outermost first.
+        start (float): Start time, in seconds since the profiler started.
+        wall (float): Wall-clock seconds.
+        cpu (float): CPU seconds of this process.
+        rows_in (int): Rows (entries, DataFrame rows...) the stage received, if reported.
+        rows_out (int): Rows the stage produced; set it inside the `with` block.
+        memory_peak (int): Peak bytes allocated above the memory in use when the stage started (tracemalloc).
+    """
+
+    def __init__(self, name, path, start, rows_in=None):
+        self.name = name
+        self.path = path
+        self.start = start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.memory_peak = None
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "path": "/".join(self.path),
+            "start": round(self.start, 6),
+            "wall_seconds": round(self.wall, 6),
+            "cpu_seconds": round(self.cpu, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "memory_peak_bytes": self.memory_peak,
+        }
+
+
+class StageProfiler:
+    """
+    Opt-in profiler for the ingestion pipeline (leerCorpus, Corpus.read, Corpus.clean...).
+
+    Pass it as the `profiler` argument of the instrumented functions, or wrap your own steps with
+    `stage`. Stages can be nested; every stage records wall time, CPU time, rows in/out and the
+    tracemalloc peak, and the report can be saved as JSON or as a flame-graph trace.
+
+    Example:
+        with StageProfiler() as profiler:
+            corpus.read(file, profiler=profiler)
+            corpus.clean(profiler=profiler)
+        profiler.save_json("profile.json")
+        profiler.save_trace("profile.trace.json")
+
+    Attributes:
+        trace_memory (bool): Whether to measure memory peaks with tracemalloc.
+        records (list): StageRecord objects, in the order the stages finished.
+        callbacks (list): Functions called with each StageRecord when its stage finishes.
+    """
+
+    def __init__(self, trace_memory=True, callbacks=None):
+        """
+        Initializes a StageProfiler instance.
+
+        Args:
+            trace_memory (bool, optional): Whether to measure memory peaks with tracemalloc. Defaults to True.
+            callbacks (list, optional): Functions called with each StageRecord when its stage finishes. Defaults to None.
+        """
+        self.trace_memory = trace_memory
+        self.callbacks = list(callbacks or [])
+        self.records = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        """Starts tracemalloc if memory tracing is enabled and it is not running yet."""
+        self._origin = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stops tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Measures a stage.
+
+        Args:
+            name (str): The stage name.
+            rows_in (int, optional): Number of rows the stage receives. Defaults to None.
+
+        Yields:
+            StageRecord: The record; set its `rows_out` before the block ends.
+        """
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        record = StageRecord(name, tuple(r.name for r, _, _ in self._stack) + (name,),
+                             time.perf_counter() - self._origin, rows_in)
+        baseline = 0
+        if tracing:
+            baseline, peak = tracemalloc.get_traced_memory()
+            # The enclosing stage keeps the peak reached so far before it is reset for this one
+            if self._stack:
+                self._stack[-1][2][0] = max(self._stack[-1][2][0], peak)
+            tracemalloc.reset_peak()
+        running_peak = [baseline]
+        self._stack.append((record, baseline, running_peak))
+
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - wall
+            record.cpu = time.process_time() - cpu
+            self._stack.pop()
+            if tracing:
+                peak = max(running_peak[0], tracemalloc.get_traced_memory()[1])
+                record.memory_peak = peak - baseline
+                if self._stack:
+                    self._stack[-1][2][0] = max(self._stack[-1][2][0], peak)
+            self.records.append(record)
+            for callback in self.callbacks:
+                callback(record)
+
+    def report(self):
+        """
+        Returns the structured report.
+
+        Returns:
+            dict: The stages in finishing order, and totals per stage path.
+        """
+        totals = {}
+        for record in self.records:
+            total = totals.setdefault("/".join(record.path), {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                                              "memory_peak_bytes": None})
+            total["calls"] += 1
+            total["wall_seconds"] += record.wall
+            total["cpu_seconds"] += record.cpu
+            if record.memory_peak is not None:
+                total["memory_peak_bytes"] = max(total["memory_peak_bytes"] or 0, record.memory_peak)
+        return {"stages": [record.to_dict() for record in self.records], "totals": totals}
+
+    def save_json(self, path):
+        """Saves the report as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+
+    def save_trace(self, path, format="chrome"):
+        """
+        Saves the stages as a flame-graph-compatible trace.
+
+        Args:
+            path (str): Output file.
+            format (str, optional): "chrome" writes Trace Event JSON (chrome://tracing, Perfetto,
+                speedscope); "folded" writes folded stacks with microseconds of self time
+                (flamegraph.pl, speedscope). Defaults to "chrome".
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if format == "chrome":
+            events = [{"name": record.name, "ph": "X", "ts": record.start * 1e6, "dur": record.wall * 1e6,
+                       "pid": os.getpid(), "tid": 0,
+                       "args": {k: v for k, v in record.to_dict().items() if k not in ("name", "start")}}
+                      for record in self.records]
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        elif format == "folded":
+            self_time = {}
+            for record in self.records:
+                self_time[record.path] = self_time.get(record.path, 0.0) + record.wall
+                if len(record.path) > 1:
+                    self_time[record.path[:-1]] = self_time.get(record.path[:-1], 0.0) - record.wall
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, seconds in self_time.items():
+                    f.write(f"{';'.join(stack)} {max(int(seconds * 1e6), 0)}\n")
+        else:
+            raise ValueError(f"Unsupported trace format: {format}")
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+STATS_VERSION = 1          # Bump when the statistics change, so cached results are recomputed
+CACHE_FOLDER = ".stats_cache"
+
+
+def _tokens(value):
+    """Interlinear line of a raw entry (string) or of a processed word (list) as a list of tokens."""
+    if not value:
+        return []
+    return value.split() if isinstance(value, str) else list(value)
+
+
+def entry_record(entry):
+    """
+    Reduce an entry to the plain values the statistics need, so shards are cheap to send to workers.
+
+    Morphemes, POS tags and glosses are taken from the whole line of an unprocessed entry, or
+    concatenated over the words of a processed one.
+
+    Args:
+        entry (CorpusEntry or MultilingualCorpusEntry): The entry.
+
+    Returns:
+        tuple: (file, speaker, text, morphemes, tags, glosses by language, languages with a free translation).
+    """
+    morphemes, tags, glosses = [], [], {}
+    for word in entry.words:
+        morphemes += _tokens(word.mb)
+        tags += _tokens(word.pos)
+        for lang, gloss in getattr(word, "gloss", {}).items():
+            glosses.setdefault(lang, []).extend(_tokens(gloss))
+    translated = sorted(lang for lang, ft in getattr(entry, "ft", {}).items() if ft)
+    return (entry.file, getattr(entry, "speaker", None), entry.text or "", morphemes, tags, glosses, translated)
+
+
+class CorpusStatistics:
+    """
+    Mergeable counts over a corpus, computed in a single pass over its entries.
+
+    Attributes:
+        n_entries (int): Number of entries.
+        n_tokens (int): Number of whitespace tokens of the texts.
+        morphemes (Counter): Morpheme -> frequency.
+        pos_tags (Counter): POS tag -> frequency.
+        pos_bigrams (Counter): "tag tag" -> frequency of consecutive tags within an entry.
+        glossed (Counter): Language -> number of morphemes with a gloss.
+        translated (Counter): Language -> number of entries with a free translation.
+        files (Counter): File -> number of entries.
+        file_tokens (Counter): File -> number of tokens.
+        speakers (Counter): Speaker -> number of entries.
+        speaker_tokens (Counter): Speaker -> number of tokens.
+    """
+
+    COUNTERS = ("morphemes", "pos_tags", "pos_bigrams", "glossed", "translated", "files", "file_tokens",
+                "speakers", "speaker_tokens")
+
+    def __init__(self):
+        """
+        Initializes an empty CorpusStatistics instance.
+        """
+        self.n_entries = 0
+        self.n_tokens = 0
+        for name in self.COUNTERS:
+            setattr(self, name, Counter())
+
+    def add(self, record):
+        """
+        Adds one entry record (see entry_record).
+
+        Args:
+            record (tuple): The record.
+        """
+        file, speaker, text, morphemes, tags, glosses, translated = record
+        n_tokens = len(text.split())
+        self.n_entries += 1
+        self.n_tokens += n_tokens
+        self.morphemes.update(morphemes)
+        self.pos_tags.update(tags)
+        self.pos_bigrams.update(f"{a} {b}" for a, b in zip(tags, tags[1:]))
+        for lang, tokens in glosses.items():
+            self.glossed[lang] += min(len(tokens), len(morphemes))
+        self.translated.update(translated)
+        if file is not None:
+            self.files[file] += 1
+            self.file_tokens[file] += n_tokens
+        if speaker is not None:
+            self.speakers[speaker] += 1
+            self.speaker_tokens[speaker] += n_tokens
+
+    def merge(self, other):
+        """
+        Adds the counts of another CorpusStatistics instance.
+
+        Args:
+            other (CorpusStatistics): Statistics of another shard.
+
+        Returns:
+            CorpusStatistics: This instance.
+        """
+        self.n_entries += other.n_entries
+        self.n_tokens += other.n_tokens
+        for name in self.COUNTERS:
+            getattr(self, name).update(getattr(other, name))
+        return self
+
+    @property
+    def n_morphemes(self):
+        return sum(self.morphemes.values())
+
+    def gloss_coverage(self):
+        """
+        Returns the share of morphemes with a gloss, per language.
+
+        Returns:
+            dict: Language -> coverage between 0 and 1.
+        """
+        total = self.n_morphemes
+        return {lang: (count / total if total else 0.0) for lang, count in self.glossed.items()}
+
+    def to_dict(self):
+        """
+        Returns a JSON-serializable representation of the statistics.
+
+        Returns:
+            dict: Totals, counters and gloss coverage.
+        """
+        data = {"n_entries": self.n_entries, "n_tokens": self.n_tokens, "n_morphemes": self.n_morphemes,
+                "gloss_coverage": self.gloss_coverage()}
+        data.update({name: dict(getattr(self, name).most_common()) for name in self.COUNTERS})
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a CorpusStatistics instance from the output of to_dict.
+
+        Args:
+            data (dict): The dictionary.
+
+        Returns:
+            CorpusStatistics: The statistics.
+        """
+        stats = cls()
+        stats.n_entries = data["n_entries"]
+        stats.n_tokens = data["n_tokens"]
+        for name in cls.COUNTERS:
+            setattr(stats, name, Counter(data[name]))
+        return stats
+
+
+def shard_statistics(records):
+    """Statistics of one shard of entry records (run in the worker processes)."""
+    stats = CorpusStatistics()
+    for record in records:
+        stats.add(record)
+    return stats
+
+
+def content_hash(records):
+    """SHA-1 of the entry records, used as the cache key of their statistics."""
+    digest = hashlib.sha1(f"stats-v{STATS_VERSION}".encode("utf-8"))
+    for record in records:
+        digest.update(json.dumps(record, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def compute_statistics(corpus, processes=None, shard_size=2000, cache_dir=None, use_cache=True):
+    """
+    Computes the statistics of a corpus with a process pool over shards of entries.
+
+    Every shard is counted in one pass by a worker and the partial counts are merged. The result
+    is cached as JSON under the content hash of the entries, so an unchanged corpus is answered
+    from disk.
+
+    Args:
+        corpus (Corpus or MultilingualCorpus): The corpus.
+        processes (int, optional): Worker processes; 1 counts in this process. Defaults to the number of CPUs.
+        shard_size (int, optional): Entries per shard. Defaults to 2000.
+        cache_dir (str, optional): Cache directory. Defaults to ".stats_cache" in the corpus root directory.
+        use_cache (bool, optional): Whether to read and write the cache. Defaults to True.
+
+    Returns:
+        CorpusStatistics: The statistics.
+    """
+    records = [entry_record(entry) for entry in corpus.entries]
+    cache_path = None
+    if use_cache:
+        cache_dir = cache_dir or os.path.join(corpus.root_directory or ".", CACHE_FOLDER)
+        cache_path = os.path.join(cache_dir, f"{content_hash(records)}.json")
+        if os.path.isfile(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return CorpusStatistics.from_dict(json.load(f))
+
+    shards = [records[i:i + shard_size] for i in range(0, len(records), shard_size)]
+    stats = CorpusStatistics()
+    if processes == 1 or len(shards) <= 1:
+        for shard in shards:
+            stats.merge(shard_statistics(shard))
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for partial in executor.map(shard_statistics, shards):
+                stats.merge(partial)
+
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(stats.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    return stats
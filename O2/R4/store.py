@@ -0,0 +1,318 @@
+import json
+import sqlite3
+
+from estructura import CorpusEntry, MultilingualCorpusEntry, MultilingualWordEntry, WordEntry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    entry_id TEXT NOT NULL UNIQUE,
+    file TEXT,
+    text TEXT,
+    mb TEXT,
+    pos TEXT,
+    gloss TEXT,
+    ft TEXT,
+    processed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY,
+    entry INTEGER NOT NULL REFERENCES entries (id),
+    position INTEGER NOT NULL,
+    word TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS morphemes (
+    id INTEGER PRIMARY KEY,
+    entry INTEGER NOT NULL REFERENCES entries (id),
+    token INTEGER NOT NULL REFERENCES tokens (id),
+    position INTEGER NOT NULL,
+    form TEXT,
+    pos TEXT
+);
+CREATE TABLE IF NOT EXISTS glosses (
+    morpheme INTEGER NOT NULL REFERENCES morphemes (id),
+    lang TEXT NOT NULL,
+    gloss TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file);
+CREATE INDEX IF NOT EXISTS tokens_entry ON tokens (entry);
+CREATE INDEX IF NOT EXISTS tokens_word ON tokens (word);
+CREATE INDEX IF NOT EXISTS morphemes_form_pos ON morphemes (form, pos);
+CREATE INDEX IF NOT EXISTS morphemes_pos ON morphemes (pos);
+CREATE INDEX IF NOT EXISTS morphemes_entry ON morphemes (entry);
+CREATE INDEX IF NOT EXISTS glosses_morpheme ON glosses (morpheme, lang);
+CREATE INDEX IF NOT EXISTS glosses_lang_gloss ON glosses (lang, gloss);
+"""
+
+
+def _as_list(value):
+    """Morpheme breaks, POS tags and glosses of a processed word are lists, except after the last token of a line."""
+    if value is None:
+        return []
+    return value.split() if isinstance(value, str) else list(value)
+
+
+class CorpusStore:
+    """
+    Persistent SQLite storage for Corpus and MultilingualCorpus entries.
+
+    Each entry is stored with its raw fields, so it can be read back exactly as Corpus.read creates it,
+    and is also split into normalized tokens, morphemes (with their POS tag) and per-language glosses.
+    Those tables are indexed, so questions like "which sentences contain =bi tagged =clit." are
+    answered by SQL and the matching entries are streamed back instead of loading the whole corpus.
+
+    Attributes:
+        db_path (str): Database file.
+        connection (sqlite3.Connection): Open connection.
+        languages (list): Languages of the stored glosses and free translations; empty for a monolingual corpus.
+    """
+
+    def __init__(self, db_path):
+        """
+        Opens (and creates, if needed) a CorpusStore.
+
+        Args:
+            db_path (str): Database file.
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+        row = self.connection.execute("SELECT value FROM metadata WHERE key = 'languages'").fetchone()
+        self.languages = json.loads(row[0]) if row else []
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+    def write(self, corpus, replace=True):
+        """
+        Store the entries of a corpus.
+
+        All rows are inserted with executemany inside one transaction. Words that have not been
+        processed yet are tokenized with WordEntry.process to fill the token and morpheme tables;
+        the entries themselves are not modified.
+
+        Args:
+            corpus (Corpus or MultilingualCorpus): The corpus, read and optionally cleaned.
+            replace (bool, optional): Whether to delete the stored entries first. Defaults to True.
+
+        Returns:
+            int: Number of entries stored.
+        """
+        languages = list(getattr(corpus, "languages", []))
+        with self.connection:
+            if replace:
+                for table in ("glosses", "morphemes", "tokens", "entries"):
+                    self.connection.execute(f"DELETE FROM {table}")
+            self.connection.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('languages', ?)",
+                                    (json.dumps(languages),))
+            self.languages = languages
+
+            # Row ids are assigned here so the child tables can be inserted in bulk too
+            next_entry, next_token, next_morpheme = (
+                (self.connection.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0] + 1)
+                for table in ("entries", "tokens", "morphemes")
+            )
+            entry_rows, token_rows, morpheme_rows, gloss_rows = [], [], [], []
+
+            for entry in corpus.entries:
+                # A single word holding the whole line (and its interlinear strings) means the entry is unprocessed
+                raw = entry.words[0] if len(entry.words) == 1 else None
+                unprocessed = raw is not None and bool(raw.word) and (
+                    isinstance(raw.mb, str) or isinstance(raw.pos, str) or len(raw.word.split()) > 1)
+                entry_rows.append((
+                    next_entry,
+                    entry.id,
+                    entry.file,
+                    entry.text,
+                    raw.mb if unprocessed and isinstance(raw.mb, str) else None,
+                    raw.pos if unprocessed and isinstance(raw.pos, str) else None,
+                    json.dumps(getattr(raw, "gloss", {}), ensure_ascii=False) if unprocessed else None,
+                    json.dumps(getattr(entry, "ft", {}), ensure_ascii=False),
+                    0 if unprocessed or raw is not None and not raw.word else 1,
+                ))
+
+                words = raw.process() if unprocessed else entry.words
+                for token_position, word in enumerate(words):
+                    token_rows.append((next_token, next_entry, token_position, word.word))
+                    mbs = _as_list(word.mb)
+                    tags = _as_list(word.pos)
+                    glosses = {lang: _as_list(gloss) for lang, gloss in getattr(word, "gloss", {}).items()}
+                    # Lines are not always aligned: a tag or gloss without a morpheme is kept with a NULL form
+                    size = max([len(mbs), len(tags)] + [len(tokens) for tokens in glosses.values()])
+                    for position in range(size):
+                        morpheme_rows.append((next_morpheme, next_entry, next_token, position,
+                                              mbs[position] if position < len(mbs) else None,
+                                              tags[position] if position < len(tags) else None))
+                        for lang, tokens in glosses.items():
+                            if position < len(tokens):
+                                gloss_rows.append((next_morpheme, lang, tokens[position]))
+                        next_morpheme += 1
+                    next_token += 1
+                next_entry += 1
+
+            self.connection.executemany("INSERT INTO entries (id, entry_id, file, text, mb, pos, gloss, ft, processed) "
+                                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", entry_rows)
+            self.connection.executemany("INSERT INTO tokens (id, entry, position, word) VALUES (?, ?, ?, ?)",
+                                        token_rows)
+            self.connection.executemany("INSERT INTO morphemes (id, entry, token, position, form, pos) "
+                                        "VALUES (?, ?, ?, ?, ?, ?)", morpheme_rows)
+            self.connection.executemany("INSERT INTO glosses (morpheme, lang, gloss) VALUES (?, ?, ?)", gloss_rows)
+        return len(entry_rows)
+
+    def _processed_words(self, row_id):
+        """Rebuild the processed words of an entry from the token, morpheme and gloss tables."""
+        words = {}
+        for token, word in self.connection.execute(
+                "SELECT id, word FROM tokens WHERE entry = ? ORDER BY position", (row_id,)):
+            words[token] = (MultilingualWordEntry(word=word, mb=[], pos=[], gloss={lang: [] for lang in self.languages})
+                            if self.languages else WordEntry(word=word, mb=[], pos=[]))
+        # The glosses of the whole entry come in one query, grouped by morpheme in insertion order
+        glosses = {}
+        if self.languages:
+            for morpheme, lang, gloss in self.connection.execute(
+                    "SELECT glosses.morpheme, glosses.lang, glosses.gloss FROM glosses "
+                    "JOIN morphemes ON morphemes.id = glosses.morpheme "
+                    "WHERE morphemes.entry = ? ORDER BY glosses.rowid", (row_id,)):
+                glosses.setdefault(morpheme, []).append((lang, gloss))
+        for morpheme, token, form, pos in self.connection.execute(
+                "SELECT id, token, form, pos FROM morphemes WHERE entry = ? ORDER BY token, position", (row_id,)):
+            if form is not None:
+                words[token].mb.append(form)
+            if pos is not None:
+                words[token].pos.append(pos)
+            for lang, gloss in glosses.get(morpheme, ()):
+                words[token].gloss.setdefault(lang, []).append(gloss)
+        return list(words.values())
+
+    def _make_entry(self, row):
+        row_id, entry_id, file, text, mb, pos, gloss, ft, processed = row
+        if processed:
+            words = self._processed_words(row_id)
+        elif self.languages:
+            words = [MultilingualWordEntry(word=text, mb=mb, pos=pos, gloss=json.loads(gloss) if gloss else None)]
+        else:
+            words = [WordEntry(word=text, mb=mb, pos=pos)]
+
+        if self.languages:
+            return MultilingualCorpusEntry(file=file, text=text, words=words, entry_id=entry_id,
+                                           ft=json.loads(ft) if ft else None)
+        return CorpusEntry(file=file, text=text, words=words, entry_id=entry_id)
+
+    def _stream(self, where="", params=(), batch_size=500):
+        cursor = self.connection.execute(
+            f"SELECT id, entry_id, file, text, mb, pos, gloss, ft, processed FROM entries {where} ORDER BY id", params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield self._make_entry(row)
+
+    def iter_entries(self, file=None):
+        """
+        Stream the stored entries.
+
+        Entries stored unprocessed come back as Corpus.read creates them; processed entries get their
+        words rebuilt from the token and morpheme tables.
+
+        Args:
+            file (str, optional): Only entries of this source file. Defaults to None.
+
+        Returns:
+            generator: CorpusEntry (or MultilingualCorpusEntry) objects.
+        """
+        if file is None:
+            return self._stream()
+        return self._stream("WHERE file = ?", (file,))
+
+    def entries_with_morpheme(self, form=None, pos=None):
+        """
+        Stream the entries that contain a morpheme, a POS tag, or a morpheme with a given tag.
+
+        Args:
+            form (str, optional): Morpheme as written in the morpheme break line, e.g. "=bi". Defaults to None.
+            pos (str, optional): POS tag, e.g. "v.tr.". Defaults to None.
+
+        Returns:
+            generator: CorpusEntry (or MultilingualCorpusEntry) objects.
+
+        Raises:
+            ValueError: If neither form nor pos is given.
+        """
+        conditions, params = [], []
+        if form is not None:
+            conditions.append("form = ?")
+            params.append(form)
+        if pos is not None:
+            conditions.append("pos = ?")
+            params.append(pos)
+        if not conditions:
+            raise ValueError("A morpheme form or a POS tag is required")
+        return self._stream(f"WHERE id IN (SELECT entry FROM morphemes WHERE {' AND '.join(conditions)})", params)
+
+    def entries_with_word(self, word):
+        """
+        Stream the entries that contain a token.
+
+        Args:
+            word (str): The token.
+
+        Returns:
+            generator: CorpusEntry (or MultilingualCorpusEntry) objects.
+        """
+        return self._stream("WHERE id IN (SELECT entry FROM tokens WHERE word = ?)", (word,))
+
+    def glosses_of(self, form, lang="es"):
+        """
+        Count the glosses given to a morpheme.
+
+        Args:
+            form (str): Morpheme as written in the morpheme break line, e.g. "=bi".
+            lang (str, optional): Gloss language. Defaults to "es".
+
+        Returns:
+            list: (gloss, count) tuples, most frequent first.
+        """
+        return self.connection.execute(
+            "SELECT gloss, COUNT(*) AS n FROM morphemes JOIN glosses ON glosses.morpheme = morphemes.id "
+            "WHERE form = ? AND lang = ? GROUP BY gloss ORDER BY n DESC, gloss", (form, lang)).fetchall()
+
+    def morphemes_with_gloss(self, gloss, lang="es"):
+        """
+        Count the morphemes glossed as `gloss`.
+
+        Args:
+            gloss (str): The gloss as written in the gloss line, e.g. "=ENF".
+            lang (str, optional): Gloss language. Defaults to "es".
+
+        Returns:
+            list: (form, pos, count) tuples, most frequent first.
+        """
+        return self.connection.execute(
+            "SELECT form, pos, COUNT(*) AS n FROM glosses JOIN morphemes ON morphemes.id = glosses.morpheme "
+            "WHERE lang = ? AND gloss = ? GROUP BY form, pos ORDER BY n DESC, form", (lang, gloss)).fetchall()
+
+    def load(self, corpus, file=None):
+        """
+        Add the stored entries to a corpus, as Corpus.read does.
+
+        Args:
+            corpus (Corpus or MultilingualCorpus): The corpus to fill.
+            file (str, optional): Only entries of this source file. Defaults to None.
+        """
+        for entry in self.iter_entries(file):
+            corpus.add_entry(entry)
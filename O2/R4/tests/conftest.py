@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The O2/R4 modules import each other as top-level modules (from estructura import ...)
+sys.path.insert(0, str(Path(__file__).parents[1]))
@@ -0,0 +1,61 @@
+import json
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from dedup import cross_duplicates, near_duplicate_clusters, normalize_text
+
+CORPUS_FILE = Path(__file__).parents[1] / "corpus_bilingue.json"
+ALPHABET = "abcdefghijklmnoprstuwyáéíóú"
+
+
+@pytest.fixture(scope="module")
+def texts():
+    with open(CORPUS_FILE, "r", encoding="utf-8") as f:
+        texts = [json.loads(line)["transcription"] for line in f]
+    # Single edits of very short words are distinct words (iki / ika), not re-transcriptions
+    return list(dict.fromkeys(text for text in texts if text and len(normalize_text(text)) >= 6))
+
+
+def single_edit(text, rng):
+    i = rng.randrange(len(text))
+    operation = rng.randrange(3)
+    if operation == 0:
+        return text[:i] + rng.choice(ALPHABET) + text[i:]
+    if operation == 1:
+        return text[:i] + text[i + 1:]
+    return text[:i] + rng.choice(ALPHABET) + text[i + 1:]
+
+
+def punctuation_variant(text, rng):
+    return rng.choice(["¡", "¿", '"', ""]) + text + rng.choice([".", "?", "!", ",", "..."])
+
+
+def recall(originals, variants):
+    clusters = near_duplicate_clusters(originals + variants)
+    cluster_of = {i: set(members) for members in clusters for i in members}
+    n = len(originals)
+    return sum(n + i in cluster_of.get(i, ()) for i in range(n)) / n
+
+
+@pytest.mark.parametrize("make_variant", [single_edit, punctuation_variant])
+def test_recall_of_re_transcriptions(texts, make_variant):
+    rng = random.Random(0)
+    originals = rng.sample(texts, 500)
+    variants = [make_variant(text, rng) for text in originals]
+    assert recall(originals, variants) >= 0.95
+
+
+def test_cross_duplicates_catches_accent_and_punctuation_leaks():
+    assert cross_duplicates(["noka bake ishon"], ["noka bake ishón."]) == [0]
+    assert cross_duplicates(["noka bake ishon"], ["noka bake ishan"]) == [0]
+    assert cross_duplicates(["noka bake ishon"], ["kapa meken beneme"]) == []
+
+
+def test_identical_texts_are_not_compared_pairwise():
+    start = time.perf_counter()
+    clusters = near_duplicate_clusters(["ee"] * 3000 + ["kapa meken beneme"] * 3000)
+    assert time.perf_counter() - start < 2
+    assert [len(members) for members in clusters] == [3000, 3000]
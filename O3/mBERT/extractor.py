@@ -0,0 +1,294 @@
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+DEFAULT_MODEL_DIR = THIS_FOLDER / "mbert_BPE"
+DEFAULT_BPE_MODEL = THIS_FOLDER.parent / "tokenizer" / "spbpe_isc.model"
+AGGREGATION_METHODS = ("sum", "mean")
+
+
+class PCAProjection:
+    """
+    A fixed linear projection fitted once with PCA and saved to disk.
+
+    Replaces the freshly initialized nn.Linear reduction layer used in bdi.ipynb, so the reduced
+    vectors are the same on every run.
+
+    Attributes:
+        mean (np.ndarray): Mean of the fitted data, shape (input_dim,).
+        components (np.ndarray): Principal axes, shape (output_dim, input_dim).
+    """
+
+    def __init__(self, mean, components):
+        """
+        Initializes a PCAProjection instance.
+
+        Args:
+            mean (np.ndarray): Mean of the fitted data.
+            components (np.ndarray): Principal axes, one per row.
+        """
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+
+    @classmethod
+    def fit(cls, matrix, output_dim=300):
+        """
+        Fit the projection on a matrix of hidden states.
+
+        Args:
+            matrix (np.ndarray): Data of shape (n_samples, input_dim).
+            output_dim (int, optional): Number of components. Defaults to 300.
+
+        Returns:
+            PCAProjection: The fitted projection.
+
+        Raises:
+            ValueError: If there are fewer samples or input dimensions than components.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if min(matrix.shape) < output_dim:
+            raise ValueError(f"Need at least {output_dim} samples and dimensions to fit {output_dim} components, got {matrix.shape}")
+        mean = matrix.mean(axis=0)
+        _, _, Vt = np.linalg.svd(matrix - mean, full_matrices=False)
+        # Fix the sign of each axis so refitting the same data gives the same projection
+        signs = np.sign(Vt[np.arange(output_dim), np.abs(Vt[:output_dim]).argmax(axis=1)])
+        return cls(mean, Vt[:output_dim] * signs[:, None])
+
+    @classmethod
+    def load(cls, path):
+        """Load a projection saved with `save`."""
+        data = np.load(path)
+        return cls(data["mean"], data["components"])
+
+    def save(self, path):
+        """Save the projection to a .npz file."""
+        np.savez(path, mean=self.mean, components=self.components)
+
+    def transform(self, matrix):
+        """
+        Project a matrix of hidden states.
+
+        Args:
+            matrix (np.ndarray): Data of shape (n_samples, input_dim).
+
+        Returns:
+            np.ndarray: Projected data of shape (n_samples, output_dim).
+        """
+        return (np.asarray(matrix, dtype=np.float32) - self.mean) @ self.components.T
+
+
+class MBertEmbeddingExtractor:
+    """
+    Batched CPU extraction of word embeddings from the fine-tuned mBERT checkpoint.
+
+    Words are segmented with the SentencePiece BPE model (as in get_word_embedding_with_bpe),
+    sorted by length and padded into dynamic batches, and run under torch.inference_mode. The
+    last-layer states of each word are pooled with a scatter-sum over its non-padding tokens.
+
+    Attributes:
+        model: BertForMaskedLM loaded with output_hidden_states=True.
+        tokenizer: The matching BertTokenizer.
+        bpe_tokenizer (spm.SentencePieceProcessor): BPE segmenter.
+        batch_size (int): Maximum number of words per forward pass.
+        aggregation_method (str): "sum" or "mean".
+        projection (PCAProjection): Optional fixed projection applied after pooling.
+    """
+
+    def __init__(self, model_dir=DEFAULT_MODEL_DIR, bpe_model=DEFAULT_BPE_MODEL, batch_size=64, num_threads=None,
+                 aggregation_method="sum", projection=None):
+        """
+        Initializes a MBertEmbeddingExtractor instance.
+
+        Args:
+            model_dir (str or Path, optional): Fine-tuned checkpoint. Defaults to mbert_BPE next to this file.
+            bpe_model (str or Path, optional): SentencePiece model. Defaults to O3/tokenizer/spbpe_isc.model.
+            batch_size (int, optional): Maximum number of words per forward pass. Defaults to 64.
+            num_threads (int, optional): Torch intra-op threads. Defaults to None (torch default).
+            aggregation_method (str, optional): "sum" or "mean". Defaults to "sum".
+            projection (PCAProjection or str, optional): Projection or path to a saved one. Defaults to None.
+
+        Raises:
+            ValueError: If the aggregation method is not supported.
+        """
+        import sentencepiece as spm
+        import torch
+        from transformers import BertForMaskedLM, BertTokenizer
+
+        if aggregation_method not in AGGREGATION_METHODS:
+            raise ValueError(f"Unsupported aggregation method: {aggregation_method}")
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.model = BertForMaskedLM.from_pretrained(str(model_dir), output_hidden_states=True)
+        self.model.eval()
+        self.tokenizer = BertTokenizer.from_pretrained(str(model_dir))
+        self.bpe_tokenizer = spm.SentencePieceProcessor()
+        self.bpe_tokenizer.load(str(bpe_model))
+        self.batch_size = batch_size
+        self.aggregation_method = aggregation_method
+        self.projection = PCAProjection.load(projection) if isinstance(projection, (str, Path)) else projection
+
+    @property
+    def hidden_size(self):
+        return self.model.config.hidden_size
+
+    def segment(self, words):
+        """Segment words with BPE and join the pieces with spaces, as the model was fine-tuned on."""
+        return [" ".join(pieces) for pieces in self.bpe_tokenizer.encode(list(words), out_type=str)]
+
+    def hidden_states(self, words):
+        """
+        Pooled last-layer states of a list of words, before projection.
+
+        Args:
+            words (list): Words.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(words), hidden_size).
+        """
+        import torch
+
+        encoded = self.tokenizer(self.segment(words), truncation=True)["input_ids"]
+        order = sorted(range(len(words)), key=lambda i: len(encoded[i]))
+        pooled = np.zeros((len(words), self.hidden_size), dtype=np.float32)
+
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                rows = order[start:start + self.batch_size]
+                batch = self.tokenizer.pad({"input_ids": [encoded[i] for i in rows]}, return_tensors="pt")
+                outputs = self.model(**batch)
+                hidden = outputs.hidden_states[-1]  # Shape: (batch_size, seq_length, hidden_dim)
+
+                # Scatter-sum the states of every non-padding token into its word's row
+                mask = batch["attention_mask"].bool()
+                word_ids = torch.arange(len(rows)).unsqueeze(1).expand_as(mask)[mask]
+                sums = torch.zeros(len(rows), hidden.shape[-1]).index_add_(0, word_ids, hidden[mask])
+                if self.aggregation_method == "mean":
+                    sums /= mask.sum(dim=1, keepdim=True)
+                pooled[rows] = sums.numpy()
+        return pooled
+
+    def fit_projection(self, words, output_dim=300, path=None):
+        """
+        Fit the PCA projection on the pooled states of a vocabulary and optionally save it.
+
+        Args:
+            words (list): Vocabulary used for fitting (at least `output_dim` words).
+            output_dim (int, optional): Output dimension. Defaults to 300.
+            path (str or Path, optional): Where to save the projection. Defaults to None.
+
+        Returns:
+            PCAProjection: The fitted projection, also set on the extractor.
+        """
+        self.projection = PCAProjection.fit(self.hidden_states(words), output_dim)
+        if path is not None:
+            self.projection.save(path)
+        return self.projection
+
+    def embed(self, words):
+        """
+        Embeddings of a list of words, projected if a projection is set.
+
+        Args:
+            words (list): Words.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(words), output_dim or hidden_size).
+        """
+        states = self.hidden_states(words)
+        return self.projection.transform(states) if self.projection is not None else states
+
+    def build_cache(self, words, cache_path, chunk_size=4096):
+        """
+        Embed a vocabulary into a memory-mapped .npy matrix with a word list alongside.
+
+        Args:
+            words (list): Vocabulary; duplicates are embedded once.
+            cache_path (str or Path): Path of the .npy matrix; words go to "<cache_path>.words.json".
+            chunk_size (int, optional): Words embedded before flushing to disk. Defaults to 4096.
+
+        Returns:
+            EmbeddingCache: The cache, opened read-only.
+        """
+        words = list(dict.fromkeys(words))
+        dim = self.projection.components.shape[0] if self.projection is not None else self.hidden_size
+        matrix = np.lib.format.open_memmap(cache_path, mode="w+", dtype=np.float32, shape=(len(words), dim))
+        for start in range(0, len(words), chunk_size):
+            matrix[start:start + chunk_size] = self.embed(words[start:start + chunk_size])
+            matrix.flush()
+        del matrix
+        with open(EmbeddingCache.words_path(cache_path), "w", encoding="utf-8") as f:
+            json.dump(words, f, ensure_ascii=False)
+        return EmbeddingCache(cache_path)
+
+
+class EmbeddingCache:
+    """
+    Read-only, memory-mapped word embeddings written by MBertEmbeddingExtractor.build_cache.
+
+    Attributes:
+        words (list): Cached words, in row order.
+        matrix (np.memmap): Embedding matrix.
+        index (dict): Word -> row.
+    """
+
+    def __init__(self, cache_path):
+        """
+        Opens an EmbeddingCache.
+
+        Args:
+            cache_path (str or Path): Path of the .npy matrix.
+        """
+        self.matrix = np.load(cache_path, mmap_mode="r")
+        with open(self.words_path(cache_path), "r", encoding="utf-8") as f:
+            self.words = json.load(f)
+        self.index = {word: i for i, word in enumerate(self.words)}
+
+    @staticmethod
+    def words_path(cache_path):
+        return Path(str(cache_path) + ".words.json")
+
+    def __contains__(self, word):
+        return word in self.index
+
+    def __getitem__(self, word):
+        return np.asarray(self.matrix[self.index[word]])
+
+    def embeddings(self, words):
+        """
+        Embeddings of cached words as a dictionary, like load_embeddings in bdi.ipynb.
+
+        Args:
+            words (list): Words; words missing from the cache are left out.
+
+        Returns:
+            dict: Word -> embedding.
+        """
+        return {word: self[word] for word in words if word in self.index}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed a word list with the fine-tuned mBERT checkpoint.")
+    parser.add_argument("words", help="Text file with one word per line")
+    parser.add_argument("cache", help="Output .npy matrix")
+    parser.add_argument("--projection", help="Saved PCA projection (.npz); fitted on the word list if missing")
+    parser.add_argument("--dim", type=int, default=300, help="Projection dimension")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--threads", type=int)
+    parser.add_argument("--aggregation", choices=AGGREGATION_METHODS, default="sum")
+    args = parser.parse_args()
+
+    with open(args.words, "r", encoding="utf-8") as f:
+        words = [line.strip() for line in f if line.strip()]
+
+    extractor = MBertEmbeddingExtractor(batch_size=args.batch_size, num_threads=args.threads,
+                                        aggregation_method=args.aggregation)
+    if args.projection and Path(args.projection).is_file():
+        extractor.projection = PCAProjection.load(args.projection)
+    elif args.projection:
+        extractor.fit_projection(words, args.dim, args.projection)
+    cache = extractor.build_cache(words, args.cache)
+    print(f"Cached {len(cache.words)} embeddings of dimension {cache.matrix.shape[1]} in {args.cache}")
@@ -0,0 +1,163 @@
+import functools
+from multiprocessing import Pool
+from pathlib import Path
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+DEFAULT_SEGMENTATION_FILE = THIS_FOLDER / "morf_isc_segm"
+DEFAULT_MODEL_FILE = THIS_FOLDER / "morf_isc_model.bin"
+
+
+def read_segmentation_table(file_path=DEFAULT_SEGMENTATION_FILE):
+    """
+    Read a Morfessor segmentation file into a dictionary.
+
+    Each line has the form "<count> <morph> + <morph> + ...", as written by
+    MorfessorIO.write_segmentation_file; comment lines start with "#".
+
+    Args:
+        file_path (str or Path): Path to the segmentation file.
+
+    Returns:
+        dict: Word -> tuple of morphs.
+    """
+    table = {}
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            _, _, segmentation = line.partition(' ')
+            morphs = tuple(segmentation.split(' + '))
+            table["".join(morphs)] = morphs
+    return table
+
+
+class MorfessorSegmenter:
+    """
+    Segments Iskonawa words with a precompiled segmentation table and a Morfessor fallback.
+
+    Words seen while training Morfessor are looked up in the table read from `morf_isc_segm`;
+    only unseen words go through Viterbi segmentation, whose results are kept in a bounded LRU cache.
+
+    Attributes:
+        table (dict): Word -> tuple of morphs, from the segmentation file.
+        model_path (Path): Path to the binary Morfessor model used for unseen words.
+        cache_size (int): Maximum number of Viterbi segmentations kept in the cache.
+    """
+
+    def __init__(self, segmentation_path=DEFAULT_SEGMENTATION_FILE, model_path=DEFAULT_MODEL_FILE, cache_size=65536):
+        """
+        Initializes a MorfessorSegmenter instance.
+
+        Args:
+            segmentation_path (str or Path, optional): Segmentation file. Defaults to morf_isc_segm next to this file.
+            model_path (str or Path, optional): Binary Morfessor model. Defaults to morf_isc_model.bin next to this file.
+            cache_size (int, optional): Maximum number of cached Viterbi segmentations. Defaults to 65536.
+        """
+        self.segmentation_path = Path(segmentation_path)
+        self.model_path = Path(model_path)
+        self.cache_size = cache_size
+        self.table = read_segmentation_table(self.segmentation_path)
+        self._model = None
+        self._viterbi_cached = functools.lru_cache(maxsize=cache_size)(self._viterbi)
+
+    def __getstate__(self):
+        # Workers rebuild the table and cache from the file paths instead of pickling them
+        return {"segmentation_path": self.segmentation_path, "model_path": self.model_path,
+                "cache_size": self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def model(self):
+        """The Morfessor model, loaded on first use."""
+        if self._model is None:
+            import morfessor
+            self._model = morfessor.MorfessorIO().read_binary_model_file(str(self.model_path))
+        return self._model
+
+    def _viterbi(self, word):
+        return tuple(self.model.viterbi_segment(word)[0])
+
+    def segment(self, word):
+        """
+        Segment a single word.
+
+        Args:
+            word (str): The word.
+
+        Returns:
+            tuple: The morphs of the word.
+        """
+        morphs = self.table.get(word)
+        if morphs is None:
+            morphs = self._viterbi_cached(word)
+        return morphs
+
+    def segment_words(self, words):
+        """
+        Segment a list of words and concatenate their morphs.
+
+        Args:
+            words (list): List of words.
+
+        Returns:
+            list: Morphs of all the words, in order.
+        """
+        segmented_words = []
+        for word in words:
+            segmented_words.extend(self.segment(word))
+        return segmented_words
+
+    def segment_sentence(self, sentence):
+        """
+        Segment a whitespace-tokenized sentence.
+
+        Args:
+            sentence (str): The sentence.
+
+        Returns:
+            list: Morphs of all the words of the sentence, in order.
+        """
+        return self.segment_words(sentence.split())
+
+    def segment_sentences(self, sentences, processes=None, chunksize=512):
+        """
+        Segment a batch of sentences, optionally across worker processes.
+
+        Args:
+            sentences (list): Sentences to segment.
+            processes (int, optional): Number of worker processes. Defaults to None (segment in this process).
+            chunksize (int, optional): Sentences sent to a worker at a time. Defaults to 512.
+
+        Returns:
+            list: One list of morphs per sentence.
+        """
+        if not processes or processes <= 1:
+            return [self.segment_sentence(sentence) for sentence in sentences]
+        with Pool(processes, initializer=_init_worker, initargs=(self,)) as pool:
+            return pool.map(_segment_in_worker, sentences, chunksize=chunksize)
+
+    def cache_info(self):
+        """
+        Returns the table size and the Viterbi cache statistics.
+
+        Returns:
+            dict: Table size, cache hits, misses and current size.
+        """
+        info = self._viterbi_cached.cache_info()
+        return {"table_size": len(self.table), "hits": info.hits, "misses": info.misses,
+                "cache_size": info.currsize, "cache_maxsize": info.maxsize}
+
+
+_worker_segmenter = None
+
+
+def _init_worker(segmenter):
+    global _worker_segmenter
+    _worker_segmenter = segmenter
+
+
+def _segment_in_worker(sentence):
+    return _worker_segmenter.segment_sentence(sentence)
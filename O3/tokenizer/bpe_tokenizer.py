@@ -0,0 +1,202 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import sentencepiece as spm
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+DEFAULT_MODEL_FILE = THIS_FOLDER / "spbpe_isc.model"
+
+
+def tokenize_with_bpe(sp_bpe, words):
+    """
+    Reference per-word tokenization, as done in the word2vec and BDI notebooks.
+
+    Args:
+        sp_bpe (spm.SentencePieceProcessor): Loaded SentencePiece model.
+        words (list): List of words.
+
+    Returns:
+        list: BPE pieces of all the words, in order.
+    """
+    bpe_tokenized = []
+    for word in words:
+        tokens = sp_bpe.encode(word, out_type=str)
+        bpe_tokenized.extend(tokens)
+    return bpe_tokenized
+
+
+class BPETokenizer:
+    """
+    Batched, type-deduplicated wrapper around the Iskonawa SentencePiece BPE model.
+
+    Every distinct word is encoded once with SentencePiece's batch API and the result is fanned
+    back out to all its occurrences. Outputs are ragged integer arrays: a flat `ids` array plus
+    an `offsets` array where the pieces of item i are ids[offsets[i]:offsets[i + 1]].
+
+    Attributes:
+        sp (spm.SentencePieceProcessor): The loaded SentencePiece model.
+        num_threads (int): Threads used by SentencePiece for batch encoding (-1 for all cores).
+    """
+
+    def __init__(self, model_path=DEFAULT_MODEL_FILE, num_threads=-1):
+        """
+        Initializes a BPETokenizer instance.
+
+        Args:
+            model_path (str or Path, optional): SentencePiece model. Defaults to spbpe_isc.model next to this file.
+            num_threads (int, optional): Threads for batch encoding. Defaults to -1 (all cores).
+        """
+        self.model_path = Path(model_path)
+        self.num_threads = num_threads
+        self.sp = spm.SentencePieceProcessor()
+        self.sp.load(str(self.model_path))
+
+    def __len__(self):
+        return self.sp.get_piece_size()
+
+    def encode_types(self, words):
+        """
+        Encode the distinct words of a list in one batch call.
+
+        Args:
+            words (iterable): Words, possibly repeated.
+
+        Returns:
+            tuple: (types, ids, offsets) where `types` lists the distinct words in order of first
+                   appearance and their pieces are laid out in `ids` according to `offsets`.
+        """
+        types = list(dict.fromkeys(words))
+        encoded = self.sp.encode(types, out_type=int, num_threads=self.num_threads) if types else []
+        lengths = np.fromiter((len(pieces) for pieces in encoded), dtype=np.int64, count=len(encoded))
+        offsets = np.zeros(len(types) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        ids = np.fromiter((piece for pieces in encoded for piece in pieces), dtype=np.int32, count=int(offsets[-1]))
+        return types, ids, offsets
+
+    def encode_words(self, words):
+        """
+        Encode a list of words into a ragged integer array, one row per word.
+
+        Args:
+            words (list): Words, possibly repeated.
+
+        Returns:
+            tuple: (ids, offsets) as np.int32 and np.int64 arrays.
+        """
+        types, type_ids, type_offsets = self.encode_types(words)
+        type_index = {word: i for i, word in enumerate(types)}
+        rows = np.fromiter((type_index[word] for word in words), dtype=np.int64, count=len(words))
+        return self._gather(rows, type_ids, type_offsets)
+
+    def encode_sentences(self, sentences):
+        """
+        Encode whitespace-tokenized sentences into a ragged integer array, one row per sentence.
+
+        Args:
+            sentences (list): Sentences.
+
+        Returns:
+            tuple: (ids, offsets) as np.int32 and np.int64 arrays.
+        """
+        tokenized = [sentence.split() for sentence in sentences]
+        word_ids, word_offsets = self.encode_words([word for words in tokenized for word in words])
+
+        # A sentence spans the pieces of its words, which are contiguous in word_ids
+        word_counts = np.fromiter((len(words) for words in tokenized), dtype=np.int64, count=len(tokenized))
+        word_bounds = np.zeros(len(tokenized) + 1, dtype=np.int64)
+        np.cumsum(word_counts, out=word_bounds[1:])
+        return word_ids, word_offsets[word_bounds]
+
+    def tokenize_words(self, words):
+        """
+        Drop-in replacement for tokenize_with_bpe returning piece strings.
+
+        Args:
+            words (list): List of words.
+
+        Returns:
+            list: BPE pieces of all the words, in order.
+        """
+        ids, _ = self.encode_words(words)
+        return self.ids_to_pieces(ids)
+
+    def ids_to_pieces(self, ids):
+        """
+        Convert piece IDs back to piece strings.
+
+        Args:
+            ids (np.ndarray): Piece IDs.
+
+        Returns:
+            list: Piece strings.
+        """
+        return [self.sp.id_to_piece(int(i)) for i in ids]
+
+    @staticmethod
+    def _gather(rows, ids, offsets):
+        """Select rows of a ragged array, returning a new ragged array."""
+        lengths = offsets[rows + 1] - offsets[rows]
+        new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=new_offsets[1:])
+        # Position of every output piece in the source array
+        starts = np.repeat(offsets[rows] - new_offsets[:-1], lengths)
+        positions = starts + np.arange(new_offsets[-1], dtype=np.int64)
+        return ids[positions], new_offsets
+
+
+def benchmark(sentences, model_path=DEFAULT_MODEL_FILE, repeat=3):
+    """
+    Time the per-word tokenization loop against the batched tokenizer.
+
+    Both return the BPE pieces of the words of all the sentences, which are checked to be equal
+    before timing.
+
+    Args:
+        sentences (list): Sentences to tokenize.
+        model_path (str or Path, optional): SentencePiece model. Defaults to spbpe_isc.model.
+        repeat (int, optional): Number of timed runs; the best one is reported. Defaults to 3.
+
+    Returns:
+        dict: Best time in seconds and words per second for each method.
+    """
+    sp_bpe = spm.SentencePieceProcessor()
+    sp_bpe.load(str(model_path))
+    tokenizer = BPETokenizer(model_path)
+    words = [word for sentence in sentences for word in sentence.split()]
+    n_words = len(words)
+
+    def best_of(function):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    # Both methods return piece strings, so they are timed on the same work
+    assert tokenizer.tokenize_words(words) == tokenize_with_bpe(sp_bpe, words), "BPE pieces differ"
+    loop_seconds = best_of(lambda: tokenize_with_bpe(sp_bpe, words))
+    batch_seconds = best_of(lambda: tokenizer.tokenize_words(words))
+    return {
+        "sentences": len(sentences),
+        "words": n_words,
+        "loop_seconds": round(loop_seconds, 4),
+        "batch_seconds": round(batch_seconds, 4),
+        "loop_words_per_second": round(n_words / loop_seconds),
+        "batch_words_per_second": round(n_words / batch_seconds),
+        "speedup": round(loop_seconds / batch_seconds, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark batched BPE tokenization against the per-word loop.")
+    parser.add_argument("sentences", help="Text file with one sentence per line")
+    parser.add_argument("--model", default=str(DEFAULT_MODEL_FILE), help="SentencePiece model")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the corpus this many times")
+    args = parser.parse_args()
+
+    with open(args.sentences, "r", encoding="utf-8") as f:
+        sentences = [line.strip() for line in f if line.strip()] * args.scale
+    print(benchmark(sentences, args.model))
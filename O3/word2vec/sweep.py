@@ -0,0 +1,399 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+
+# Same grid as the one explored in bpe2vec.ipynb
+PARAM_GRID = [
+    {"vector_size": 100, "window": 5, "min_count": 1},
+    {"vector_size": 128, "window": 5, "min_count": 1},
+    {"vector_size": 254, "window": 5, "min_count": 1},
+    {"vector_size": 300, "window": 5, "min_count": 1},
+
+    {"vector_size": 128, "window": 10, "min_count": 1},
+    {"vector_size": 254, "window": 10, "min_count": 1},
+    {"vector_size": 300, "window": 10, "min_count": 1},
+
+    {"vector_size": 128, "window": 5, "min_count": 2},
+    {"vector_size": 150, "window": 5, "min_count": 2},
+    {"vector_size": 254, "window": 5, "min_count": 2},
+    {"vector_size": 300, "window": 5, "min_count": 2},
+
+    {"vector_size": 128, "window": 10, "min_count": 2},
+    {"vector_size": 254, "window": 10, "min_count": 2},
+    {"vector_size": 300, "window": 10, "min_count": 2},
+
+    {"vector_size": 128, "window": 5, "min_count": 3},
+    {"vector_size": 254, "window": 5, "min_count": 3},
+    {"vector_size": 300, "window": 5, "min_count": 3},
+
+    {"vector_size": 128, "window": 10, "min_count": 3},
+    {"vector_size": 254, "window": 10, "min_count": 3},
+    {"vector_size": 300, "window": 10, "min_count": 3},
+]
+
+
+def load_segmenter(segmentation):
+    """
+    Get a function that splits a sentence into training tokens.
+
+    Args:
+        segmentation (str): "raw" (whitespace), "bpe" (spbpe_isc.model) or "morfessor" (morf_isc_segm).
+
+    Returns:
+        callable: Function that takes a sentence and returns its list of tokens.
+
+    Raises:
+        ValueError: If the segmentation is not supported.
+    """
+    if segmentation == "raw":
+        return str.split
+    if segmentation == "bpe":
+        sys.path.insert(0, str(THIS_FOLDER.parent / "tokenizer"))
+        from bpe_tokenizer import BPETokenizer
+        tokenizer = BPETokenizer()
+        return lambda sentence: tokenizer.tokenize_words(sentence.split())
+    if segmentation == "morfessor":
+        sys.path.insert(0, str(THIS_FOLDER.parent / "morfessor"))
+        from segmenter import MorfessorSegmenter
+        return MorfessorSegmenter().segment_sentence
+    raise ValueError(f"Unsupported segmentation: {segmentation}")
+
+
+def write_corpus_file(sentences_path, output_path, segmentation="raw"):
+    """
+    Tokenize a sentence file once into gensim's corpus_file format (one space-separated sentence per line).
+
+    Args:
+        sentences_path (str or Path): Text file with one sentence per line.
+        output_path (str or Path): Where to write the tokenized corpus.
+        segmentation (str, optional): "raw", "bpe" or "morfessor". Defaults to "raw".
+
+    Returns:
+        Path: The output path.
+    """
+    segment = load_segmenter(segmentation)
+    output_path = Path(output_path)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(sentences_path, "r", encoding="utf-8") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+        for line in src:
+            tokens = segment(line.strip())
+            if tokens:
+                dst.write(" ".join(tokens) + "\n")
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def load_seed_pairs(file_path):
+    """
+    Load "source - target" word pairs, as in data/traintest.
+
+    Args:
+        file_path (str or Path): Seed pair file.
+
+    Returns:
+        list: (source_word, target_word) tuples.
+    """
+    pairs = []
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if " - " in line:
+                src_word, tgt_word = line.strip().split(" - ", 1)
+                pairs.append((src_word.strip(), tgt_word.strip()))
+    return pairs
+
+
+def prepare_bdi_targets(seed_pairs_path, tgt_vectors_path, output_path):
+    """
+    Look up the target embeddings of the seed pairs once, so workers do not load the target model.
+
+    Args:
+        seed_pairs_path (str or Path): Seed pair file.
+        tgt_vectors_path (str or Path): Target vectors; a FastText .bin, a word2vec .vec/.txt or a gensim KeyedVectors file.
+        output_path (str or Path): Where to write the .npz with the pairs and target matrix.
+
+    Returns:
+        Path: The output path.
+    """
+    from gensim.models import KeyedVectors
+    from gensim.models.fasttext import load_facebook_vectors
+
+    tgt_vectors_path = str(tgt_vectors_path)
+    if tgt_vectors_path.endswith(".bin"):
+        tgt_kv = load_facebook_vectors(tgt_vectors_path)
+    elif tgt_vectors_path.endswith((".vec", ".txt")):
+        tgt_kv = KeyedVectors.load_word2vec_format(tgt_vectors_path)
+    else:
+        tgt_kv = KeyedVectors.load(tgt_vectors_path)
+
+    pairs = [(src, tgt) for src, tgt in load_seed_pairs(seed_pairs_path) if tgt in tgt_kv]
+    np.savez(output_path,
+             src_words=np.array([src for src, _ in pairs]),
+             tgt_words=np.array([tgt for _, tgt in pairs]),
+             tgt_matrix=np.array([tgt_kv[tgt] for _, tgt in pairs], dtype=np.float32))
+    return Path(output_path)
+
+
+def config_id(model_type, segmentation, params):
+    """Stable identifier of a grid configuration, used for file names and resuming."""
+    key = json.dumps({"model": model_type, "segmentation": segmentation, **params}, sort_keys=True)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+
+
+def silhouette(kv, num_clusters=10, max_words=5000, seed=42):
+    """
+    Silhouette score of a KMeans clustering of the vocabulary vectors, as in bpe2vec.ipynb.
+
+    Args:
+        kv (gensim.models.KeyedVectors): The vectors.
+        num_clusters (int, optional): Number of clusters. Defaults to 10.
+        max_words (int, optional): Vocabulary sample size. Defaults to 5000.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        float: The silhouette score, or None if scikit-learn is not installed or the vocabulary is too small.
+    """
+    try:
+        from sklearn.cluster import KMeans
+        from sklearn.metrics import silhouette_score
+    except ImportError:
+        return None
+    vectors = kv.vectors[:max_words]
+    if len(vectors) <= num_clusters:
+        return None
+    labels = KMeans(n_clusters=num_clusters, random_state=seed, n_init=10).fit_predict(vectors)
+    return float(silhouette_score(vectors, labels))
+
+
+def bdi_precision(kv, segment, bdi_targets, ks=(1, 5, 10), test_size=0.2, seed=42):
+    """
+    Precision@k of a Procrustes mapping learned on the seed pairs.
+
+    Source words are embedded as the mean of their in-vocabulary tokens; pairs with no such
+    token are skipped.
+
+    Args:
+        kv (gensim.models.KeyedVectors): The source vectors.
+        segment (callable): The segmenter used to build the training corpus.
+        bdi_targets (str or Path): .npz written by prepare_bdi_targets.
+        ks (tuple, optional): Values of k. Defaults to (1, 5, 10).
+        test_size (float, optional): Fraction of pairs held out. Defaults to 0.2.
+        seed (int, optional): Seed of the train/test split. Defaults to 42.
+
+    Returns:
+        dict: "p@k" -> precision for every k, plus the number of pairs used.
+    """
+    data = np.load(bdi_targets)
+    src_rows, keep = [], []
+    for i, word in enumerate(data["src_words"]):
+        tokens = [token for token in segment(str(word)) if token in kv.key_to_index]
+        if tokens:
+            src_rows.append(np.mean([kv[token] for token in tokens], axis=0))
+            keep.append(i)
+    if len(keep) < 10:
+        return {"bdi_pairs": len(keep)}
+
+    X = np.array(src_rows, dtype=np.float32)
+    Y = data["tgt_matrix"][keep]
+    tgt_words = data["tgt_words"][keep]
+    X /= np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-8)
+    Y = Y / np.maximum(np.linalg.norm(Y, axis=1, keepdims=True), 1e-8)
+
+    order = np.random.default_rng(seed).permutation(len(keep))
+    n_test = max(1, int(len(keep) * test_size))
+    test, train = order[:n_test], order[n_test:]
+
+    # Procrustes mapping; handles different dimensions like learn_generalized_procrustes in bdi.ipynb
+    U, _, Vt = np.linalg.svd(X[train].T @ Y[train], full_matrices=False)
+    mapped = X[test] @ (U @ Vt)
+    similarities = mapped @ Y.T
+    ranking = np.argsort(-similarities, axis=1)
+
+    metrics = {"bdi_pairs": len(keep)}
+    for k in ks:
+        hits = [tgt_words[test[row]] in set(tgt_words[ranking[row, :k]]) for row in range(len(test))]
+        metrics[f"p@{k}"] = round(float(np.mean(hits)), 4)
+    return metrics
+
+
+def train_config(job):
+    """
+    Train and evaluate one grid configuration. Runs inside a worker process.
+
+    Args:
+        job (dict): Configuration id, model type, segmentation, params, corpus file, output
+                    folder, gensim workers and optional BDI targets.
+
+    Returns:
+        dict: The row written to the results table.
+    """
+    from gensim.models import FastText, Word2Vec
+
+    model_class = FastText if job["model_type"] == "fasttext" else Word2Vec
+    row = {"id": job["id"], "model": job["model_type"], "segmentation": job["segmentation"], **job["params"],
+           "workers": job["workers"]}
+    try:
+        start = time.perf_counter()
+        model = model_class(corpus_file=str(job["corpus_file"]), workers=job["workers"], **job["params"])
+        row["train_seconds"] = round(time.perf_counter() - start, 3)
+        row["vocab_size"] = len(model.wv)
+
+        model_path = Path(job["output_dir"]) / f"{job['model_type']}_{job['id']}.model"
+        model.save(str(model_path))
+        row["model_path"] = str(model_path)
+
+        row["silhouette"] = silhouette(model.wv)
+        if job.get("bdi_targets"):
+            row.update(bdi_precision(model.wv, load_segmenter(job["segmentation"]), job["bdi_targets"]))
+        row["status"] = "ok"
+    except Exception as e:
+        row["status"] = "failed"
+        row["error"] = repr(e)
+    return row
+
+
+def read_results(results_path):
+    """
+    Read the results table.
+
+    Args:
+        results_path (str or Path): JSON Lines results file.
+
+    Returns:
+        list: One dict per finished configuration.
+    """
+    rows = []
+    if Path(results_path).is_file():
+        with open(results_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        rows.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # Truncated line from a crash
+    return rows
+
+
+def clear_results(output_dir):
+    """
+    Delete the results table of a sweep and the models it lists.
+
+    Args:
+        output_dir (str or Path): Output folder of the sweep.
+
+    Returns:
+        int: Number of files deleted.
+    """
+    output_dir = Path(output_dir)
+    results_path = output_dir / "results.jsonl"
+    paths = [results_path] if results_path.is_file() else []
+    for row in read_results(results_path):
+        if row.get("model_path"):
+            model_path = Path(row["model_path"])
+            # gensim saves large arrays next to the model as <model>.<attribute>.npy
+            paths += [model_path] + list(model_path.parent.glob(model_path.name + ".*"))
+    paths = list(dict.fromkeys(paths))
+    for path in paths:
+        path.unlink(missing_ok=True)
+    return len(paths)
+
+
+def run_sweep(sentences_path, output_dir, param_grid=PARAM_GRID, model_type="word2vec", segmentation="raw",
+              cores=None, parallel_configs=None, bdi_targets=None, resume=True):
+    """
+    Train every configuration of a grid in parallel and record their metrics.
+
+    The corpus is tokenized once into `corpus.<segmentation>.txt` in the output folder and shared
+    by all workers through gensim's corpus_file mode. The core budget is split between configurations
+    running at the same time and the gensim `workers` of each one. Every finished configuration is
+    appended to `results.jsonl`, so an interrupted sweep can be resumed and skips what is already done.
+    Without `resume`, the previous results table and its models are deleted first (see clear_results).
+
+    Args:
+        sentences_path (str or Path): Text file with one sentence per line.
+        output_dir (str or Path): Folder for the corpus file, models and results table.
+        param_grid (list, optional): Gensim keyword arguments per configuration. Defaults to PARAM_GRID.
+        model_type (str, optional): "word2vec" or "fasttext". Defaults to "word2vec".
+        segmentation (str, optional): "raw", "bpe" or "morfessor". Defaults to "raw".
+        cores (int, optional): Total core budget. Defaults to os.cpu_count().
+        parallel_configs (int, optional): Configurations trained at the same time. Defaults to about sqrt(cores).
+        bdi_targets (str or Path, optional): .npz from prepare_bdi_targets to compute BDI P@k. Defaults to None.
+        resume (bool, optional): Skip configurations already in the results table, instead of
+            starting a new one. Defaults to True.
+
+    Returns:
+        list: Rows of the results table, including previously finished ones.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_path = output_dir / "results.jsonl"
+
+    corpus_file = output_dir / f"corpus.{segmentation}.txt"
+    if not (resume and corpus_file.is_file()):
+        write_corpus_file(sentences_path, corpus_file, segmentation)
+
+    cores = cores or os.cpu_count() or 1
+    parallel_configs = parallel_configs or max(1, int(cores ** 0.5))
+    workers = max(1, cores // parallel_configs)
+
+    if not resume:
+        clear_results(output_dir)
+    rows = read_results(results_path)
+    done = {row["id"] for row in rows if row.get("status") == "ok"}
+    jobs = []
+    for params in param_grid:
+        job_id = config_id(model_type, segmentation, params)
+        if job_id in done:
+            continue
+        jobs.append({"id": job_id, "model_type": model_type, "segmentation": segmentation, "params": params,
+                     "corpus_file": str(corpus_file), "output_dir": str(output_dir), "workers": workers,
+                     "bdi_targets": str(bdi_targets) if bdi_targets else None})
+
+    with ProcessPoolExecutor(max_workers=parallel_configs) as pool, open(results_path, "a", encoding="utf-8") as f:
+        futures = [pool.submit(train_config, job) for job in jobs]
+        for future in as_completed(futures):
+            row = future.result()
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            rows.append(row)
+            print(f"[{row['status']}] {row['id']} {row.get('train_seconds', '-')}s")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a word2vec/FastText hyperparameter grid in parallel.")
+    parser.add_argument("sentences", help="Text file with one sentence per line (e.g. isc_sentences.txt)")
+    parser.add_argument("output_dir", help="Folder for the corpus file, models and results.jsonl")
+    parser.add_argument("--model", choices=["word2vec", "fasttext"], default="word2vec")
+    parser.add_argument("--segmentation", choices=["raw", "bpe", "morfessor"], default="raw")
+    parser.add_argument("--grid", help="JSON file with a list of parameter dicts (defaults to PARAM_GRID)")
+    parser.add_argument("--cores", type=int, help="Total core budget")
+    parser.add_argument("--parallel-configs", type=int, help="Configurations trained at the same time")
+    parser.add_argument("--seed-pairs", help="Seed pair file for BDI P@k (requires --tgt-vectors)")
+    parser.add_argument("--tgt-vectors", help="Spanish vectors for BDI P@k")
+    parser.add_argument("--no-resume", action="store_true", help="Start from scratch, deleting the previous results and models")
+    args = parser.parse_args()
+
+    grid = PARAM_GRID
+    if args.grid:
+        with open(args.grid, "r", encoding="utf-8") as f:
+            grid = json.load(f)
+
+    bdi_targets = None
+    if args.seed_pairs and args.tgt_vectors:
+        bdi_targets = Path(args.output_dir) / "bdi_targets.npz"
+        if args.no_resume or not bdi_targets.is_file():
+            Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+            prepare_bdi_targets(args.seed_pairs, args.tgt_vectors, bdi_targets)
+
+    run_sweep(args.sentences, args.output_dir, grid, args.model, args.segmentation, args.cores,
+              args.parallel_configs, bdi_targets, resume=not args.no_resume)
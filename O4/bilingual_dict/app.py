@@ -1,8 +1,29 @@
-from flask import Flask, request, jsonify, render_template
-from model.model import load_embeddings, load_model, get_translation
+import time
+
+from flask import Flask, request, jsonify, render_template, g
+from model.model import add_seed_pairs, check_bundle, load_embeddings, load_model, reload_model, get_translation, resolve_word, result_cache
+from model.fuzzy import POLICIES
+from model.incremental import update_allowed
+from model.bundle import DIRECTIONS, get_live_bundle, list_versions, reload_status
+from model import metrics
+from model.memory import LANGUAGES, get_translation_memory, valid_k
+from model.lexicon import dictionary_translation, get_lexicon
 
 app = Flask(__name__)
 
+
+if metrics.ENABLED:
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        metrics.observe_request(request.endpoint or 'unknown', response.status_code,
+                                time.perf_counter() - g.request_start)
+        return response
+
+
 @app.route('/')
 def home():
     return jsonify({'message': 'API is running'})
@@ -10,22 +31,159 @@ def home():
 
 @app.route('/load', methods=['GET'])
 def load():
-    load_model()
+    try:
+        bundle = load_model()
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 503
+    if bundle.mapping_error is not None:
+        return jsonify({'message': 'Model loaded in reduced mode: only seed translations are served',
+                        'mapping_error': bundle.mapping_error})
     return jsonify({'message': 'Model loaded successfully'})
 
 
+@app.route('/model/version', methods=['GET'])
+def model_version():
+    bundle = get_live_bundle()
+    return jsonify({
+        'live': bundle.info() if bundle is not None else None,
+        'reload': reload_status(),
+        'available': list_versions(),
+    })
+
+
+@app.route('/model/reload', methods=['POST'])
+def model_reload():
+    version = (request.json or {}).get('version') if request.is_json else None
+    try:
+        started = reload_model(version)
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 422
+    if not started:
+        return jsonify({'error': 'A reload is already in progress'}), 409
+
+    return jsonify({'message': 'Reload started', 'version': version or 'base'}), 202
+
+
+@app.route('/model/pairs', methods=['POST'])
+def model_pairs():
+    if not update_allowed(request.remote_addr, request.headers.get('Authorization')):
+        return jsonify({'error': 'Forbidden'}), 403
+    pairs = (request.get_json(silent=True) or {}).get('pairs')
+    if not pairs or not all(isinstance(pair, list) and len(pair) == 2 and all(isinstance(w, str) and w.strip() for w in pair)
+                            for pair in pairs):
+        return jsonify({'error': 'Pairs must be a list of [iskonawa, spanish] words'}), 400
+    pairs = [(src.strip(), tgt.strip()) for src, tgt in pairs]
+    try:
+        result = add_seed_pairs(pairs)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+    return jsonify(result)
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.stats())
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    if not metrics.ENABLED:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return metrics.registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+@app.route('/memory/search', methods=['POST'])
+def memory_search():
+    query = request.json.get('query', '').strip()
+    lang = request.json.get('lang', 'isc')
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    if lang not in LANGUAGES:
+        return jsonify({'error': f"Lang must be one of {', '.join(LANGUAGES)}"}), 400
+    k = request.json.get('k', 5)
+    if not valid_k(k):
+        return jsonify({'error': 'K must be a positive integer'}), 400
+
+    matches = get_translation_memory().search(query, lang=lang, k=k)
+    return jsonify({'matches': matches})
+
+
+@app.route('/dictionary/lookup', methods=['POST'])
+def dictionary_lookup():
+    word = request.json.get('word', '').strip()
+    direction = request.json.get('direction', 'isc-es')
+    if not word:
+        return jsonify({'error': 'Word is required'}), 400
+    if direction not in DIRECTIONS:
+        return jsonify({'error': f"Direction must be one of {', '.join(DIRECTIONS)}"}), 400
+    lexicon = get_lexicon()
+    if lexicon is None:
+        return jsonify({'error': 'Dictionary database not built'}), 503
+
+    return jsonify({'entries': lexicon.translate(word, direction)})
+
+
+@app.route('/dictionary/search', methods=['POST'])
+def dictionary_search():
+    query = request.json.get('query', '').strip()
+    limit = request.json.get('limit', 20)
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    if not valid_k(limit):
+        return jsonify({'error': 'Limit must be a positive integer'}), 400
+    lexicon = get_lexicon()
+    if lexicon is None:
+        return jsonify({'error': 'Dictionary database not built'}), 503
+
+    return jsonify({'entries': lexicon.search_definitions(query, limit=limit)})
+
+
 @app.route('/translate', methods=['POST'])
 def translate():
-    word = request.json.get('word', '').strip()
+    with metrics.stage('parse'):
+        word = request.json.get('word', '').strip()
+        direction = request.json.get('direction', 'isc-es')
+        policy = request.json.get('fuzzy')
     if not word:
         return jsonify({'error': 'Word is required'}), 400
+    if direction not in DIRECTIONS:
+        return jsonify({'error': f"Direction must be one of {', '.join(DIRECTIONS)}"}), 400
+    if policy is not None and policy not in POLICIES:
+        return jsonify({'error': f"Fuzzy must be one of {', '.join(POLICIES)}"}), 400
+
+    # Exact dictionary entries take precedence over the embedding-based translation
+    lexicon = get_lexicon()
+    if lexicon is not None:
+        with metrics.stage('dictionary'):
+            entries = lexicon.translate(word, direction)
+        if entries:
+            return jsonify({'translation': dictionary_translation(entries, direction), 'source': 'dictionary',
+                            'entries': entries})
 
-    translation = get_translation(word)
+    translation = get_translation(word, direction=direction)
+    corrected = None
     if not translation:
-        return jsonify({'error': 'No translation found'}), 404
+        corrected, suggestions = resolve_word(word, direction, policy)
+        if corrected is None:
+            return jsonify({'error': 'No translation found', 'suggestions': suggestions}), 404
+        translation = get_translation(corrected, direction=direction)
 
-    return jsonify({'translation': translation})
+    with metrics.stage('serialize'):
+        if corrected is not None:
+            return jsonify({'translation': translation, 'source': 'embeddings',
+                            'corrected': {'from': word, 'to': corrected}})
+        return jsonify({'translation': translation, 'source': 'embeddings'})
 
 if __name__ == '__main__':
+    # A base bundle that does not fit the FastText models is served in reduced mode: say so now
+    try:
+        problem = check_bundle(strict=False)
+    except FileNotFoundError as e:
+        problem = str(e)
+    if problem:
+        app.logger.warning("Only the dictionary and the seed translations can be served: %s", problem)
     app.run(debug=True)
 
@@ -0,0 +1,252 @@
+"""
+ASGI serving mode for the bilingual dictionary API.
+
+Run with an ASGI server, e.g.:
+
+    hypercorn asgi:app --bind 0.0.0.0:5000
+
+Concurrent /translate requests are coalesced into micro-batches (see model/batching.py) and
+answered by one batched matrix product. The batching is configured through environment variables:
+
+    BATCH_WINDOW_MS     How long a batch waits for more requests (default 2).
+    MAX_BATCH_SIZE      Maximum number of words per batch (default 64).
+    MAX_CONCURRENCY     Maximum number of batches computed at the same time (default 2).
+
+Translation results are cached (see model/cache.py), sized by CACHE_SIZE (default 4096, 0 disables)
+and CACHE_TTL (seconds, default no expiry). Prometheus metrics are served on /metrics unless
+METRICS_ENABLED=0.
+
+/translate answers from the SQLite dictionary (see model/lexicon.py, LEXICON_DB) when the word has an
+exact entry, and falls back to the embeddings otherwise. Iskonawa words of the corpus vocabulary are
+served from the precomputed top-k table (see model/topk.py) when the live bundle has one; set
+TOPK_TABLE=0 to always compute translations live.
+
+POST /model/pairs adds seed pairs and refreshes the live mapping incrementally (see
+model/incremental.py). It only accepts requests from localhost with the header
+"Authorization: Bearer $MAPPING_UPDATE_TOKEN", and is disabled when that variable is unset.
+
+When the base bundle's mapping does not fit the FastText models (see check_bundle in
+model/model.py), the server warns at startup and /load puts the bundle live in reduced mode: it
+serves the dictionary and the seed translations, and /model/version reports the mapping error.
+"""
+import asyncio
+import functools
+import os
+import time
+
+from quart import Quart, request, jsonify, g
+from model.model import add_seed_pairs, check_bundle, load_model, reload_model, get_translations, resolve_word, result_cache
+from model.fuzzy import POLICIES
+from model.incremental import update_allowed
+from model.bundle import DIRECTIONS, get_live_bundle, list_versions, reload_status
+from model.batching import MicroBatcher
+from model import metrics
+from model.memory import LANGUAGES, get_translation_memory, valid_k
+from model.lexicon import dictionary_translation, get_lexicon
+
+app = Quart(__name__)
+
+batcher = MicroBatcher(
+    get_translations,
+    window_ms=float(os.environ.get('BATCH_WINDOW_MS', 2)),
+    max_batch_size=int(os.environ.get('MAX_BATCH_SIZE', 64)),
+    max_concurrency=int(os.environ.get('MAX_CONCURRENCY', 2)),
+)
+
+
+if metrics.ENABLED:
+    @app.before_request
+    async def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    async def record_request(response):
+        metrics.observe_request(request.endpoint or 'unknown', response.status_code,
+                                time.perf_counter() - g.request_start)
+        return response
+
+
+@app.before_serving
+async def startup():
+    # A base bundle that does not fit the FastText models is served in reduced mode: say so now
+    try:
+        problem = await asyncio.get_running_loop().run_in_executor(None, functools.partial(check_bundle, strict=False))
+    except FileNotFoundError as e:
+        problem = str(e)
+    if problem:
+        app.logger.warning("Only the dictionary and the seed translations can be served: %s", problem)
+    batcher.start()
+
+
+@app.after_serving
+async def shutdown():
+    await batcher.stop()
+
+
+@app.route('/')
+async def home():
+    return jsonify({'message': 'API is running'})
+
+
+@app.route('/load', methods=['GET'])
+async def load():
+    try:
+        bundle = await asyncio.get_running_loop().run_in_executor(None, load_model)
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 503
+    if bundle.mapping_error is not None:
+        return jsonify({'message': 'Model loaded in reduced mode: only seed translations are served',
+                        'mapping_error': bundle.mapping_error})
+    return jsonify({'message': 'Model loaded successfully'})
+
+
+@app.route('/model/version', methods=['GET'])
+async def model_version():
+    bundle = get_live_bundle()
+    return jsonify({
+        'live': bundle.info() if bundle is not None else None,
+        'reload': reload_status(),
+        'available': list_versions(),
+    })
+
+
+@app.route('/model/reload', methods=['POST'])
+async def model_reload():
+    version = ((await request.get_json(silent=True)) or {}).get('version')
+    try:
+        started = await asyncio.get_running_loop().run_in_executor(None, reload_model, version)
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 422
+    if not started:
+        return jsonify({'error': 'A reload is already in progress'}), 409
+
+    return jsonify({'message': 'Reload started', 'version': version or 'base'}), 202
+
+
+@app.route('/model/pairs', methods=['POST'])
+async def model_pairs():
+    if not update_allowed(request.remote_addr, request.headers.get('Authorization')):
+        return jsonify({'error': 'Forbidden'}), 403
+    body = (await request.get_json(silent=True)) or {}
+    pairs = body.get('pairs')
+    if not pairs or not all(isinstance(pair, list) and len(pair) == 2 and all(isinstance(w, str) and w.strip() for w in pair)
+                            for pair in pairs):
+        return jsonify({'error': 'Pairs must be a list of [iskonawa, spanish] words'}), 400
+    pairs = [(src.strip(), tgt.strip()) for src, tgt in pairs]
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(None, add_seed_pairs, pairs)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+    return jsonify(result)
+
+
+@app.route('/batching/stats', methods=['GET'])
+async def batching_stats():
+    return jsonify(batcher.stats())
+
+
+@app.route('/cache/stats', methods=['GET'])
+async def cache_stats():
+    return jsonify(result_cache.stats())
+
+
+@app.route('/metrics', methods=['GET'])
+async def prometheus_metrics():
+    if not metrics.ENABLED:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return metrics.registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+@app.route('/memory/search', methods=['POST'])
+async def memory_search():
+    body = (await request.get_json(silent=True)) or {}
+    query = body.get('query', '').strip()
+    lang = body.get('lang', 'isc')
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    if lang not in LANGUAGES:
+        return jsonify({'error': f"Lang must be one of {', '.join(LANGUAGES)}"}), 400
+    k = body.get('k', 5)
+    if not valid_k(k):
+        return jsonify({'error': 'K must be a positive integer'}), 400
+
+    memory = await asyncio.get_running_loop().run_in_executor(None, get_translation_memory)
+    matches = memory.search(query, lang=lang, k=k)
+    return jsonify({'matches': matches})
+
+
+@app.route('/dictionary/lookup', methods=['POST'])
+async def dictionary_lookup():
+    body = (await request.get_json(silent=True)) or {}
+    word = body.get('word', '').strip()
+    direction = body.get('direction', 'isc-es')
+    if not word:
+        return jsonify({'error': 'Word is required'}), 400
+    if direction not in DIRECTIONS:
+        return jsonify({'error': f"Direction must be one of {', '.join(DIRECTIONS)}"}), 400
+    lexicon = await asyncio.get_running_loop().run_in_executor(None, get_lexicon)
+    if lexicon is None:
+        return jsonify({'error': 'Dictionary database not built'}), 503
+
+    entries = await asyncio.get_running_loop().run_in_executor(None, lexicon.translate, word, direction)
+    return jsonify({'entries': entries})
+
+
+@app.route('/dictionary/search', methods=['POST'])
+async def dictionary_search():
+    body = (await request.get_json(silent=True)) or {}
+    query = body.get('query', '').strip()
+    limit = body.get('limit', 20)
+    if not query:
+        return jsonify({'error': 'Query is required'}), 400
+    if not valid_k(limit):
+        return jsonify({'error': 'Limit must be a positive integer'}), 400
+    lexicon = await asyncio.get_running_loop().run_in_executor(None, get_lexicon)
+    if lexicon is None:
+        return jsonify({'error': 'Dictionary database not built'}), 503
+
+    entries = await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(lexicon.search_definitions, query, limit=limit))
+    return jsonify({'entries': entries})
+
+
+@app.route('/translate', methods=['POST'])
+async def translate():
+    with metrics.stage('parse'):
+        body = (await request.get_json(silent=True)) or {}
+        word = body.get('word', '').strip()
+        direction = body.get('direction', 'isc-es')
+        policy = body.get('fuzzy')
+    if not word:
+        return jsonify({'error': 'Word is required'}), 400
+    if direction not in DIRECTIONS:
+        return jsonify({'error': f"Direction must be one of {', '.join(DIRECTIONS)}"}), 400
+    if policy is not None and policy not in POLICIES:
+        return jsonify({'error': f"Fuzzy must be one of {', '.join(POLICIES)}"}), 400
+
+    # Exact dictionary entries take precedence over the embedding-based translation
+    lexicon = await asyncio.get_running_loop().run_in_executor(None, get_lexicon)
+    if lexicon is not None:
+        with metrics.stage('dictionary'):
+            entries = await asyncio.get_running_loop().run_in_executor(None, lexicon.translate, word, direction)
+        if entries:
+            return jsonify({'translation': dictionary_translation(entries, direction), 'source': 'dictionary',
+                            'entries': entries})
+
+    translation = await batcher.translate(word, direction=direction)
+    corrected = None
+    if not translation:
+        corrected, suggestions = await asyncio.get_running_loop().run_in_executor(
+            None, resolve_word, word, direction, policy)
+        if corrected is None:
+            return jsonify({'error': 'No translation found', 'suggestions': suggestions}), 404
+        translation = await batcher.translate(corrected, direction=direction)
+
+    with metrics.stage('serialize'):
+        if corrected is not None:
+            return jsonify({'translation': translation, 'source': 'embeddings',
+                            'corrected': {'from': word, 'to': corrected}})
+        return jsonify({'translation': translation, 'source': 'embeddings'})
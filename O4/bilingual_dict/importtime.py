@@ -0,0 +1,60 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+LECTURA_FOLDER = THIS_FOLDER.parents[1] / "O1"
+
+# Module -> (import time budget in ms, heavy dependencies it must not import)
+BUDGETS = {
+    "model.model": (500, ("gensim", "sklearn", "pandas", "langdetect")),
+    "model.lexicon": (150, ("gensim", "sklearn", "pandas", "langdetect")),
+    "FuncionesLectura": (150, ("pandas", "langdetect")),
+}
+
+
+def measure(module):
+    """
+    Import a module in a fresh interpreter with `python -X importtime`.
+
+    Args:
+        module (str): Module name.
+
+    Returns:
+        tuple: (cumulative import time in ms, list of the modules it imported).
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(THIS_FOLDER), str(LECTURA_FOLDER),
+                                                        os.environ.get("PYTHONPATH", "")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c",
+                             f"import sys, {module}; print('\\n'.join(sys.modules))"],
+                            capture_output=True, text=True, env=env, cwd=THIS_FOLDER, check=True)
+    cumulative = None
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)$", line)
+        if match and match.group(2) == module:
+            cumulative = int(match.group(1)) / 1000
+    return cumulative, result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cold import time of the CLI-facing modules against a budget.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget (slow machines, CI)")
+    args = parser.parse_args()
+
+    failures = 0
+    for module, (budget, forbidden) in BUDGETS.items():
+        elapsed, loaded = measure(module)
+        heavy = [name for name in forbidden if name in loaded]
+        ok = elapsed is not None and elapsed <= budget * args.scale and not heavy
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {module}: {'?' if elapsed is None else round(elapsed)} ms "
+              f"(budget {budget * args.scale:.0f} ms)"
+              + (f", imports {', '.join(heavy)}" if heavy else ""))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from model.model import load_word_pairs
+
+
+def post_word(url, word):
+    """
+    Send one /translate request.
+
+    Args:
+        url (str): Base URL of the API.
+        word (str): Word to translate.
+
+    Returns:
+        tuple: (latency in seconds, HTTP status code).
+    """
+    body = json.dumps({'word': word}).encode('utf-8')
+    req = urllib.request.Request(url + '/translate', data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def run_load(url, words, n_requests, concurrency, seed=None):
+    """
+    Fire `n_requests` lookups at the API from `concurrency` client threads.
+
+    Args:
+        url (str): Base URL of the API.
+        words (list): Words to sample the requests from.
+        n_requests (int): Total number of requests.
+        concurrency (int): Number of concurrent clients.
+        seed (int, optional): Seed of the word sample, to replay the same requests. Defaults to None.
+
+    Returns:
+        dict: Throughput, latency percentiles and error count.
+    """
+    rng = random.Random(seed)
+    sample = [rng.choice(words) for _ in range(n_requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda word: post_word(url, word), sample))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'concurrency': concurrency,
+        'requests': n_requests,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(n_requests / elapsed, 1),
+        'p50_ms': round(statistics.median(latencies) * 1000, 2),
+        'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2),
+        'errors': sum(1 for _, status in results if status >= 500),
+    }
+
+
+def compare(urls, words, n_requests, concurrency_levels, seed=0):
+    """
+    Run the same workload against several servers, one concurrency level at a time.
+
+    Every server receives the same requests (the same word sample) at each level.
+
+    Args:
+        urls (dict): Label -> base URL, e.g. {'flask': ..., 'asgi': ...}.
+        words (list): Words to sample the requests from.
+        n_requests (int): Requests per server and concurrency level.
+        concurrency_levels (list): Concurrency levels.
+        seed (int, optional): Seed of the word sample. Defaults to 0.
+
+    Returns:
+        list: One dict per concurrency level, label -> run_load result.
+    """
+    return [{label: run_load(url, words, n_requests, concurrency, seed=seed + concurrency)
+             for label, url in urls.items()}
+            for concurrency in concurrency_levels]
+
+
+def print_comparison(rows, baseline='flask', candidate='asgi'):
+    """Print a comparison side by side, with the throughput and p95 speedup of `candidate` over `baseline`."""
+    columns = ('requests_per_second', 'p50_ms', 'p95_ms', 'errors')
+    print(f"{'conc':>5} | " + " | ".join(f"{label + ' req/s':>12} {'p50 ms':>8} {'p95 ms':>8} {'err':>4}"
+                                          for label in (baseline, candidate)) + f" | {'speedup':>7} {'p95 x':>6}")
+    for row in rows:
+        cells = " | ".join(" ".join(f"{row[label][column]:>{width}}" for column, width in zip(columns, (12, 8, 8, 4)))
+                           for label in (baseline, candidate))
+        speedup = row[candidate]['requests_per_second'] / row[baseline]['requests_per_second']
+        p95 = row[baseline]['p95_ms'] / row[candidate]['p95_ms'] if row[candidate]['p95_ms'] else float('nan')
+        print(f"{row[baseline]['concurrency']:>5} | {cells} | {speedup:>6.2f}x {p95:>5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the /translate endpoint.')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='Base URL of the API')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 64], help='Concurrency levels')
+    parser.add_argument('--pairs', default='data/traintest', help='Seed pair file to sample words from')
+    parser.add_argument('--compare', nargs=2, metavar=('FLASK_URL', 'ASGI_URL'),
+                        help='Run the same workload against the Flask and the ASGI servers and print them side by side')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the word sample in --compare mode')
+    args = parser.parse_args()
+
+    words, _ = load_word_pairs(args.pairs)
+
+    if args.compare:
+        urls = dict(zip(('flask', 'asgi'), args.compare))
+        for url in urls.values():
+            urllib.request.urlopen(url + '/load').read()
+        rows = compare(urls, words, args.requests, args.concurrency, args.seed)
+        for row in rows:
+            print(json.dumps(row))
+        print_comparison(rows)
+        return
+
+    urllib.request.urlopen(args.url + '/load').read()  # Make sure the model is loaded before timing
+
+    for concurrency in args.concurrency:
+        print(json.dumps(run_load(args.url, words, args.requests, concurrency)))
+
+
+if __name__ == '__main__':
+    main()
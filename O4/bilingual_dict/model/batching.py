@@ -0,0 +1,139 @@
+import asyncio
+import functools
+import time
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent translation requests into micro-batches.
+
+    Requests that arrive within `window_ms` of the first one in a batch (or until `max_batch_size`
+    requests are queued) are answered together by a single call to `translate_batch`, which runs in
+    the default thread pool so the event loop keeps accepting requests meanwhile.
+
+    Attributes:
+        translate_batch (callable): Function that takes (words, k, direction=...) and returns one result per word.
+        window_ms (float): How long to wait for more requests after the first one of a batch.
+        max_batch_size (int): Maximum number of words per batch.
+        max_concurrency (int): Maximum number of batches being computed at the same time.
+        batches (int): Number of batches computed so far.
+        requests (int): Number of requests answered so far.
+    """
+
+    def __init__(self, translate_batch, window_ms=2.0, max_batch_size=64, max_concurrency=2):
+        """
+        Initializes a MicroBatcher instance.
+
+        Args:
+            translate_batch (callable): Function that takes (words, k, direction=...) and returns one result per word.
+            window_ms (float, optional): Batching window in milliseconds. Defaults to 2.0.
+            max_batch_size (int, optional): Maximum number of words per batch. Defaults to 64.
+            max_concurrency (int, optional): Maximum number of batches computed at once. Defaults to 2.
+        """
+        self.translate_batch = translate_batch
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.batches = 0
+        self.requests = 0
+        self._queue = None
+        self._workers = []
+        self._dispatches = set()    # Batches being computed; the event loop only keeps weak references to tasks
+        self._semaphore = None
+
+    def start(self):
+        """Start the batching loop on the running event loop."""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._workers = [asyncio.create_task(self._run())]
+
+    async def stop(self):
+        """Stop the batching loop, after the batches already dispatched are answered."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await asyncio.gather(*self._dispatches, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def translate(self, word, k=5, direction="isc-es"):
+        """
+        Queue a word for translation and wait for its batch to be computed.
+
+        Args:
+            word (str): Word to translate.
+            k (int, optional): Number of nearest neighbors. Defaults to 5.
+            direction (str, optional): Translation direction. Defaults to "isc-es".
+
+        Returns:
+            list: The translation result for the word, or None if it was not found.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((word, (k, direction), future))
+        return await future
+
+    def stats(self):
+        """
+        Returns counters describing the batching so far.
+
+        Returns:
+            dict: Number of batches and requests, and the mean batch size.
+        """
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    async def _run(self):
+        """Collect requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.perf_counter() + self.window_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._semaphore.acquire()
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch):
+        """Compute one batch in the thread pool and resolve its futures."""
+        try:
+            # Requests with different k or direction are grouped so each group is one matrix product
+            groups = {}
+            for word, options, future in batch:
+                groups.setdefault(options, []).append((word, future))
+
+            loop = asyncio.get_running_loop()
+            for (k, direction), items in groups.items():
+                words = [word for word, _ in items]
+                try:
+                    results = await loop.run_in_executor(
+                        None, functools.partial(self.translate_batch, words, k, direction=direction))
+                except Exception as e:
+                    for _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+
+            self.batches += 1
+            self.requests += len(batch)
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,194 @@
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from model.bundle import DIRECTIONS
+from model.topk import tokenize, top_k_rows
+
+FORMATS = ("jsonl", "tsv")
+_shared = {}    # Memory-mapped arrays of the running job, opened once per worker process
+
+
+def read_word_types(file_path, text_column=None):
+    """
+    Count the word types of a plain text file or a JSON Lines corpus.
+
+    Args:
+        file_path (str or Path): Input file. It is read as JSON Lines when `text_column` is given
+            or the file ends in .json/.jsonl, and as plain text otherwise.
+        text_column (str, optional): Column with the text of each JSON line. Defaults to "transcription".
+
+    Returns:
+        Counter: Word -> frequency, in order of first appearance.
+    """
+    file_path = Path(file_path)
+    jsonl = text_column is not None or file_path.suffix in (".json", ".jsonl")
+    text_column = text_column or "transcription"
+    counts = Counter()
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if jsonl:
+                line = json.loads(line).get(text_column) if line.strip() else ""
+            counts.update(tokenize(line))
+    return counts
+
+
+def share_arrays(folder, bundle, words, embed, direction="isc-es", chunk_size=4096):
+    """
+    Write the arrays of a translation job as .npy files that every worker memory-maps.
+
+    The query embeddings are written chunk by chunk into a memory-mapped file, so a large
+    vocabulary never has to be held in memory at once.
+
+    Args:
+        folder (Path): Folder of the job.
+        bundle (ModelBundle): The bundle whose mapping and candidates are used.
+        words (list): Words to translate.
+        embed (callable): Function from a list of words to their embedding matrix.
+        direction (str, optional): "isc-es" or "es-isc". Defaults to "isc-es".
+        chunk_size (int, optional): Words embedded at a time. Defaults to 4096.
+    """
+    _, _, mapping, candidates_normed, _ = bundle.direction(direction)
+    np.save(folder / "mapping.npy", np.asarray(mapping))
+    np.save(folder / "candidates.npy", candidates_normed)
+    queries = np.lib.format.open_memmap(folder / "queries.npy", mode="w+", dtype=np.float32,
+                                        shape=(len(words), np.shape(mapping)[0]))
+    for start in range(0, len(words), chunk_size):
+        queries[start:start + chunk_size] = embed(words[start:start + chunk_size])
+    queries.flush()
+    del queries
+
+
+def _open_shared(folder):
+    """Memory-map the arrays of a job (run once in every worker)."""
+    folder = Path(folder)
+    for name in ("mapping", "candidates", "queries"):
+        _shared[name] = np.load(folder / f"{name}.npy", mmap_mode="r")
+
+
+def _translate_rows(job):
+    """Top-k candidate ids and scores of rows [start, stop) of the shared queries."""
+    start, stop, k = job
+    return top_k_rows(_shared["queries"][start:stop], _shared["mapping"], _shared["candidates"], k)
+
+
+def format_line(word, translations, count=None, seed=None, format="jsonl"):
+    """
+    One line of annotated output.
+
+    Args:
+        word (str): The word.
+        translations (list): (candidate, similarity) tuples, best first.
+        count (int, optional): Frequency of the word in the input. Defaults to None.
+        seed (str, optional): Translation of the word in the seed dictionary. Defaults to None.
+        format (str, optional): "jsonl" or "tsv". Defaults to "jsonl".
+
+    Returns:
+        str: The line, with its newline.
+    """
+    if format == "tsv":
+        candidates = " ".join(f"{candidate}:{score:.4f}" for candidate, score in translations)
+        return f"{word}\t{count if count is not None else ''}\t{seed or ''}\t{candidates}\n"
+    return json.dumps({"word": word, "count": count, "seed": seed,
+                       "translations": [[candidate, round(score, 6)] for candidate, score in translations]},
+                      ensure_ascii=False) + "\n"
+
+
+def translate_words(words, bundle, embed, output, k=5, direction="isc-es", counts=None, processes=None,
+                    chunk_size=4096, format="jsonl"):
+    """
+    Translate a list of word types with batched matrix products over a process pool.
+
+    The mapping, the candidate matrix and the query embeddings are written once to a temporary
+    folder and memory-mapped by every worker, so the model is shared rather than copied. Each
+    worker maps and ranks one chunk of rows; the chunks are written to `output` in input order
+    as soon as they are ready.
+
+    Args:
+        words (list): Distinct words to translate.
+        bundle (ModelBundle): The bundle to translate with.
+        embed (callable): Function from a list of words to their embedding matrix.
+        output (file): Text stream the annotated lines are written to.
+        k (int, optional): Candidates per word. Defaults to 5.
+        direction (str, optional): "isc-es" or "es-isc". Defaults to "isc-es".
+        counts (dict, optional): Word -> frequency, written next to each word. Defaults to None.
+        processes (int, optional): Worker processes; 1 translates in this process. Defaults to the number of CPUs.
+        chunk_size (int, optional): Words per matrix block. Defaults to 4096.
+        format (str, optional): "jsonl" or "tsv". Defaults to "jsonl".
+
+    Returns:
+        int: Number of words written.
+
+    Raises:
+        ValueError: If the format or the direction is not supported.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported output format: {format}")
+    _, query_index, _, _, candidate_words = bundle.direction(direction)
+    k = min(k, len(candidate_words))
+    counts = counts or {}
+
+    folder = Path(tempfile.mkdtemp(prefix="bulk-translation-"))
+    try:
+        share_arrays(folder, bundle, words, embed, direction, chunk_size)
+        jobs = [(start, min(start + chunk_size, len(words)), k) for start in range(0, len(words), chunk_size)]
+        if processes == 1 or len(jobs) <= 1:
+            _open_shared(folder)
+            executor = None
+            results = map(_translate_rows, jobs)
+        else:
+            executor = ProcessPoolExecutor(max_workers=processes, initializer=_open_shared, initargs=(str(folder),))
+            results = executor.map(_translate_rows, jobs)
+        try:
+            for (start, stop, _), (ids, scores) in zip(jobs, results):
+                for word, row_ids, row_scores in zip(words[start:stop], ids, scores):
+                    seed = candidate_words[query_index[word]] if word in query_index else None
+                    translations = [(candidate_words[i], float(s)) for i, s in zip(row_ids, row_scores)]
+                    output.write(format_line(word, translations, counts.get(word), seed, format))
+                output.flush()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            _shared.clear()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return len(words)
+
+
+if __name__ == "__main__":
+    from model import model
+
+    parser = argparse.ArgumentParser(description="Translate every word type of a text file or JSON Lines corpus.")
+    parser.add_argument("input", help="Plain text file, or JSON Lines corpus (.json/.jsonl or --text-column)")
+    parser.add_argument("--output", default="-", help="Output file (default: standard output)")
+    parser.add_argument("--text-column", help="Column with the text of each JSON line (default: transcription)")
+    parser.add_argument("--direction", choices=DIRECTIONS, default="isc-es")
+    parser.add_argument("--k", type=int, default=5, help="Candidates per word")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--processes", type=int, help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Words per matrix block")
+    parser.add_argument("--version", help="Bundle version (default: base)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = read_word_types(args.input, args.text_column)
+    bundle = model.build_bundle(args.version)
+    fasttext_model = model.src_model if args.direction == "isc-es" else model.tgt_model
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        total = translate_words(list(counts), bundle, lambda words: model.get_word_embeddings(words, fasttext_model),
+                                output, k=args.k, direction=args.direction, counts=counts,
+                                processes=args.processes, chunk_size=args.chunk_size, format=args.format)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Translated {total} word types ({sum(counts.values())} tokens) in {time.perf_counter() - start:.1f} s",
+          file=sys.stderr)
@@ -0,0 +1,350 @@
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+BUNDLES_FOLDER = THIS_FOLDER / "bundles"  # One sub-folder per version: bundles/<version>/{model.bin, traintest}
+BASE_VERSION = "base"                     # The mapping and seed pairs shipped next to this file
+REVERSE_MAPPING_FILE = "model_reverse.bin"  # Optional separately trained Spanish -> Iskonawa mapping
+DIRECTIONS = ("isc-es", "es-isc")         # Translation directions served by a bundle
+
+_live_bundle = None         # The bundle currently answering requests
+_swap_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_reload_status = {"state": "idle", "version": None, "error": None, "finished_at": None}
+_swap_listeners = []        # Called with the new bundle every time one goes live
+
+
+def normalize_rows(matrix):
+    """
+    Scale every row of a matrix to unit length, leaving all-zero rows untouched.
+
+    Args:
+        matrix (np.ndarray): Matrix of shape (n_rows, dim).
+
+    Returns:
+        np.ndarray: Row-normalized float32 copy of the matrix.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class ModelBundle:
+    """
+    An immutable snapshot of the seed dictionary and the trained mapping.
+
+    Requests take a reference to the live bundle for their whole duration, so a reload
+    can swap a new bundle in while the old one finishes serving the requests it already has.
+
+    Attributes:
+        version (str): Name of the bundle version.
+        checksum (str): Short SHA-1 of the mapping and seed pair files.
+        src_words (list): List of source vocabulary words.
+        tgt_words (list): List of target vocabulary words.
+        src_embeddings (dict): Source word embeddings (word -> embedding).
+        tgt_embeddings (dict): Target word embeddings (word -> embedding).
+        trained_mapping (np.ndarray): Mapping matrix of shape (src_dim, tgt_dim).
+        reverse_mapping (np.ndarray): Mapping matrix of shape (tgt_dim, src_dim) for Spanish -> Iskonawa lookups.
+        tgt_matrix (np.ndarray): Target embeddings stacked in the order of tgt_words.
+        tgt_matrix_normed (np.ndarray): tgt_matrix with unit-length rows, for cosine similarity by dot product.
+        src_matrix_normed (np.ndarray): Source embeddings with unit-length rows, in the order of src_words.
+        src_index (dict): Source word -> position in src_words.
+        tgt_index (dict): Target word -> position in tgt_words.
+        load_seconds (float): Time it took to build the bundle.
+        loaded_at (float): UNIX time at which the bundle was built.
+        mapping_error (str): Why the mapping does not fit the embeddings, or None. A bundle with a
+            mapping error is in reduced mode: it only serves the seed translations.
+    """
+
+    def __init__(self, version, checksum, src_words, tgt_words, src_embeddings, tgt_embeddings,
+                 trained_mapping, reverse_mapping=None, load_seconds=0.0, mapping_error=None):
+        """
+        Initializes a ModelBundle instance.
+
+        Args:
+            version (str): Name of the bundle version.
+            checksum (str): Short SHA-1 of the mapping and seed pair files.
+            src_words (list): List of source vocabulary words.
+            tgt_words (list): List of target vocabulary words.
+            src_embeddings (dict): Source word embeddings (word -> embedding).
+            tgt_embeddings (dict): Target word embeddings (word -> embedding).
+            trained_mapping (np.ndarray): Mapping matrix of shape (src_dim, tgt_dim).
+            reverse_mapping (np.ndarray, optional): Mapping matrix of shape (tgt_dim, src_dim). Defaults to the
+                pseudo-inverse of trained_mapping (its transpose when the mapping is orthogonal).
+            load_seconds (float, optional): Time it took to build the bundle. Defaults to 0.0.
+            mapping_error (str, optional): Why the mapping does not fit the embeddings. Defaults to None.
+        """
+        self.version = version
+        self.checksum = checksum
+        self.src_words = src_words
+        self.tgt_words = tgt_words
+        self.src_embeddings = src_embeddings
+        self.tgt_embeddings = tgt_embeddings
+        self.trained_mapping = trained_mapping
+        self.mapping_error = mapping_error
+        self.reverse_mapping = reverse_mapping
+        if reverse_mapping is None and mapping_error is None:
+            self.reverse_mapping = np.linalg.pinv(trained_mapping)
+        self.tgt_matrix = np.array([tgt_embeddings[w] for w in tgt_words])
+        self.tgt_matrix_normed = normalize_rows(self.tgt_matrix)
+        self.src_matrix_normed = normalize_rows([src_embeddings[w] for w in src_words])
+        self.src_index = {}
+        for idx, word in enumerate(src_words):
+            self.src_index.setdefault(word, idx)
+        self.tgt_index = {}
+        for idx, word in enumerate(tgt_words):
+            self.tgt_index.setdefault(word, idx)
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self._drained = threading.Event()
+        self._drained.set()
+
+    def direction(self, direction):
+        """
+        Get everything needed to translate in one direction.
+
+        Args:
+            direction (str): "isc-es" (Iskonawa -> Spanish) or "es-isc" (Spanish -> Iskonawa).
+
+        Returns:
+            tuple: (query_embeddings, query_index, mapping, candidate_matrix_normed, candidate_words).
+
+        Raises:
+            ValueError: If the direction is not supported.
+        """
+        if direction == "isc-es":
+            return self.src_embeddings, self.src_index, self.trained_mapping, self.tgt_matrix_normed, self.tgt_words
+        if direction == "es-isc":
+            return self.tgt_embeddings, self.tgt_index, self.reverse_mapping, self.src_matrix_normed, self.src_words
+        raise ValueError(f"Unsupported direction: {direction}")
+
+    def acquire(self):
+        """Registers a request that is using this bundle."""
+        with self._lock:
+            self.in_flight += 1
+            self._drained.clear()
+
+    def release(self):
+        """Unregisters a request that was using this bundle."""
+        with self._lock:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._drained.set()
+
+    def wait_drained(self, timeout=None):
+        """
+        Blocks until no request is using this bundle.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to None (wait forever).
+
+        Returns:
+            bool: True if the bundle was drained, False if the timeout expired.
+        """
+        return self._drained.wait(timeout)
+
+    def info(self):
+        """
+        Returns a JSON-serializable description of the bundle.
+
+        Returns:
+            dict: Version, checksum, vocabulary sizes, load timings and, in reduced mode, the mapping error.
+        """
+        return {
+            "version": self.version,
+            "checksum": self.checksum,
+            "src_words": len(self.src_words),
+            "tgt_words": len(self.tgt_words),
+            "mapping_shape": list(np.shape(self.trained_mapping)),
+            "reduced": self.mapping_error is not None,
+            "mapping_error": self.mapping_error,
+            "directions": list(DIRECTIONS),
+            "load_seconds": round(self.load_seconds, 3),
+            "loaded_at": self.loaded_at,
+            "in_flight": self.in_flight,
+        }
+
+
+def bundle_paths(version=None):
+    """
+    Get the mapping and seed pair files of a bundle version.
+
+    Args:
+        version (str, optional): Bundle version. Defaults to the base bundle.
+
+    Returns:
+        tuple: (mapping_path, pairs_path) as Path objects.
+
+    Raises:
+        FileNotFoundError: If the version does not exist.
+    """
+    if version is None or version == BASE_VERSION:
+        mapping_path, pairs_path = THIS_FOLDER / "model.bin", THIS_FOLDER / "data/traintest"
+    else:
+        folder = BUNDLES_FOLDER / version
+        if folder.parent != BUNDLES_FOLDER:
+            raise FileNotFoundError(f"Invalid bundle version: {version}")
+        mapping_path, pairs_path = folder / "model.bin", folder / "traintest"
+
+    for path in (mapping_path, pairs_path):
+        if not path.is_file():
+            raise FileNotFoundError(f"Missing bundle file: {path}")
+    return mapping_path, pairs_path
+
+
+def reverse_mapping_path(version=None):
+    """
+    Get the separately trained Spanish -> Iskonawa mapping of a bundle version, if it has one.
+
+    Args:
+        version (str, optional): Bundle version. Defaults to the base bundle.
+
+    Returns:
+        Path: The mapping file, or None if the bundle only has the forward mapping.
+    """
+    mapping_path, _ = bundle_paths(version)
+    path = mapping_path.parent / REVERSE_MAPPING_FILE
+    return path if path.is_file() else None
+
+
+def bundle_checksum(*paths):
+    """
+    Compute a short SHA-1 over the contents of the given files.
+
+    Args:
+        *paths (Path): Files to hash, in order.
+
+    Returns:
+        str: First 12 hex digits of the digest.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 16), b""):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def list_versions():
+    """
+    List the bundle versions available on disk.
+
+    Returns:
+        list: Version names, starting with the base bundle.
+    """
+    versions = [BASE_VERSION]
+    if BUNDLES_FOLDER.is_dir():
+        versions += sorted(p.name for p in BUNDLES_FOLDER.iterdir()
+                           if (p / "model.bin").is_file() and (p / "traintest").is_file())
+    return versions
+
+
+def get_live_bundle():
+    """Return the bundle currently answering requests, or None if no model is loaded."""
+    return _live_bundle
+
+
+@contextmanager
+def using_bundle():
+    """
+    Context manager that pins the live bundle for the duration of a request.
+
+    Yields:
+        ModelBundle: The live bundle, or None if no model is loaded.
+    """
+    with _swap_lock:
+        bundle = _live_bundle
+        if bundle is not None:
+            bundle.acquire()
+    try:
+        yield bundle
+    finally:
+        if bundle is not None:
+            bundle.release()
+
+
+def swap_bundle(bundle, drain_timeout=30.0):
+    """
+    Atomically make `bundle` the live bundle and wait for the old one to drain.
+
+    Args:
+        bundle (ModelBundle): The new bundle.
+        drain_timeout (float, optional): Seconds to wait for in-flight requests on the old bundle. Defaults to 30.0.
+
+    Returns:
+        ModelBundle: The bundle that was replaced, or None.
+    """
+    global _live_bundle
+    with _swap_lock:
+        old_bundle, _live_bundle = _live_bundle, bundle
+    for listener in _swap_listeners:
+        listener(bundle)
+    if old_bundle is not None:
+        old_bundle.wait_drained(drain_timeout)
+    return old_bundle
+
+
+def add_swap_listener(listener):
+    """
+    Register a function to be called with the new bundle every time a bundle goes live.
+
+    Args:
+        listener (callable): Function that takes a ModelBundle.
+    """
+    _swap_listeners.append(listener)
+
+
+def reload_status():
+    """Return a copy of the state of the last reload."""
+    return dict(_reload_status)
+
+
+def start_reload(build_bundle, version=None, background=True, drain_timeout=30.0):
+    """
+    Build a bundle version and swap it in, optionally in a background thread.
+
+    Only one reload runs at a time; the live bundle keeps serving until the new one is ready.
+
+    Args:
+        build_bundle (callable): Function that takes a version and returns a ModelBundle.
+        version (str, optional): Bundle version to load. Defaults to the base bundle.
+        background (bool, optional): Whether to load in a background thread. Defaults to True.
+        drain_timeout (float, optional): Seconds to wait for the old bundle to drain. Defaults to 30.0.
+
+    Returns:
+        bool: False if another reload is already running, True otherwise.
+
+    Raises:
+        FileNotFoundError: If the version does not exist.
+    """
+    version = version or BASE_VERSION
+    bundle_paths(version)  # Fail fast on unknown versions
+
+    if not _reload_lock.acquire(blocking=False):
+        return False
+    _reload_status.update(state="loading", version=version, error=None, finished_at=None)
+
+    def run():
+        try:
+            swap_bundle(build_bundle(version), drain_timeout)
+            _reload_status.update(state="idle")
+        except Exception as e:
+            _reload_status.update(state="failed", error=str(e))
+        finally:
+            _reload_status.update(finished_at=time.time())
+            _reload_lock.release()
+
+    if background:
+        threading.Thread(target=run, name=f"reload-{version}", daemon=True).start()
+    else:
+        run()
+    return True
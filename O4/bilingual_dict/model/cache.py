@@ -0,0 +1,103 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    A thread-safe LRU cache with an optional time-to-live per entry.
+
+    Attributes:
+        maxsize (int): Maximum number of entries; the least recently used entry is evicted first.
+        ttl (float): Seconds an entry stays valid, or None for no expiry.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that were not in the cache (or had expired).
+        evictions (int): Number of entries dropped to respect maxsize.
+        expirations (int): Number of entries dropped because their TTL had passed.
+    """
+
+    def __init__(self, maxsize=4096, ttl=None):
+        """
+        Initializes a ResultCache instance.
+
+        Args:
+            maxsize (int, optional): Maximum number of entries. Defaults to 4096. Use 0 to disable caching.
+            ttl (float, optional): Seconds an entry stays valid. Defaults to None (no expiry).
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        """
+        Look up a key, refreshing its position in the LRU order.
+
+        Args:
+            key (hashable): The cache key.
+            default (optional): Value returned on a miss. Defaults to None.
+
+        Returns:
+            The cached value, or `default`.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (hashable): The cache key.
+            value: The value to store.
+        """
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, keeping the counters."""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Size, limits, hit/miss counts and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
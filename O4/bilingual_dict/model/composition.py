@@ -0,0 +1,208 @@
+import numpy as np
+
+POOLING_METHODS = ("sum", "mean", "sif")
+OOV_POLICIES = ("mean", "zero", "model")
+
+
+def delimiter_segmenter(delimiters=(".", "_")):
+    """
+    Build a segmenter that splits composed words on the first delimiter they contain.
+
+    This is how the dictionary service splits glosses such as "agua.del.río".
+
+    Args:
+        delimiters (tuple, optional): Delimiters, tried in order. Defaults to (".", "_").
+
+    Returns:
+        callable: Function that takes a word and returns its list of subwords.
+    """
+    def segment(word):
+        for delimiter in delimiters:
+            if delimiter in word:
+                return word.split(delimiter)
+        return [word]
+    return segment
+
+
+def as_segmenter(segmenter):
+    """
+    Turn a segmenter object into a function from a word to its subwords.
+
+    Accepts plain callables, objects with a `segment` method (e.g. MorfessorSegmenter) and
+    objects with a `tokenize_words` method (e.g. BPETokenizer). None means "no segmentation".
+
+    Args:
+        segmenter: The segmenter.
+
+    Returns:
+        callable: Function that takes a word and returns its list of subwords.
+    """
+    if segmenter is None:
+        return lambda word: [word]
+    if hasattr(segmenter, "segment"):
+        return segmenter.segment
+    if hasattr(segmenter, "tokenize_words"):
+        return lambda word: segmenter.tokenize_words([word])
+    if callable(segmenter):
+        return segmenter
+    raise TypeError(f"Unsupported segmenter: {segmenter!r}")
+
+
+class EmbeddingComposer:
+    """
+    Composes word embeddings from subword vectors with a few array operations.
+
+    The distinct words of a request are segmented once, their subwords are gathered into a
+    ragged index over the KeyedVectors matrix and pooled per word with np.add.reduceat.
+    Subwords missing from the vocabulary get a deterministic vector chosen by the OOV policy:
+
+        "mean"   the mean of all vectors in the vocabulary (precomputed once),
+        "zero"   a zero vector,
+        "model"  the model's own OOV vector (FastText n-grams), computed once per distinct subword.
+
+    Attributes:
+        keyed_vectors (gensim.models.KeyedVectors): The subword vectors.
+        segment (callable): Function from a word to its subwords.
+        pooling (str): "sum", "mean" or "sif" (smooth inverse frequency weighted average).
+        oov (str): OOV policy.
+        sif_a (float): The `a` parameter of SIF weighting, a / (a + p(subword)).
+    """
+
+    def __init__(self, keyed_vectors, segmenter=None, pooling="sum", oov="mean", sif_a=1e-3, frequencies=None):
+        """
+        Initializes an EmbeddingComposer instance.
+
+        Args:
+            keyed_vectors (gensim.models.KeyedVectors): The subword vectors.
+            segmenter (optional): Callable, MorfessorSegmenter, BPETokenizer or None. Defaults to None.
+            pooling (str, optional): "sum", "mean" or "sif". Defaults to "sum".
+            oov (str, optional): "mean", "zero" or "model". Defaults to "mean".
+            sif_a (float, optional): SIF smoothing parameter. Defaults to 1e-3.
+            frequencies (dict, optional): Subword -> count used for SIF weights. Defaults to the counts
+                stored in the KeyedVectors.
+
+        Raises:
+            ValueError: If the pooling method or the OOV policy is not supported.
+        """
+        if pooling not in POOLING_METHODS:
+            raise ValueError(f"Unsupported pooling method: {pooling}")
+        if oov not in OOV_POLICIES:
+            raise ValueError(f"Unsupported OOV policy: {oov}")
+        self.keyed_vectors = keyed_vectors
+        self.segment = as_segmenter(segmenter)
+        self.pooling = pooling
+        self.oov = oov
+        self.sif_a = sif_a
+        self.frequencies = frequencies
+        self._oov_vector = None
+        self._sif_weights = None
+
+    @property
+    def vector_size(self):
+        return self.keyed_vectors.vector_size
+
+    @property
+    def oov_vector(self):
+        """The vector used for OOV subwords under the "mean" and "zero" policies."""
+        if self._oov_vector is None:
+            vectors = self.keyed_vectors.vectors
+            if self.oov == "mean" and len(vectors):
+                self._oov_vector = vectors.mean(axis=0)
+            else:
+                self._oov_vector = np.zeros(self.vector_size, dtype=vectors.dtype)
+        return self._oov_vector
+
+    def sif_weights(self):
+        """
+        SIF weight of every vocabulary entry, in KeyedVectors order.
+
+        Returns:
+            np.ndarray: Array of shape (vocab_size,).
+        """
+        if self._sif_weights is None:
+            kv = self.keyed_vectors
+            if self.frequencies is not None:
+                counts = np.array([self.frequencies.get(key, 0) for key in kv.index_to_key], dtype=np.float64)
+            else:
+                counts = np.array([kv.get_vecattr(key, "count") for key in kv.index_to_key], dtype=np.float64)
+            total = counts.sum()
+            probabilities = counts / total if total else counts
+            self._sif_weights = (self.sif_a / (self.sif_a + probabilities)).astype(np.float32)
+        return self._sif_weights
+
+    def index(self, words):
+        """
+        Segment the distinct words and build a ragged index of their subwords.
+
+        Args:
+            words (list): Distinct words.
+
+        Returns:
+            tuple: (ids, offsets, oov_keys) where the subwords of word i are ids[offsets[i]:offsets[i + 1]].
+                   Non-negative ids point into the KeyedVectors; -(j + 1) points to oov_keys[j].
+        """
+        key_to_index = self.keyed_vectors.key_to_index
+        oov_ids = {}
+        ids = []
+        offsets = [0]
+        for word in words:
+            subwords = self.segment(word) or [word]
+            for subword in subwords:
+                idx = key_to_index.get(subword)
+                if idx is None:
+                    idx = -(oov_ids.setdefault(subword, len(oov_ids)) + 1)
+                ids.append(idx)
+            offsets.append(len(ids))
+        return np.array(ids, dtype=np.int64), np.array(offsets, dtype=np.int64), list(oov_ids)
+
+    def embed(self, words):
+        """
+        Compose the embeddings of a list of words.
+
+        Args:
+            words (list): Words, possibly repeated.
+
+        Returns:
+            np.ndarray: Matrix of shape (len(words), vector_size).
+        """
+        types = list(dict.fromkeys(words))
+        if not types:
+            return np.zeros((0, self.vector_size), dtype=np.float32)
+        ids, offsets, oov_keys = self.index(types)
+
+        # Gather subword vectors; OOV rows are filled in afterwards
+        oov_mask = ids < 0
+        subword_vectors = self.keyed_vectors.vectors[np.where(oov_mask, 0, ids)]
+        if oov_keys:
+            if self.oov == "model":
+                oov_rows = np.array([self.keyed_vectors.get_vector(key) for key in oov_keys])
+                subword_vectors[oov_mask] = oov_rows[-ids[oov_mask] - 1]
+            else:
+                subword_vectors[oov_mask] = self.oov_vector
+
+        if self.pooling == "sif":
+            weights = np.ones(len(ids), dtype=np.float32)
+            weights[~oov_mask] = self.sif_weights()[ids[~oov_mask]]
+            subword_vectors *= weights[:, None]
+
+        pooled = np.add.reduceat(subword_vectors, offsets[:-1], axis=0)
+        if self.pooling in ("mean", "sif"):
+            pooled /= np.diff(offsets)[:, None]
+
+        if len(types) == len(words):
+            return pooled
+        type_index = {word: i for i, word in enumerate(types)}
+        return pooled[np.fromiter((type_index[word] for word in words), dtype=np.int64, count=len(words))]
+
+    def embed_dict(self, words):
+        """
+        Compose the embeddings of a list of words into a dictionary.
+
+        Args:
+            words (list): Words.
+
+        Returns:
+            dict: Word -> embedding.
+        """
+        types = list(dict.fromkeys(words))
+        return dict(zip(types, self.embed(types)))
@@ -0,0 +1,167 @@
+import unicodedata
+from itertools import combinations
+
+from model.cache import ResultCache
+
+POLICIES = ("autocorrect", "suggest", "off")
+
+
+def normalize_word(word):
+    """
+    Normalize a word for orthographic matching: lowercase and without accents.
+
+    Args:
+        word (str): The word.
+
+    Returns:
+        str: e.g. "Ahón" -> "ahon".
+    """
+    decomposed = unicodedata.normalize("NFKD", word.strip().lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def deletes(word, max_distance):
+    """
+    All strings obtained by deleting up to `max_distance` characters from a word (SymSpell).
+
+    Args:
+        word (str): The word.
+        max_distance (int): Maximum number of deletions.
+
+    Returns:
+        set: The word itself and its deletion variants.
+    """
+    variants = {word}
+    for n in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), n):
+            variants.add("".join(c for i, c in enumerate(word) if i not in positions))
+    return variants
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions), with early exit.
+
+    Args:
+        a (str): First string.
+        b (str): Second string.
+        max_distance (int): Distances above this are reported as max_distance + 1.
+
+    Returns:
+        int: The distance, capped at max_distance + 1.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+class FuzzyIndex:
+    """
+    SymSpell-style deletion index for finding vocabulary words within a small edit distance.
+
+    Every normalized vocabulary word is stored under all its deletion variants; a query is expanded
+    the same way, so candidates are found with a few dictionary lookups and then verified with the
+    exact edit distance.
+
+    Attributes:
+        max_distance (int): Largest edit distance supported.
+        variants (dict): Normalized word -> list of vocabulary words with that normalization.
+        delete_index (dict): Deletion variant -> set of normalized words.
+        cache (ResultCache): Cache of lookups.
+    """
+
+    def __init__(self, vocabulary, max_distance=2, cache_size=8192):
+        """
+        Builds a FuzzyIndex.
+
+        Args:
+            vocabulary (iterable): Vocabulary words.
+            max_distance (int, optional): Largest edit distance supported. Defaults to 2.
+            cache_size (int, optional): Maximum number of cached lookups. Defaults to 8192.
+        """
+        self.max_distance = max_distance
+        self.variants = {}
+        for word in dict.fromkeys(vocabulary):
+            self.variants.setdefault(normalize_word(word), []).append(word)
+        self.delete_index = {}
+        for normalized in self.variants:
+            for variant in deletes(normalized, max_distance):
+                self.delete_index.setdefault(variant, set()).add(normalized)
+        self.cache = ResultCache(maxsize=cache_size)
+
+    def lookup(self, word, max_distance=None, limit=5):
+        """
+        Find vocabulary words close to a query.
+
+        Args:
+            word (str): The query.
+            max_distance (int, optional): Largest edit distance. Defaults to the index maximum.
+            limit (int, optional): Maximum number of candidates. Defaults to 5.
+
+        Returns:
+            list: (vocabulary_word, distance) tuples, closest first; distance 0 means the
+                  query matches after accent and case normalization.
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        key = (word, max_distance, limit)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        normalized = normalize_word(word)
+        candidates = set()
+        for variant in deletes(normalized, max_distance):
+            candidates.update(self.delete_index.get(variant, ()))
+
+        scored = []
+        for candidate in candidates:
+            distance = edit_distance(normalized, candidate, max_distance)
+            if distance <= max_distance:
+                scored.extend((original, distance) for original in self.variants[candidate])
+        scored.sort(key=lambda item: (item[1], item[0]))
+        result = scored[:limit]
+        self.cache.put(key, result)
+        return result
+
+    def correct(self, word, policy="autocorrect"):
+        """
+        Apply a correction policy to a query that is not in the vocabulary.
+
+        Args:
+            word (str): The query.
+            policy (str, optional): "autocorrect" returns the closest candidate when it is the only one at
+                its distance; "suggest" only returns a candidate that matches after accent and case
+                normalization (distance 0), as every policy does; "off" skips the lookup. Defaults to "autocorrect".
+
+        Returns:
+            tuple: (corrected_word or None, list of suggested words).
+
+        Raises:
+            ValueError: If the policy is not supported.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unsupported fuzzy policy: {policy}")
+        if policy == "off":
+            return None, []
+        candidates = self.lookup(word)
+        suggestions = [candidate for candidate, _ in candidates]
+        # "AHON" for "ahón" is not a spelling error: it is resolved, only real edits are held back
+        if candidates and candidates[0][1] == 0:
+            return candidates[0][0], suggestions
+        if policy == "autocorrect" and candidates:
+            best_distance = candidates[0][1]
+            if sum(1 for _, distance in candidates if distance == best_distance) == 1:
+                return candidates[0][0], suggestions
+        return None, suggestions
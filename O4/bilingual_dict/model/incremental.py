@@ -0,0 +1,217 @@
+import argparse
+import hmac
+import os
+
+import numpy as np
+
+STATS_FILE = "model_stats.npz"  # Sufficient statistics saved next to the mapping of a bundle
+METHODS = ("ridge", "procrustes")
+LOCAL_ADDRESSES = ("127.0.0.1", "::1")
+UPDATE_TOKEN = os.environ.get("MAPPING_UPDATE_TOKEN")  # Updates are disabled when unset
+TEST_SIZE = 0.2         # Held-out share of the seed pairs in bdi.ipynb (train_test_split, random_state=42)
+SPLIT_SEED = 42
+
+
+class MappingStatistics:
+    """
+    Sufficient statistics of a linear mapping between two embedding spaces.
+
+    Ridge regression (as learn_mapping in bdi.ipynb) and orthogonal Procrustes only depend on
+    XᵀX, YᵀY and XᵀY, so new seed pairs are folded in with a rank-k update of these matrices and
+    the mapping is re-solved with one small solve or SVD, without revisiting the old pairs.
+
+    Attributes:
+        xtx (np.ndarray): XᵀX of the source embeddings, shape (src_dim, src_dim).
+        yty (np.ndarray): YᵀY of the target embeddings, shape (tgt_dim, tgt_dim).
+        xty (np.ndarray): XᵀY cross-covariance, shape (src_dim, tgt_dim).
+        n_pairs (int): Number of pairs accumulated.
+        method (str): "ridge" or "procrustes".
+        regularization (float): Ridge penalty.
+        checksum (str): Checksum of the bundle whose mapping was solved from these statistics, or None.
+    """
+
+    def __init__(self, xtx, yty, xty, n_pairs=0, method="ridge", regularization=1e-3, checksum=None):
+        """
+        Initializes a MappingStatistics instance.
+
+        Args:
+            xtx (np.ndarray): XᵀX.
+            yty (np.ndarray): YᵀY.
+            xty (np.ndarray): XᵀY.
+            n_pairs (int, optional): Number of pairs accumulated. Defaults to 0.
+            method (str, optional): "ridge" or "procrustes". Defaults to "ridge".
+            regularization (float, optional): Ridge penalty, as in learn_mapping. Defaults to 1e-3.
+            checksum (str, optional): Checksum of the bundle they belong to. Defaults to None.
+
+        Raises:
+            ValueError: If the method is not supported.
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unsupported mapping method: {method}")
+        self.xtx = np.asarray(xtx, dtype=np.float64)
+        self.yty = np.asarray(yty, dtype=np.float64)
+        self.xty = np.asarray(xty, dtype=np.float64)
+        self.n_pairs = int(n_pairs)
+        self.method = method
+        self.regularization = float(regularization)
+        self.checksum = checksum
+
+    @classmethod
+    def from_pairs(cls, X_src, Y_tgt, method="ridge", regularization=1e-3):
+        """
+        Accumulate the statistics of a set of aligned embeddings.
+
+        Args:
+            X_src (np.ndarray): Source embeddings of shape (n_pairs, src_dim).
+            Y_tgt (np.ndarray): Target embeddings of shape (n_pairs, tgt_dim).
+            method (str, optional): "ridge" or "procrustes". Defaults to "ridge".
+            regularization (float, optional): Ridge penalty. Defaults to 1e-3.
+
+        Returns:
+            MappingStatistics: The statistics.
+        """
+        X_src = np.asarray(X_src, dtype=np.float64)
+        Y_tgt = np.asarray(Y_tgt, dtype=np.float64)
+        stats = cls(np.zeros((X_src.shape[1],) * 2), np.zeros((Y_tgt.shape[1],) * 2),
+                    np.zeros((X_src.shape[1], Y_tgt.shape[1])), 0, method, regularization)
+        stats.add(X_src, Y_tgt)
+        return stats
+
+    @classmethod
+    def load(cls, path):
+        """Load statistics saved with `save`."""
+        data = np.load(path)
+        checksum = str(data["checksum"]) if "checksum" in data.files else ""
+        return cls(data["xtx"], data["yty"], data["xty"], int(data["n_pairs"]), str(data["method"]),
+                   float(data["regularization"]), checksum or None)
+
+    def save(self, path):
+        """Save the statistics to a .npz file."""
+        with open(path, "wb") as f:
+            np.savez(f, xtx=self.xtx, yty=self.yty, xty=self.xty, n_pairs=self.n_pairs, method=self.method,
+                     regularization=self.regularization, checksum=self.checksum or "")
+
+    def copy(self):
+        """Return an independent copy of the statistics."""
+        return MappingStatistics(self.xtx.copy(), self.yty.copy(), self.xty.copy(), self.n_pairs, self.method,
+                                 self.regularization, self.checksum)
+
+    def add(self, X_src, Y_tgt):
+        """
+        Fold new aligned pairs into the statistics (a rank-k update, k = number of new pairs).
+
+        Args:
+            X_src (np.ndarray): Source embeddings of shape (k, src_dim).
+            Y_tgt (np.ndarray): Target embeddings of shape (k, tgt_dim).
+        """
+        X_src = np.asarray(X_src, dtype=np.float64)
+        Y_tgt = np.asarray(Y_tgt, dtype=np.float64)
+        self.xtx += X_src.T @ X_src
+        self.yty += Y_tgt.T @ Y_tgt
+        self.xty += X_src.T @ Y_tgt
+        self.n_pairs += len(X_src)
+
+    def _solve(self, gram, cross):
+        if self.method == "procrustes":
+            U, _, Vt = np.linalg.svd(cross, full_matrices=False)
+            return U @ Vt
+        return np.linalg.solve(gram + self.regularization * np.eye(len(gram)), cross)
+
+    def mapping(self):
+        """
+        Solve the source -> target mapping.
+
+        Returns:
+            np.ndarray: Mapping matrix of shape (src_dim, tgt_dim).
+        """
+        return self._solve(self.xtx, self.xty)
+
+    def reverse_mapping(self):
+        """
+        Solve the target -> source mapping from the same statistics.
+
+        Returns:
+            np.ndarray: Mapping matrix of shape (tgt_dim, src_dim).
+        """
+        return self._solve(self.yty, self.xty.T)
+
+
+def training_split(n_pairs, test_size=TEST_SIZE, seed=SPLIT_SEED):
+    """
+    Indices of the training pairs of the bdi.ipynb split, without sklearn.
+
+    Reproduces train_test_split(pairs, test_size=0.2, random_state=42): the first ceil(n * test_size)
+    positions of the seeded permutation are held out for testing.
+
+    Args:
+        n_pairs (int): Number of seed pairs.
+        test_size (float, optional): Held-out share. Defaults to 0.2.
+        seed (int, optional): Random state. Defaults to 42.
+
+    Returns:
+        np.ndarray: Indices of the training pairs, in the order train_test_split returns them.
+    """
+    permutation = np.random.RandomState(seed).permutation(n_pairs)
+    return permutation[int(np.ceil(test_size * n_pairs)):]
+
+
+def update_allowed(remote_addr, authorization):
+    """
+    Whether a request may update the mapping: it must come from this machine and carry the update token.
+
+    Args:
+        remote_addr (str): Client address.
+        authorization (str): Value of the Authorization header, "Bearer <token>".
+
+    Returns:
+        bool: True if the update is allowed.
+    """
+    if not UPDATE_TOKEN or remote_addr not in LOCAL_ADDRESSES:
+        return False
+    return hmac.compare_digest((authorization or "").encode("utf-8"), f"Bearer {UPDATE_TOKEN}".encode("utf-8"))
+
+
+if __name__ == "__main__":
+    import pickle
+
+    from model import model
+    from model.bundle import bundle_checksum, bundle_paths, reverse_mapping_path
+
+    parser = argparse.ArgumentParser(description="Train the mapping of a bundle on its seed pairs and save the "
+                                                 "statistics incremental updates need.")
+    parser.add_argument("--version", help="Bundle version (default: base)")
+    parser.add_argument("--method", choices=METHODS, default="ridge")
+    parser.add_argument("--regularization", type=float, default=1e-3)
+    parser.add_argument("--all-pairs", action="store_true",
+                        help="Also train on the 20%% of pairs bdi.ipynb holds out for testing")
+    parser.add_argument("--keep-mapping", action="store_true",
+                        help="Only save the statistics, for a mapping trained by bdi.ipynb on the same split")
+    args = parser.parse_args()
+
+    # Only the seed pairs and the embeddings are needed: the current mapping may be missing or
+    # have the wrong shape, which is what retraining fixes, so build_bundle is not used
+    mapping_path, pairs_path = bundle_paths(args.version)
+    src_words, tgt_words = model.load_word_pairs(pairs_path)
+    if not args.all_pairs:
+        train = training_split(len(src_words))
+        src_words, tgt_words = [src_words[i] for i in train], [tgt_words[i] for i in train]
+    model.load_fasttext_models()
+    src_embeddings = model.load_embeddings(model.src_model, src_words)
+    tgt_embeddings = model.load_embeddings(model.tgt_model, tgt_words)
+    stats = MappingStatistics.from_pairs(np.array([src_embeddings[w] for w in src_words]),
+                                         np.array([tgt_embeddings[w] for w in tgt_words]),
+                                         method=args.method, regularization=args.regularization)
+    if args.keep_mapping:
+        with open(mapping_path, "rb") as f:
+            shape = np.shape(pickle.load(f))
+        if shape != stats.xty.shape:
+            parser.error(f"The mapping {mapping_path} has shape {shape}, the embeddings need {stats.xty.shape}")
+    else:
+        model.keep_original(mapping_path)
+        model.write_pickle(stats.mapping().astype(np.float32), mapping_path)
+
+    reverse_path = reverse_mapping_path(args.version)
+    stats.checksum = bundle_checksum(*[mapping_path, pairs_path] + ([reverse_path] if reverse_path is not None else []))
+    stats.save(mapping_path.parent / STATS_FILE)
+    print(f"{'Saved the statistics of' if args.keep_mapping else 'Trained'} a {args.method} mapping on "
+          f"{stats.n_pairs} pairs ({mapping_path}, checksum {stats.checksum})")
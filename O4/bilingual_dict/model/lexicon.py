@@ -0,0 +1,336 @@
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+from model.fuzzy import normalize_word
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+LECTURA_FOLDER = THIS_FOLDER.parents[2] / "O1"
+DEFAULT_DB_FILE = Path(os.environ.get("LEXICON_DB", THIS_FOLDER / "data" / "lexicon.sqlite"))
+FIELDS = ("headword", "citation", "pos", "gloss_es", "def_es")
+
+# gloss_es and def_es of an entry are those of its first sense; every sense is a row of `glosses`
+TABLE_SCHEMA = """
+CREATE TABLE entries (
+    id INTEGER PRIMARY KEY,
+    headword TEXT NOT NULL,
+    headword_norm TEXT NOT NULL,
+    citation TEXT,
+    citation_norm TEXT,
+    pos TEXT,
+    gloss_es TEXT,
+    def_es TEXT
+);
+CREATE TABLE glosses (
+    id INTEGER PRIMARY KEY,
+    entry INTEGER NOT NULL REFERENCES entries (id),
+    sense INTEGER NOT NULL,
+    gloss_es TEXT,
+    gloss_norm TEXT,
+    def_es TEXT
+);
+"""
+INDEX_SCHEMA = """
+CREATE INDEX entries_headword ON entries (headword_norm);
+CREATE INDEX entries_citation ON entries (citation_norm);
+CREATE INDEX entries_pos ON entries (pos);
+CREATE INDEX glosses_entry ON glosses (entry, sense);
+CREATE INDEX glosses_gloss ON glosses (gloss_norm);
+"""
+INSERT_SQL = ("INSERT INTO entries (id, headword, headword_norm, citation, citation_norm, pos, gloss_es, def_es) "
+              "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_GLOSS_SQL = "INSERT INTO glosses (entry, sense, gloss_es, gloss_norm, def_es) VALUES (?, ?, ?, ?, ?)"
+FTS_SCHEMA = "CREATE VIRTUAL TABLE definitions USING fts5(gloss_es, def_es, content='glosses', content_rowid='id')"
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+
+def read_toolbox(file_path):
+    """
+    Stream the entries of a Toolbox dictionary with iter_lexicon from O1/FuncionesLectura.py.
+
+    Args:
+        file_path (str or Path): Toolbox (SFM) dictionary.
+
+    Returns:
+        generator: One dict per \\lx entry.
+    """
+    if str(LECTURA_FOLDER) not in sys.path:
+        sys.path.append(str(LECTURA_FOLDER))
+    from FuncionesLectura import iter_lexicon
+
+    return iter_lexicon(file_path)
+
+
+def entry_row(entry_id, entry):
+    """Turn a parsed dictionary entry into a row of the entries table."""
+    headword = entry.get("lex_isc") or ""
+    citation = entry.get("lex_citation") or None
+    return (
+        entry_id,
+        headword,
+        normalize_word(headword),
+        citation,
+        normalize_word(citation) if citation else None,
+        entry.get("pos") or None,
+        entry.get("gloss_es") or None,
+        entry.get("def_es") or None,
+    )
+
+
+def gloss_rows(entry_id, entry):
+    """
+    Turn the senses of a parsed dictionary entry into rows of the glosses table.
+
+    Entries without a `senses` list (parse_txt rows) get one sense from their gloss_es and def_es.
+    """
+    senses = entry.get("senses")
+    if senses is None:
+        senses = [{"gloss_es": entry.get("gloss_es"), "def_es": entry.get("def_es")}]
+    rows = []
+    for position, sense in enumerate(senses):
+        gloss = sense.get("gloss_es") or None
+        definition = sense.get("def_es") or None
+        if gloss or definition:
+            rows.append((entry_id, position, gloss, normalize_word(gloss) if gloss else None, definition))
+    return rows
+
+
+def build_lexicon(entries, db_path=DEFAULT_DB_FILE, batch_size=5000):
+    """
+    Write dictionary entries to a new SQLite database.
+
+    Rows are inserted with executemany in a single transaction and the indexes are created
+    afterwards, so building is one sequential pass. Every sense of an entry gets its own row in
+    the glosses table, and the glosses and definitions are indexed with FTS5 when the SQLite
+    build supports it.
+
+    Args:
+        entries (iterable): Dicts with the columns of parse_txt (lex_isc, lex_citation, pos, gloss_es,
+            def_es) and, as iter_lexicon returns them, a `senses` list of gloss_es/def_es dicts.
+        db_path (str or Path, optional): Database file, replaced if it exists. Defaults to model/data/lexicon.sqlite (or $LEXICON_DB).
+        batch_size (int, optional): Rows per executemany call. Defaults to 5000.
+
+    Returns:
+        int: Number of entries written.
+    """
+    db_path = Path(db_path)
+    tmp_path = db_path.with_name(db_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(TABLE_SCHEMA)
+
+        total = 0
+        with connection:
+            batch, gloss_batch = [], []
+            for entry in entries:
+                if not entry.get("lex_isc"):
+                    continue
+                total += 1
+                batch.append(entry_row(total, entry))
+                gloss_batch += gloss_rows(total, entry)
+                if len(batch) >= batch_size:
+                    connection.executemany(INSERT_SQL, batch)
+                    connection.executemany(INSERT_GLOSS_SQL, gloss_batch)
+                    batch, gloss_batch = [], []
+            if batch:
+                connection.executemany(INSERT_SQL, batch)
+                connection.executemany(INSERT_GLOSS_SQL, gloss_batch)
+
+            connection.executescript(INDEX_SCHEMA)
+            try:
+                connection.execute(FTS_SCHEMA)
+                connection.execute("INSERT INTO definitions (definitions) VALUES ('rebuild')")
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: definition search falls back to LIKE
+                pass
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, db_path)
+    return total
+
+
+class Lexicon:
+    """
+    Read-only access to the SQLite dictionary built by build_lexicon.
+
+    Each thread gets its own connection, so the store can be shared by the Flask and ASGI workers.
+
+    Attributes:
+        db_path (Path): Database file.
+        has_fts (bool): Whether the definitions have an FTS5 index.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_FILE):
+        """
+        Opens a Lexicon.
+
+        Args:
+            db_path (str or Path, optional): Database file. Defaults to model/data/lexicon.sqlite (or $LEXICON_DB).
+
+        Raises:
+            FileNotFoundError: If the database does not exist.
+        """
+        self.db_path = Path(db_path)
+        if not self.db_path.is_file():
+            raise FileNotFoundError(f"Lexicon database {self.db_path} not found")
+        self._local = threading.local()
+        self.has_fts = self.connection().execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'definitions'").fetchone() is not None
+
+    def connection(self):
+        """Return this thread's read-only connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(f"{self.db_path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            self._local.connection = connection
+        return connection
+
+    def _entries(self, sql, params):
+        rows = self.connection().execute(sql, params).fetchall()
+        return self._with_senses(rows)
+
+    def _with_senses(self, rows):
+        """Entry dicts of entries table rows, with the gloss and definition of every sense."""
+        entries = {row["id"]: {**{field: row[field] for field in FIELDS}, "senses": []} for row in rows}
+        if entries:
+            placeholders = ", ".join("?" * len(entries))
+            for entry_id, gloss, definition in self.connection().execute(
+                    f"SELECT entry, gloss_es, def_es FROM glosses WHERE entry IN ({placeholders}) ORDER BY entry, sense",
+                    list(entries)):
+                entries[entry_id]["senses"].append({"gloss_es": gloss, "def_es": definition})
+        return list(entries.values())
+
+    def __len__(self):
+        return self.connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def lookup(self, word, pos=None):
+        """
+        Exact lookup of an Iskonawa word by headword or citation form, ignoring case and accents.
+
+        Args:
+            word (str): Iskonawa word.
+            pos (str, optional): Only return entries with this part of speech. Defaults to None.
+
+        Returns:
+            list: Matching entries as dicts.
+        """
+        normalized = normalize_word(word)
+        sql = ("SELECT * FROM entries WHERE id IN "
+               "(SELECT id FROM entries WHERE headword_norm = ? UNION SELECT id FROM entries WHERE citation_norm = ?)")
+        params = [normalized, normalized]
+        if pos is not None:
+            sql += " AND pos = ?"
+            params.append(pos)
+        return self._entries(sql + " ORDER BY id", params)
+
+    def lookup_gloss(self, gloss, pos=None):
+        """
+        Exact lookup of the entries whose Spanish gloss is `gloss`, ignoring case and accents.
+
+        Args:
+            gloss (str): Spanish word or gloss.
+            pos (str, optional): Only return entries with this part of speech. Defaults to None.
+
+        Returns:
+            list: Matching entries as dicts, whichever of their senses has the gloss.
+        """
+        sql = "SELECT * FROM entries WHERE id IN (SELECT entry FROM glosses WHERE gloss_norm = ?)"
+        params = [normalize_word(gloss)]
+        if pos is not None:
+            sql += " AND pos = ?"
+            params.append(pos)
+        return self._entries(sql + " ORDER BY id", params)
+
+    def search_definitions(self, query, limit=20):
+        """
+        Full-text search over the Spanish glosses and definitions of every sense.
+
+        Args:
+            query (str): Spanish words; every word must appear in the same sense.
+            limit (int, optional): Maximum number of entries. Defaults to 20.
+
+        Returns:
+            list: Matching entries as dicts, best match first when FTS5 is available.
+        """
+        words = [word for word in query.split() if word]
+        if not words:
+            return []
+        if self.has_fts:
+            match = " ".join('"{}"'.format(word.replace('"', '""')) for word in words)
+            # An entry is ranked by its best matching sense
+            cursor = self.connection().execute("SELECT glosses.entry FROM definitions JOIN glosses "
+                                               "ON glosses.id = definitions.rowid WHERE definitions MATCH ? "
+                                               "ORDER BY rank", (match,))
+            ids = {}
+            for (entry_id,) in cursor:
+                ids[entry_id] = None
+                if len(ids) >= limit:
+                    break
+        else:
+            condition = " AND ".join("(COALESCE(gloss_es, '') || ' ' || COALESCE(def_es, '')) LIKE ?" for _ in words)
+            ids = dict.fromkeys(entry_id for (entry_id,) in self.connection().execute(
+                f"SELECT DISTINCT entry FROM glosses WHERE {condition} ORDER BY entry LIMIT ?",
+                [f"%{word}%" for word in words] + [limit]))
+        if not ids:
+            return []
+        rows = {row["id"]: row for row in self.connection().execute(
+            f"SELECT * FROM entries WHERE id IN ({', '.join('?' * len(ids))})", list(ids))}
+        return self._with_senses([rows[entry_id] for entry_id in ids])
+
+    def translate(self, word, direction="isc-es"):
+        """
+        Dictionary entries that translate a word.
+
+        Args:
+            word (str): The word.
+            direction (str, optional): "isc-es" looks up headwords, "es-isc" looks up glosses. Defaults to "isc-es".
+
+        Returns:
+            list: Matching entries as dicts; empty if the word is not in the dictionary.
+        """
+        return self.lookup(word) if direction == "isc-es" else self.lookup_gloss(word)
+
+
+def get_lexicon():
+    """Return the dictionary store, or None if the database has not been built."""
+    global _lexicon
+    if _lexicon is None and DEFAULT_DB_FILE.is_file():
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = Lexicon(DEFAULT_DB_FILE)
+    return _lexicon
+
+
+def dictionary_translation(entries, direction="isc-es"):
+    """
+    Format dictionary entries like get_translation: (translated_word, score) tuples.
+
+    Dictionary translations get the seed translation score, 10. Iskonawa words are translated
+    by the glosses of all the senses of their entries, in order.
+    """
+    if direction == "isc-es":
+        words = (sense["gloss_es"] for entry in entries for sense in entry.get("senses") or [entry])
+    else:
+        words = (entry["headword"] for entry in entries)
+    return [(word, 10) for word in dict.fromkeys(word for word in words if word)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the SQLite dictionary store from a Toolbox dictionary.")
+    parser.add_argument("toolbox", help="Toolbox (SFM) dictionary, e.g. DICCIONARIOISKONAWA7.txt")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE), help="Output database")
+    args = parser.parse_args()
+
+    total = build_lexicon(read_toolbox(args.toolbox), args.db)
+    print(f"Wrote {total} entries to {args.db}")
@@ -0,0 +1,234 @@
+import math
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+ESTRUCTURA_FOLDER = THIS_FOLDER.parents[2] / "O2" / "R4"
+DEFAULT_CORPUS_FILE = Path(os.environ.get("TM_CORPUS", ESTRUCTURA_FOLDER / "corpus_bilingue.json"))
+LANGUAGES = ("isc", "es")
+
+_memory = None
+_memory_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """Lowercase a text, drop punctuation and collapse whitespace."""
+    text = re.sub(r'[^\w\s]', ' ', (text or '').lower())
+    return " ".join(text.split())
+
+
+def char_ngrams(text, n_min=2, n_max=4):
+    """
+    Character n-grams of every word of a normalized text, with word boundaries marked by spaces.
+
+    Args:
+        text (str): Normalized text.
+        n_min (int, optional): Smallest n. Defaults to 2.
+        n_max (int, optional): Largest n. Defaults to 4.
+
+    Returns:
+        Counter: n-gram -> count.
+    """
+    grams = Counter()
+    for word in text.split():
+        padded = f" {word} "
+        for n in range(n_min, n_max + 1):
+            for i in range(len(padded) - n + 1):
+                grams[padded[i:i + n]] += 1
+    return grams
+
+
+class NgramIndex:
+    """
+    Inverted index of character n-gram TF-IDF vectors.
+
+    Each n-gram has a posting list of (document id, weight) stored as NumPy arrays, so a query
+    accumulates scores with one vectorized add per query n-gram. Document vectors are L2-normalized,
+    so the score is the cosine similarity between the query and each document.
+
+    Attributes:
+        n_docs (int): Number of indexed documents.
+        idf (dict): n-gram -> inverse document frequency.
+        postings (dict): n-gram -> (doc_ids, weights) arrays.
+    """
+
+    def __init__(self, texts, n_min=2, n_max=4):
+        """
+        Builds an NgramIndex.
+
+        Args:
+            texts (list): Normalized document texts.
+            n_min (int, optional): Smallest n. Defaults to 2.
+            n_max (int, optional): Largest n. Defaults to 4.
+        """
+        self.n_min = n_min
+        self.n_max = n_max
+        self.n_docs = len(texts)
+
+        doc_grams = [char_ngrams(text, n_min, n_max) for text in texts]
+        df = Counter()
+        for grams in doc_grams:
+            df.update(grams.keys())
+        self.idf = {gram: math.log((1 + self.n_docs) / (1 + count)) + 1 for gram, count in df.items()}
+
+        postings = {}
+        for doc_id, grams in enumerate(doc_grams):
+            weights = {gram: (1 + math.log(count)) * self.idf[gram] for gram, count in grams.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for gram, weight in weights.items():
+                postings.setdefault(gram, ([], []))
+                postings[gram][0].append(doc_id)
+                postings[gram][1].append(weight / norm)
+        self.postings = {gram: (np.array(ids, dtype=np.int32), np.array(ws, dtype=np.float32))
+                         for gram, (ids, ws) in postings.items()}
+
+    def search(self, text, k=5, min_score=0.0):
+        """
+        Find the documents most similar to a normalized query.
+
+        Args:
+            text (str): Normalized query.
+            k (int, optional): Number of results. Defaults to 5.
+            min_score (float, optional): Minimum cosine similarity. Defaults to 0.0.
+
+        Returns:
+            list: (doc_id, score) tuples, best first.
+        """
+        grams = char_ngrams(text, self.n_min, self.n_max)
+        weights = {gram: (1 + math.log(count)) * self.idf[gram] for gram, count in grams.items() if gram in self.idf}
+        if not weights or self.n_docs == 0:
+            return []
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for gram, weight in weights.items():
+            doc_ids, doc_weights = self.postings[gram]
+            scores[doc_ids] += doc_weights * (weight / norm)
+
+        k = min(k, self.n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(doc_id), float(scores[doc_id])) for doc_id in top if scores[doc_id] > min_score]
+
+
+class TranslationMemory:
+    """
+    Fuzzy sentence-level search over the bilingual corpus.
+
+    Every entry pairs an Iskonawa transcription with its Spanish free translation; one n-gram index
+    is kept per language so queries can come from either side.
+
+    Attributes:
+        entries (list): Dicts with the id, file, transcription and free translation of each entry.
+        indexes (dict): Language ("isc" or "es") -> NgramIndex.
+    """
+
+    def __init__(self, entries):
+        """
+        Builds a TranslationMemory.
+
+        Args:
+            entries (list): Dicts with "id", "file", "isc" and "es" keys.
+        """
+        self.entries = entries
+        self.indexes = {
+            "isc": NgramIndex([normalize_text(entry["isc"]) for entry in entries]),
+            "es": NgramIndex([normalize_text(entry["es"]) for entry in entries]),
+        }
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Build the memory from a MultilingualCorpus with Spanish free translations.
+
+        Entries without a translation, and repeated (transcription, translation) pairs, are skipped.
+
+        Args:
+            corpus (MultilingualCorpus): The corpus, read but not necessarily cleaned.
+
+        Returns:
+            TranslationMemory: The memory.
+        """
+        entries = []
+        seen = set()
+        for entry in corpus.entries:
+            translation = entry.ft.get("es")
+            if not entry.text or not translation:
+                continue
+            key = (normalize_text(entry.text), normalize_text(translation))
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.append({"id": entry.id, "file": entry.file, "isc": entry.text, "es": translation})
+        return cls(entries)
+
+    @classmethod
+    def from_file(cls, file_path=DEFAULT_CORPUS_FILE):
+        """
+        Read the bilingual JSON Lines corpus with MultilingualCorpus and build the memory.
+
+        Args:
+            file_path (str or Path, optional): Corpus file. Defaults to O2/R4/corpus_bilingue.json (or $TM_CORPUS).
+
+        Returns:
+            TranslationMemory: The memory.
+        """
+        if str(ESTRUCTURA_FOLDER) not in sys.path:
+            sys.path.append(str(ESTRUCTURA_FOLDER))
+        from estructura import MultilingualCorpus
+
+        corpus = MultilingualCorpus(root_directory=str(Path(file_path).parent),
+                                    text_column="transcription",
+                                    file_column="file",
+                                    pos_column="pos",
+                                    mb_column="morpheme_break",
+                                    id_column="id",
+                                    languages=["es"],
+                                    gloss_columns={"es": "gloss_es"},
+                                    ft_columns={"es": "free_translation"})
+        corpus.read(file_path)
+        return cls.from_corpus(corpus)
+
+    def search(self, query, lang="isc", k=5, min_score=0.1):
+        """
+        Find the entries whose `lang` side best matches the query.
+
+        Args:
+            query (str): Iskonawa or Spanish phrase.
+            lang (str, optional): "isc" or "es". Defaults to "isc".
+            k (int, optional): Number of matches. Defaults to 5.
+            min_score (float, optional): Minimum cosine similarity. Defaults to 0.1.
+
+        Returns:
+            list: Matching entries with their score, best first.
+
+        Raises:
+            ValueError: If the language is not supported or k is not a positive integer.
+        """
+        if lang not in self.indexes:
+            raise ValueError(f"Unsupported language: {lang}")
+        if not valid_k(k):
+            raise ValueError(f"k must be a positive integer, got {k!r}")
+        matches = self.indexes[lang].search(normalize_text(query), k=k, min_score=min_score)
+        return [{**self.entries[doc_id], "score": round(score, 4)} for doc_id, score in matches]
+
+
+def valid_k(k):
+    """Whether k is a usable number of results: a positive int (bools excluded)."""
+    return isinstance(k, int) and not isinstance(k, bool) and k >= 1
+
+
+def get_translation_memory():
+    """Return the translation memory, building it from the bilingual corpus on first use."""
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                _memory = TranslationMemory.from_file()
+    return _memory
@@ -0,0 +1,229 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Instrumentation is on unless METRICS_ENABLED=0; when off, `stage` hands out a shared no-op
+# context manager and the counters are never touched
+ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_NULL_CONTEXT = nullcontext()
+
+
+def _format_labels(labelnames, labelvalues, extra=""):
+    """Render a Prometheus label set, e.g. {stage="parse",le="0.1"}."""
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    A monotonically increasing count, optionally split by labels.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Help text.
+        labelnames (tuple): Names of the labels.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Initializes a Counter instance.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (tuple, optional): Names of the labels. Defaults to no labels.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        """Increase the count for the given label values."""
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        """Yield (suffix, labels, value) tuples for the exposition format."""
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            yield "", _format_labels(self.labelnames, labelvalues), value
+
+
+class Gauge(Counter):
+    """A value that can go up and down, optionally split by labels."""
+
+    kind = "gauge"
+
+    def set(self, value, *labelvalues):
+        """Set the value for the given label values."""
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram:
+    """
+    A distribution of observed values in cumulative buckets, optionally split by labels.
+
+    Attributes:
+        name (str): Metric name.
+        documentation (str): Help text.
+        labelnames (tuple): Names of the labels.
+        buckets (tuple): Upper bounds of the buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initializes a Histogram instance.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (tuple, optional): Names of the labels. Defaults to no labels.
+            buckets (tuple, optional): Upper bounds of the buckets. Defaults to DEFAULT_BUCKETS.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labelvalues -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        """Record one observation for the given label values."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def samples(self):
+        """Yield (suffix, labels, value) tuples for the exposition format."""
+        with self._lock:
+            items = sorted((labelvalues, list(series)) for labelvalues, series in self._series.items())
+        for labelvalues, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield "_bucket", _format_labels(self.labelnames, labelvalues, f'le="{bound}"'), cumulative
+            yield "_bucket", _format_labels(self.labelnames, labelvalues, 'le="+Inf"'), series[-1]
+            yield "_sum", _format_labels(self.labelnames, labelvalues), series[-2]
+            yield "_count", _format_labels(self.labelnames, labelvalues), series[-1]
+
+
+class MetricsRegistry:
+    """A collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        """Initializes an empty MetricsRegistry."""
+        self.metrics = []
+
+    def register(self, metric):
+        """
+        Add a metric to the registry.
+
+        Args:
+            metric (Counter, Gauge or Histogram): The metric.
+
+        Returns:
+            The same metric, for chaining.
+        """
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format (version 0.0.4).
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+requests_total = registry.register(Counter(
+    "dictionary_http_requests_total", "HTTP requests by endpoint and status code.", ("endpoint", "status")))
+request_seconds = registry.register(Histogram(
+    "dictionary_http_request_seconds", "HTTP request duration by endpoint.", ("endpoint",)))
+stage_seconds = registry.register(Histogram(
+    "dictionary_translate_stage_seconds", "Time spent in each stage of a translation request.", ("stage",)))
+lookups_total = registry.register(Counter(
+    "dictionary_lookups_total", "Word lookups by result (found, miss).", ("result",)))
+model_load_seconds = registry.register(Gauge(
+    "dictionary_model_load_seconds", "Time it took to build the live model bundle.", ("version",)))
+
+
+class _StageTimer:
+    """Context manager that observes its wall time in `stage_seconds`."""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        stage_seconds.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+def stage(name):
+    """
+    Time a stage of the translation hot path.
+
+    Args:
+        name (str): Stage name, used as the `stage` label.
+
+    Returns:
+        A context manager; a shared no-op one when metrics are disabled.
+    """
+    return _StageTimer(name) if ENABLED else _NULL_CONTEXT
+
+
+def count_lookups(found, missed):
+    """Record the number of words found in and missing from the source vocabulary."""
+    if ENABLED:
+        if found:
+            lookups_total.inc("found", amount=found)
+        if missed:
+            lookups_total.inc("miss", amount=missed)
+
+
+def observe_request(endpoint, status, seconds):
+    """Record one HTTP request."""
+    if ENABLED:
+        requests_total.inc(endpoint, str(status))
+        request_seconds.observe(seconds, endpoint)
+
+
+def observe_model_load(version, seconds):
+    """Record how long a model bundle took to build."""
+    if ENABLED:
+        model_load_seconds.set(seconds, version)
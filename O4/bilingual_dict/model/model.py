@@ -1,20 +1,59 @@
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import hashlib
 import pickle
-import gensim
+import shutil
+import struct
+import threading
+import time
 from pathlib import Path
 
+from model.bundle import ModelBundle, add_swap_listener, bundle_paths, bundle_checksum, get_live_bundle, normalize_rows, reverse_mapping_path, swap_bundle, start_reload, using_bundle
+from model.cache import ResultCache
+from model.composition import EmbeddingComposer, delimiter_segmenter
+from model.fuzzy import FuzzyIndex
+from model.incremental import STATS_FILE, MappingStatistics
+from model.metrics import count_lookups, observe_model_load, stage
+from model.topk import build_table, load_table, table_folder
+
 THIS_FOLDER = Path(__file__).parent.resolve()
+SRC_MODEL_PATH = THIS_FOLDER / "fasttext/isc_model.bin"
+TGT_MODEL_PATH = THIS_FOLDER / "fasttext/cc.es.100.bin"
+FASTTEXT_MAGIC = 793712314  # First int32 of the .bin files written by FastText 0.9
 
 
-# Assuming these are precomputed and available
-src_embeddings = {}  # Source word embeddings (word -> embedding)
-tgt_embeddings = {}  # Target word embeddings (word -> embedding)
-src_words = []       # List of source vocabulary words
-tgt_words = []       # List of target vocabulary words
+# The FastText models are shared by every bundle version; the seed pairs, their
+# embeddings and the trained mapping live in the ModelBundle (see model/bundle.py)
 src_model = None     # Source language FastText model
 tgt_model = None     # Target language FastText model
-trained_mapping = None  # Global variable for storing the trained mapping
+
+# Translation results keyed by (word, k, retrieval mode, direction, bundle version, bundle checksum)
+result_cache = ResultCache(maxsize=int(os.environ.get("CACHE_SIZE", 4096)),
+                           ttl=float(os.environ["CACHE_TTL"]) if os.environ.get("CACHE_TTL") else None)
+add_swap_listener(lambda bundle: result_cache.clear())
+
+# Orthographic-variant indexes over the query vocabulary of the live bundle, one per direction
+FUZZY_POLICY = os.environ.get("FUZZY_POLICY", "suggest")
+FUZZY_MAX_DISTANCE = int(os.environ.get("FUZZY_MAX_DISTANCE", 2))
+_fuzzy_indexes = {}
+add_swap_listener(lambda bundle: _fuzzy_indexes.clear())
+
+def _keep_only(cache, bundle):
+    """Drop the entries of a per-bundle cache that do not belong to `bundle`."""
+    for key in [key for key in cache if key[:2] != (bundle.version, bundle.checksum)]:
+        del cache[key]
+
+# Precomputed translations of the corpus vocabulary (see model/topk.py), one per bundle
+USE_TOPK_TABLE = os.environ.get("TOPK_TABLE", "1") != "0"
+REBUILD_TOPK_TABLE = os.environ.get("TOPK_REBUILD", "1") != "0"  # Rebuild the table after add_seed_pairs
+_topk_tables = {}
+_topk_rebuild_lock = threading.Lock()
+add_swap_listener(lambda bundle: _keep_only(_topk_tables, bundle))
+
+# Sufficient statistics of the mapping of each bundle, for incremental updates (see model/incremental.py)
+_mapping_stats = {}
+_update_lock = threading.Lock()
+add_swap_listener(lambda bundle: _keep_only(_mapping_stats, bundle))
 
 def get_word_embeddings(word_list, fasttext_model, delimiters=[".", "_"], aggregation_method="sum"):
     """
@@ -24,55 +63,32 @@ def get_word_embeddings(word_list, fasttext_model, delimiters=[".", "_"], aggreg
         word_list (list): List of words or composed phrases (e.g., "agua.del.río").
         fasttext_model: Trained FastText model.
         delimiters (list): Delimiters to split composed words.
-        aggregation_method (str): Aggregation method for composed words. Options: "sum", "mean".
+        aggregation_method (str): Aggregation method for composed words. Options: "sum", "mean", "sif".
     
     Returns:
         np.ndarray: Matrix of word embeddings.
     """
-    embeddings = []
-    
-    for word in word_list:
-        # Split composed words using specified delimiters
-        for delimiter in delimiters:
-            if delimiter in word:
-                subwords = word.split(delimiter)
-                break
-        else:
-            subwords = [word]  # Treat as a single word if no delimiter is found
-        
-        # Get embeddings for subwords
-        # subword_embeddings = [fasttext_model.get_word_vector(subword) for subword in subwords]
-        subword_embeddings = [fasttext_model.wv.get_vector(subword) for subword in subwords]
-        
-        # Aggregate embeddings
-        if aggregation_method == "sum":
-            word_embedding = np.sum(subword_embeddings, axis=0)
-        elif aggregation_method == "mean":
-            word_embedding = np.mean(subword_embeddings, axis=0)
-        else:
-            raise ValueError(f"Unsupported aggregation method: {aggregation_method}")
-        
-        embeddings.append(word_embedding)
-    
-    return np.array(embeddings)
+    # Out-of-vocabulary subwords get their FastText n-gram vector, as wv.get_vector would return
+    composer = EmbeddingComposer(fasttext_model.wv, segmenter=delimiter_segmenter(delimiters),
+                                 pooling=aggregation_method, oov="model")
+    return composer.embed(word_list)
 
 def load_embeddings(model, word_list, delimiters=[".", "_"], aggregation_method="sum"):
     """
     Load word embeddings from a FastText model for a list of words or composed phrases.
     
     Args:
-        fasttext_model_path (str): Path to the FastText model.
+        model: Trained FastText model.
         word_list (list): List of words or composed phrases (e.g., "agua.del.río").
         delimiters (list): Delimiters to split composed words.
-        aggregation_method (str): Aggregation method for composed words. Options: "sum", "mean".
+        aggregation_method (str): Aggregation method for composed words. Options: "sum", "mean", "sif".
     
     Returns:
         dict: Word -> embedding mapping.
     """
-    embeddings = {}
-    for word in word_list:
-        embeddings[word] = get_word_embeddings([word], model, delimiters, aggregation_method)[0]
-    return embeddings
+    composer = EmbeddingComposer(model.wv, segmenter=delimiter_segmenter(delimiters),
+                                 pooling=aggregation_method, oov="model")
+    return composer.embed_dict(word_list)
 
 def load_word_pairs(file_path):
     """
@@ -87,7 +103,7 @@ def load_word_pairs(file_path):
     src_words = []
     tgt_words = []
 
-    abs_path = THIS_FOLDER / file_path
+    abs_path = THIS_FOLDER / file_path  # Absolute paths are kept as they are
 
     with open(abs_path, 'r', encoding='utf-8') as file:
         for line in file:
@@ -99,53 +115,421 @@ def load_word_pairs(file_path):
 
     return src_words, tgt_words
 
-def load_model():
-    """Load the embeddings, word lists, and trained mapping."""
-    global src_embeddings, tgt_embeddings, src_words, tgt_words, trained_mapping, src_model, tgt_model
+def load_fasttext_models():
+    """Load the source and target FastText models once."""
+    global src_model, tgt_model
 
-    # Load word lists 
-    if (src_words == []) or (tgt_words == []):
-        file_path = "data/traintest"
-        src_words, tgt_words = load_word_pairs(file_path)
-    
-    # Load fasttext models 
     if (src_model == None) or (tgt_model == None):
-        src_model_path = THIS_FOLDER / "fasttext/isc_model.bin"
-        tgt_model_path = THIS_FOLDER / "fasttext/cc.es.100.bin"
-        src_model = gensim.models.fasttext.load_facebook_model(src_model_path)
-        tgt_model = gensim.models.fasttext.load_facebook_model(tgt_model_path)
+        # gensim takes seconds to import, so it is only loaded when the models are
+        import gensim.models.fasttext
+
+        src_model = gensim.models.fasttext.load_facebook_model(SRC_MODEL_PATH)
+        tgt_model = gensim.models.fasttext.load_facebook_model(TGT_MODEL_PATH)
+
+def fasttext_dimension(path):
+    """Read the vector size from the header of a FastText .bin file, without loading the model."""
+    with open(path, 'rb') as file:
+        header = struct.unpack('<3i', file.read(12))
+    # Files of old FastText versions have no magic number and start with the arguments
+    return header[2] if header[0] == FASTTEXT_MAGIC else header[0]
+
+def check_bundle(version=None, strict=True):
+    """
+    Check that the mappings of a bundle version fit the FastText models, before anything heavy is loaded.
+
+    Args:
+        version (str, optional): Bundle version. Defaults to the base bundle.
+        strict (bool, optional): Whether a mapping of the wrong shape raises. Defaults to True.
+
+    Returns:
+        str: Why a mapping does not fit the FastText models, or None if they fit (only when not strict).
+
+    Raises:
+        FileNotFoundError: If the version, its files or the FastText models are missing.
+        ValueError: If strict and a mapping does not have the shape the FastText models need.
+    """
+    mapping_path, pairs_path = bundle_paths(version)
+    for path in (mapping_path, pairs_path, SRC_MODEL_PATH, TGT_MODEL_PATH):
+        if not path.is_file():
+            raise FileNotFoundError(f"Missing model file: {path}")
+    expected_shape = (fasttext_dimension(SRC_MODEL_PATH), fasttext_dimension(TGT_MODEL_PATH))
+
+    paths = [(mapping_path, expected_shape)]
+    reverse_path = reverse_mapping_path(version)
+    if reverse_path is not None:
+        paths.append((reverse_path, expected_shape[::-1]))
+    for path, shape in paths:
+        with open(path, 'rb') as file:
+            mapping_shape = np.shape(pickle.load(file))
+        if mapping_shape != shape:
+            problem = (f"The mapping {path} has shape {mapping_shape}, but {SRC_MODEL_PATH.name} and "
+                       f"{TGT_MODEL_PATH.name} need {shape}; retrain it with "
+                       f"`python -m model.incremental --version {version or 'base'}`")
+            if strict:
+                raise ValueError(problem)
+            return problem
+    return None
+
+def build_bundle(version=None, strict=True):
+    """
+    Build a ModelBundle from the files of a bundle version.
+
+    Args:
+        version (str, optional): Bundle version. Defaults to the base bundle.
+        strict (bool, optional): Whether a mapping that does not fit the FastText models raises. If
+            not, the bundle is built in reduced mode (see ModelBundle.mapping_error). Defaults to True.
+
+    Returns:
+        ModelBundle: The loaded bundle, not yet live.
+
+    Raises:
+        FileNotFoundError: If the version or the FastText models are missing.
+        ValueError: If strict and the mappings of the version do not fit the FastText models (see check_bundle).
+    """
+    start = time.perf_counter()
+    mapping_path, pairs_path = bundle_paths(version)
+
+    # Refuse to go live with a mapping that does not fit the embedding spaces, or go live without it
+    mapping_error = check_bundle(version, strict=strict)
+
+    # Load word lists
+    src_words, tgt_words = load_word_pairs(pairs_path)
+
+    # Load fasttext models
+    load_fasttext_models()
 
     # Load embeddings
-    if (src_embeddings == {}) or (tgt_embeddings == {}):
-        src_embeddings = load_embeddings(src_model, src_words)
-        tgt_embeddings = load_embeddings(tgt_model, tgt_words)
+    src_embeddings = load_embeddings(src_model, src_words)
+    tgt_embeddings = load_embeddings(tgt_model, tgt_words)
 
     # Load trained mapping from bin file with pickle
-    if trained_mapping is None:
-        trained_mapping_path = THIS_FOLDER / "model.bin"
-        with open(trained_mapping_path, 'rb') as file:
-            trained_mapping = pickle.load(file)
+    with open(mapping_path, 'rb') as file:
+        trained_mapping = pickle.load(file)
+
+    # Load the separately trained reverse mapping, if the bundle has one
+    reverse_path = reverse_mapping_path(version)
+    reverse_mapping = None
+    if reverse_path is not None:
+        with open(reverse_path, 'rb') as file:
+            reverse_mapping = pickle.load(file)
+
+    checksum_paths = [mapping_path, pairs_path] + ([reverse_path] if reverse_path is not None else [])
+    bundle = ModelBundle(version=version or "base", checksum=bundle_checksum(*checksum_paths),
+                         src_words=src_words, tgt_words=tgt_words, src_embeddings=src_embeddings,
+                         tgt_embeddings=tgt_embeddings, trained_mapping=trained_mapping,
+                         reverse_mapping=reverse_mapping, load_seconds=time.perf_counter() - start,
+                         mapping_error=mapping_error)
+    observe_model_load(bundle.version, bundle.load_seconds)
+    return bundle
+
+def load_model(version=None):
+    """
+    Load the embeddings, word lists, and trained mapping if no bundle is live yet.
+
+    A mapping that does not fit the FastText models does not stop the load: the bundle goes live
+    in reduced mode, serving the seed translations only, and reports why in its mapping_error.
+
+    Returns:
+        ModelBundle: The live bundle.
+
+    Raises:
+        FileNotFoundError: If the bundle files or the FastText models are missing.
+    """
+    if get_live_bundle() is None:
+        swap_bundle(build_bundle(version, strict=False))
+    return get_live_bundle()
+
+def reload_model(version=None, background=True):
+    """
+    Load a bundle version and swap it in without interrupting the requests being served.
+
+    Args:
+        version (str, optional): Bundle version. Defaults to the base bundle.
+        background (bool, optional): Whether to load in a background thread. Defaults to True.
+
+    Returns:
+        bool: False if another reload is already running, True otherwise.
+
+    Raises:
+        FileNotFoundError: If the version or the FastText models are missing.
+        ValueError: If the mappings of the version do not fit the FastText models.
+    """
+    check_bundle(version)
+    return start_reload(build_bundle, version=version, background=background)
+
+def get_mapping_statistics(bundle):
+    """
+    Return the mapping statistics of a bundle.
+
+    They are read from the file saved next to the bundle's mapping by `python -m model.incremental`
+    or add_seed_pairs. They are never rebuilt from the seed pairs here: that would fit the mapping
+    on the pairs bdi.ipynb holds out for testing.
+
+    Raises:
+        RuntimeError: If the file is missing or was not saved for this bundle's mapping and seed pairs.
+    """
+    key = (bundle.version, bundle.checksum)
+    if key not in _mapping_stats:
+        stats_path = bundle_paths(bundle.version)[0].parent / STATS_FILE
+        stats = MappingStatistics.load(stats_path) if stats_path.is_file() else None
+        if stats is None or stats.checksum != bundle.checksum:
+            raise RuntimeError(f"The mapping of bundle {bundle.version} ({bundle.checksum}) has no matching "
+                               f"statistics; run `python -m model.incremental --version {bundle.version}` first")
+        _mapping_stats[key] = stats
+    return _mapping_stats[key]
+
+def keep_original(path):
+    """Copy a file to <name>.orig before it is overwritten for the first time."""
+    original = path.with_name(path.name + ".orig")
+    if path.is_file() and not original.exists():
+        shutil.copy2(path, original)
+    return original
+
+def write_pickle(obj, path):
+    """Pickle an object next to `path` and move it into place, so readers never see a partial file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(obj, file)
+    os.replace(tmp_path, path)
+
+def add_seed_pairs(pairs, persist=True):
+    """
+    Add seed pairs to the live bundle and refresh its mapping without retraining from scratch.
+
+    The new pairs are embedded, folded into the mapping statistics with a rank-k update and the
+    mapping is re-solved; a new bundle with the extended seed dictionary is then swapped in.
 
-def get_translation(word):
-    """Get the top 5 translations for a given word."""
-    if word not in src_embeddings or trained_mapping is None:
-        return None  # Word not found or model not trained
+    The precomputed top-k table of the old bundle keeps answering the corpus words, with the old
+    mapping, until it is rebuilt for the new bundle in a background thread (only when the update
+    is persisted and TOPK_REBUILD is not "0"); the seed translations are always the new ones.
 
-    # Map the source word to the target space
-    word_embedding = src_embeddings[word].reshape(1, -1)
-    mapped_embedding = map_embeddings(word_embedding, trained_mapping)
+    Args:
+        pairs (list): (iskonawa_word, spanish_word) tuples. Pairs already in the bundle are skipped.
+        persist (bool, optional): Whether to append the pairs to the bundle's traintest file and
+            rewrite its mapping and statistics, so a reload keeps them. Defaults to True.
+
+    Returns:
+        dict: Number of pairs added, the new bundle version and checksum, and the update time.
+
+    The first persisted update keeps the mapping it replaces as model.bin.orig (and
+    model_reverse.bin.orig) next to it.
+
+    Raises:
+        RuntimeError: If no model is loaded, the bundle is in reduced mode, or its mapping has no
+            matching statistics (see get_mapping_statistics).
+    """
+    start = time.perf_counter()
+    with _update_lock:
+        bundle = get_live_bundle()
+        if bundle is None:
+            raise RuntimeError("No model is loaded")
+        if bundle.mapping_error is not None:
+            raise RuntimeError(bundle.mapping_error)
+        existing = set(zip(bundle.src_words, bundle.tgt_words))
+        new_pairs = [pair for pair in dict.fromkeys(tuple(pair) for pair in pairs) if pair not in existing]
+        if not new_pairs:
+            return {"added": 0, "version": bundle.version, "checksum": bundle.checksum,
+                    "seconds": time.perf_counter() - start}
+
+        new_src_words = [src for src, _ in new_pairs]
+        new_tgt_words = [tgt for _, tgt in new_pairs]
+        src_embeddings = {**bundle.src_embeddings, **load_embeddings(src_model, new_src_words)}
+        tgt_embeddings = {**bundle.tgt_embeddings, **load_embeddings(tgt_model, new_tgt_words)}
+
+        stats = get_mapping_statistics(bundle).copy()
+        stats.add(np.array([src_embeddings[w] for w in new_src_words]),
+                  np.array([tgt_embeddings[w] for w in new_tgt_words]))
+        dtype = np.asarray(bundle.trained_mapping).dtype
+        trained_mapping = stats.mapping().astype(dtype)
+        reverse_path = reverse_mapping_path(bundle.version)
+        reverse_mapping = stats.reverse_mapping().astype(dtype) if reverse_path is not None else None
+
+        if persist:
+            mapping_path, pairs_path = bundle_paths(bundle.version)
+            with open(pairs_path, 'a', encoding='utf-8') as file:
+                file.writelines(f"{src} - {tgt}\n" for src, tgt in new_pairs)
+            keep_original(mapping_path)
+            write_pickle(trained_mapping, mapping_path)
+            if reverse_path is not None:
+                keep_original(reverse_path)
+                write_pickle(reverse_mapping, reverse_path)
+            checksum = bundle_checksum(*[mapping_path, pairs_path] + ([reverse_path] if reverse_path is not None else []))
+            stats.checksum = checksum
+            stats.save(mapping_path.parent / STATS_FILE)
+        else:
+            checksum = hashlib.sha1(repr((bundle.checksum, new_pairs)).encode("utf-8")).hexdigest()[:12]
+            stats.checksum = checksum
+
+        new_bundle = ModelBundle(version=bundle.version, checksum=checksum,
+                                 src_words=bundle.src_words + new_src_words, tgt_words=bundle.tgt_words + new_tgt_words,
+                                 src_embeddings=src_embeddings, tgt_embeddings=tgt_embeddings,
+                                 trained_mapping=trained_mapping, reverse_mapping=reverse_mapping)
+        _mapping_stats[(new_bundle.version, new_bundle.checksum)] = stats
+        # The new bundle only appends target words, so the old table's candidate indices stay valid
+        table = get_topk_table(bundle)
+        if table is not None:
+            _topk_tables[(new_bundle.version, new_bundle.checksum)] = table
+        swap_bundle(new_bundle)
+
+    if table is not None and persist and REBUILD_TOPK_TABLE:
+        rebuild_topk_table(new_bundle, table)
+    return {"added": len(new_pairs), "version": new_bundle.version, "checksum": new_bundle.checksum,
+            "pairs": stats.n_pairs, "seconds": time.perf_counter() - start}
+
+def get_translation(word, k=5, direction="isc-es"):
+    """Get the top k translations for a given word."""
+    return get_translations([word], k=k, direction=direction)[0]
+
+def get_translations(words, k=5, mode="nn", direction="isc-es"):
+    """
+    Get the top k translations for a batch of words with one matrix product.
+
+    Results are served from `result_cache` when possible; only the missing words are computed.
+    Both directions share the embeddings of the live bundle.
+
+    Args:
+        words (list): Words to translate.
+        k (int): Number of nearest neighbors per word.
+        mode (str): Retrieval mode. Only "nn" (cosine nearest neighbors) is supported.
+        direction (str): "isc-es" (Iskonawa -> Spanish) or "es-isc" (Spanish -> Iskonawa).
+
+    Returns:
+        list: One entry per input word, either None (word not found or model not trained)
+              or a list of (translated_word, similarity) tuples led by the seed translation.
+    """
+    if mode != "nn":
+        raise ValueError(f"Unsupported retrieval mode: {mode}")
+
+    results = [None] * len(words)
+    with using_bundle() as bundle:
+        if bundle is None:
+            return results
+        query_embeddings, query_index, mapping, candidates_normed, candidate_words = bundle.direction(direction)
+        if bundle.mapping_error is not None:
+            # Reduced mode: the mapping does not fit the embeddings, so only the seed translations are served
+            return [[(candidate_words[query_index[word]], 10)] if word in query_index else None for word in words]
+
+        keys = [(word, k, mode, direction, bundle.version, bundle.checksum) for word in words]
+        missing = []
+        found = 0
+
+        # Words of the precomputed table need no embedding or similarity work at all
+        table = get_topk_table(bundle)
+        # get_topk_table only returns tables built for this bundle or carried over from its predecessor
+        if table is not None and table.meta["direction"] == direction and k <= table.k:
+            with stage("topk_table"):
+                for i, word in enumerate(words):
+                    neighbors = table.lookup(word, candidate_words, k)
+                    if neighbors is not None:
+                        seed = [(candidate_words[query_index[word]], 10)] if word in query_index else []
+                        results[i] = seed + neighbors
+                        found += 1
+
+        with stage("cache"):
+            for i, word in enumerate(words):
+                if results[i] is not None or word not in query_index:
+                    continue
+                found += 1
+                cached = result_cache.get(keys[i])
+                if cached is None:
+                    missing.append(i)
+                else:
+                    results[i] = cached
+        count_lookups(found, len(words) - found)
+        if not missing:
+            return results
+
+        with stage("embedding_lookup"):
+            word_embeddings = np.array([query_embeddings[words[i]] for i in missing])
+
+        # Map the words to the other embedding space
+        with stage("map_embeddings"):
+            mapped_embeddings = map_embeddings(word_embeddings, mapping)
+
+        # Find nearest neighbors for the whole batch
+        with stage("nearest_neighbors"):
+            neighbors = batch_nearest_neighbors(mapped_embeddings, candidates_normed, candidate_words, k=k)
+
+        for row, i in enumerate(missing):
+            # Add the seed translation to the result: seed pairs are aligned, so the
+            # partner of query word n is candidate word n in either direction
+            index = query_index[words[i]]
+            results[i] = [(candidate_words[index], 10)] + neighbors[row]
+            result_cache.put(keys[i], results[i])
+
+    return results
 
-    # Generate a random 100-dimensional vector for the mapped embedding
-    mapped_embedding = np.random.rand(1, 100)
+def get_topk_table(bundle):
+    """
+    Return the precomputed translation table of a bundle, or None if it has none.
+
+    After add_seed_pairs this is the table of the previous bundle until the rebuild finishes.
+    """
+    key = (bundle.version, bundle.checksum)
+    if key not in _topk_tables:
+        _topk_tables[key] = load_table(bundle) if USE_TOPK_TABLE else None
+    return _topk_tables[key]
+
+def rebuild_topk_table(bundle, old_table):
+    """
+    Recompute the top-k table of a bundle, over the vocabulary of its old table, in a background thread.
+
+    The new table replaces the old one on disk and, if the bundle is still live, in memory.
+    Rebuilds run one at a time and are skipped when a newer bundle went live in the meantime
+    (its own rebuild follows).
 
-    # Find nearest neighbors
-    all_tgt_embeds = np.array([tgt_embeddings[w] for w in tgt_words])
-    neighbors = nearest_neighbors(mapped_embedding, all_tgt_embeds, tgt_words, k=5)
+    Args:
+        bundle (ModelBundle): The bundle to compute the table for.
+        old_table (TopKTable): The table being replaced.
 
-    # Add the actual tgt word to the result. 
-    index = src_words.index(word)
+    Returns:
+        threading.Thread: The rebuild thread.
+    """
+    def run():
+        with _topk_rebuild_lock:
+            if get_live_bundle() is not bundle:
+                return
+            build_table(bundle, old_table.vocabulary(), lambda words: get_word_embeddings(words, src_model),
+                        table_folder(bundle.version), k=old_table.k)
+            table = load_table(bundle)
+            if table is not None and get_live_bundle() is bundle:
+                _topk_tables[(bundle.version, bundle.checksum)] = table
+
+    thread = threading.Thread(target=run, name="topk-rebuild", daemon=True)
+    thread.start()
+    return thread
+
+def get_fuzzy_index(bundle, direction="isc-es"):
+    """Return the fuzzy index over the query vocabulary of a bundle, building it on first use."""
+    key = (bundle.version, bundle.checksum, direction)
+    index = _fuzzy_indexes.get(key)
+    if index is None:
+        _, query_index, _, _, _ = bundle.direction(direction)
+        index = _fuzzy_indexes[key] = FuzzyIndex(query_index, max_distance=FUZZY_MAX_DISTANCE)
+    return index
+
+def resolve_word(word, direction="isc-es", policy=None):
+    """
+    Match a query against the vocabulary, tolerating accent, case and small spelling differences.
+
+    Args:
+        word (str): The query.
+        direction (str): Translation direction, which selects the vocabulary.
+        policy (str, optional): "autocorrect", "suggest" or "off". Defaults to FUZZY_POLICY.
 
-    return [(tgt_words[index], 10)] + neighbors
+    Returns:
+        tuple: (word to translate or None, list of suggested vocabulary words). The query itself is
+               returned when it is already in the vocabulary, and its vocabulary form when it only
+               differs in accents or case (under every policy but "off").
+    """
+    with using_bundle() as bundle:
+        if bundle is None:
+            return None, []
+        _, query_index, _, _, _ = bundle.direction(direction)
+        if word in query_index:
+            return word, []
+        with stage("fuzzy_lookup"):
+            return get_fuzzy_index(bundle, direction).correct(word, policy or FUZZY_POLICY)
 
 def map_embeddings(X_src, mapping_matrix):
     """
@@ -174,11 +558,33 @@ def nearest_neighbors(mapped_src_embed, tgt_embeds, tgt_words, k=3):
     Returns:
         list: List of (target_word, similarity) tuples.
     """
-    # Compute cosine similarity between source and target embeddings
-    similarities = cosine_similarity(mapped_src_embed, tgt_embeds)  # Shape: (1, n_target_words)
-    
-    # Get the indices of the top-k similarities
-    top_k_indices = np.argsort(similarities[0])[-k:][::-1]
-    neighbors = [(tgt_words[idx], similarities[0][idx]) for idx in top_k_indices]
-    
-    return neighbors
+    return batch_nearest_neighbors(np.atleast_2d(mapped_src_embed), normalize_rows(tgt_embeds), tgt_words, k=k)[0]
+
+def batch_nearest_neighbors(mapped_src_embeds, tgt_embeds_normed, tgt_words, k=3):
+    """
+    Find the nearest neighbors in the target space for a batch of mapped source embeddings.
+
+    Args:
+        mapped_src_embeds (np.ndarray): Source embeddings mapped to the target space.
+                                        Shape: (n_source_words, target_dim).
+        tgt_embeds_normed (np.ndarray): Target embeddings with unit-length rows. Shape: (n_target_words, target_dim).
+        tgt_words (list): List of all target words corresponding to the target embeddings.
+        k (int): Number of nearest neighbors to retrieve.
+
+    Returns:
+        list: For each source embedding, a list of (target_word, similarity) tuples.
+    """
+    k = min(k, len(tgt_words))
+    norms = np.linalg.norm(mapped_src_embeds, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    similarities = (mapped_src_embeds / norms) @ tgt_embeds_normed.T  # Shape: (n_source_words, n_target_words)
+
+    # Select the top-k per row without sorting the whole row, then order them
+    top_k = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(similarities, top_k, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    top_k = np.take_along_axis(top_k, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+    return [[(tgt_words[idx], float(score)) for idx, score in zip(row_idx, row_scores)]
+            for row_idx, row_scores in zip(top_k, top_scores)]
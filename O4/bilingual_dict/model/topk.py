@@ -0,0 +1,272 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from model.bundle import bundle_paths, normalize_rows
+
+THIS_FOLDER = Path(__file__).parent.resolve()
+DEFAULT_CORPUS_FILE = THIS_FOLDER.parents[2] / "O2" / "R4" / "corpus_monolingue.json"
+TABLE_FOLDER = "topk"       # Next to the mapping of every bundle version
+TABLE_DIRECTION = "isc-es"  # The source vocabulary is the finite side
+
+
+def word_key(word):
+    """64-bit key of a word, stable across processes (unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def table_folder(version=None):
+    """Folder of the precomputed table of a bundle version."""
+    mapping_path, _ = bundle_paths(version)
+    return mapping_path.parent / TABLE_FOLDER
+
+
+def tokenize(text):
+    """Words of a text, lowercased and without punctuation as Corpus.clean leaves them."""
+    text = re.sub(r'\bininteligible\b', '', (text or "").lower())
+    return re.sub(r'[^\w\s]', '', text).split()
+
+
+def top_k_rows(embeddings, mapping, candidates_normed, k):
+    """
+    Map a block of embeddings and select their k most similar candidates.
+
+    Args:
+        embeddings (np.ndarray): Query embeddings of shape (n, src_dim).
+        mapping (np.ndarray): Mapping matrix of shape (src_dim, tgt_dim).
+        candidates_normed (np.ndarray): Candidate embeddings with unit-length rows.
+        k (int): Number of candidates per row.
+
+    Returns:
+        tuple: (ids, scores), both of shape (n, k), best first.
+    """
+    mapped = normalize_rows(np.asarray(embeddings) @ mapping)
+    similarities = mapped @ candidates_normed.T
+    top_k = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(similarities, top_k, axis=1)
+    best = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(top_k, best, axis=1), np.take_along_axis(top_scores, best, axis=1)
+
+
+def corpus_vocabulary(file_path=DEFAULT_CORPUS_FILE, text_column="transcription"):
+    """
+    Word types of a JSON Lines corpus, lowercased and without punctuation as Corpus.clean leaves them.
+
+    Args:
+        file_path (str or Path, optional): Corpus file. Defaults to O2/R4/corpus_monolingue.json.
+        text_column (str, optional): Column with the Iskonawa text. Defaults to "transcription".
+
+    Returns:
+        list: Distinct words, in order of first appearance.
+    """
+    words = {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            for word in tokenize(json.loads(line).get(text_column)):
+                words.setdefault(word, None)
+    return list(words)
+
+
+def build_table(bundle, vocabulary, embed, folder, k=10, chunk_size=2048, workers=None):
+    """
+    Translate a whole source vocabulary offline and write the top-k table to disk.
+
+    The vocabulary is sorted by word_key, split into chunks and translated by a thread pool (the
+    matrix products and top-k selections release the GIL). Every chunk writes its rows straight
+    into memory-mapped arrays, so the table never has to fit in memory twice.
+
+    Files written to `folder`:
+
+        keys.npy      uint64 word keys, sorted, for binary search.
+        offsets.npy   int64 offsets of each word in words.bin (n + 1 entries).
+        words.bin     UTF-8 words in key order, to confirm a match.
+        ids.npy       int32 (n, k) candidate indices into the bundle's target words, best first.
+        scores.npy    float32 (n, k) cosine similarities.
+        meta.json     Bundle version and checksum, direction and k.
+
+    Args:
+        bundle (ModelBundle): The bundle whose mapping and target words are used.
+        vocabulary (list): Source words.
+        embed (callable): Function from a list of words to their embedding matrix.
+        folder (str or Path): Output folder, replaced if it exists.
+        k (int, optional): Neighbours per word. Defaults to 10.
+        chunk_size (int, optional): Words per matrix block. Defaults to 2048.
+        workers (int, optional): Threads. Defaults to the number of CPUs.
+
+    Returns:
+        int: Number of words in the table.
+    """
+    _, _, mapping, candidates_normed, candidate_words = bundle.direction(TABLE_DIRECTION)
+    k = min(k, len(candidate_words))
+
+    vocabulary = list(dict.fromkeys(vocabulary))
+    keys = np.array([word_key(word) for word in vocabulary], dtype=np.uint64)
+    order = np.argsort(keys, kind="stable")
+    vocabulary = [vocabulary[i] for i in order]
+    keys = keys[order]
+
+    folder = Path(folder)
+    tmp_folder = folder.with_name(folder.name + ".tmp")
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    tmp_folder.mkdir(parents=True)
+
+    encoded = [word.encode("utf-8") for word in vocabulary]
+    np.save(tmp_folder / "keys.npy", keys)
+    np.save(tmp_folder / "offsets.npy", np.concatenate([[0], np.cumsum([len(w) for w in encoded])]).astype(np.int64))
+    with open(tmp_folder / "words.bin", "wb") as f:
+        f.write(b"".join(encoded))
+
+    ids = np.lib.format.open_memmap(tmp_folder / "ids.npy", mode="w+", dtype=np.int32, shape=(len(vocabulary), k))
+    scores = np.lib.format.open_memmap(tmp_folder / "scores.npy", mode="w+", dtype=np.float32, shape=(len(vocabulary), k))
+
+    def run(start):
+        words = vocabulary[start:start + chunk_size]
+        ids[start:start + len(words)], scores[start:start + len(words)] = top_k_rows(embed(words), mapping,
+                                                                                     candidates_normed, k)
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        list(executor.map(run, range(0, len(vocabulary), chunk_size)))
+    ids.flush()
+    scores.flush()
+    del ids, scores
+
+    with open(tmp_folder / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"version": bundle.version, "checksum": bundle.checksum, "direction": TABLE_DIRECTION,
+                   "k": k, "words": len(vocabulary)}, f)
+
+    shutil.rmtree(folder, ignore_errors=True)
+    os.replace(tmp_folder, folder)
+    return len(vocabulary)
+
+
+class TopKTable:
+    """
+    Read-only, memory-mapped table of precomputed translations written by build_table.
+
+    Attributes:
+        folder (Path): Table folder.
+        meta (dict): Bundle version and checksum, direction and k.
+        keys (np.memmap): Sorted word keys.
+        offsets (np.memmap): Offsets of the words in `words`.
+        words (np.memmap): UTF-8 words in key order.
+        ids (np.memmap): Candidate indices, shape (n, k).
+        scores (np.memmap): Similarities, shape (n, k).
+    """
+
+    def __init__(self, folder):
+        """
+        Opens a TopKTable.
+
+        Args:
+            folder (str or Path): Table folder.
+
+        Raises:
+            FileNotFoundError: If the table does not exist.
+        """
+        self.folder = Path(folder)
+        meta_path = self.folder / "meta.json"
+        if not meta_path.is_file():
+            raise FileNotFoundError(f"Missing top-k table: {meta_path}")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.keys = np.load(self.folder / "keys.npy", mmap_mode="r")
+        self.offsets = np.load(self.folder / "offsets.npy", mmap_mode="r")
+        self.words = np.memmap(self.folder / "words.bin", dtype=np.uint8, mode="r") if self.offsets[-1] else b""
+        self.ids = np.load(self.folder / "ids.npy", mmap_mode="r")
+        self.scores = np.load(self.folder / "scores.npy", mmap_mode="r")
+
+    @property
+    def k(self):
+        return self.meta["k"]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def matches(self, bundle, direction=TABLE_DIRECTION):
+        """Whether the table was computed from this bundle, for this direction."""
+        return (direction == self.meta["direction"] and bundle.version == self.meta["version"]
+                and bundle.checksum == self.meta["checksum"])
+
+    def vocabulary(self):
+        """Words of the table, in key order."""
+        data = bytes(self.words)
+        return [data[start:end].decode("utf-8") for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def row(self, word):
+        """
+        Binary-search the row of a word.
+
+        Args:
+            word (str): Source word.
+
+        Returns:
+            int: Row index, or None if the word is not in the table.
+        """
+        key = np.uint64(word_key(word))
+        encoded = word.encode("utf-8")
+        row = int(np.searchsorted(self.keys, key))
+        # Words sharing a 64-bit key (practically never) sit next to each other
+        while row < len(self.keys) and self.keys[row] == key:
+            if bytes(self.words[self.offsets[row]:self.offsets[row + 1]]) == encoded:
+                return row
+            row += 1
+        return None
+
+    def lookup(self, word, candidate_words, k=5):
+        """
+        Precomputed top-k translations of a word.
+
+        Args:
+            word (str): Source word.
+            candidate_words (list): Target words of the bundle the table was computed from.
+            k (int, optional): Number of translations, at most the table's k. Defaults to 5.
+
+        Returns:
+            list: (translated_word, similarity) tuples, or None if the word is not in the table.
+        """
+        row = self.row(word)
+        if row is None:
+            return None
+        return [(candidate_words[i], float(s)) for i, s in zip(self.ids[row, :k], self.scores[row, :k])]
+
+
+def load_table(bundle):
+    """
+    Open the precomputed table of a bundle, if it has one that matches it.
+
+    Args:
+        bundle (ModelBundle): The bundle.
+
+    Returns:
+        TopKTable: The table, or None if it is missing or was computed from other files.
+    """
+    try:
+        table = TopKTable(table_folder(bundle.version))
+    except FileNotFoundError:
+        return None
+    return table if table.matches(bundle) else None
+
+
+if __name__ == "__main__":
+    from model import model
+
+    parser = argparse.ArgumentParser(description="Precompute the top-k translations of the Iskonawa corpus vocabulary.")
+    parser.add_argument("--version", help="Bundle version (default: base)")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS_FILE), help="JSON Lines corpus with the source vocabulary")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per word")
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    bundle = model.build_bundle(args.version)
+    vocabulary = bundle.src_words + corpus_vocabulary(args.corpus)
+    total = build_table(bundle, vocabulary, lambda words: model.get_word_embeddings(words, model.src_model),
+                        table_folder(args.version), k=args.k, chunk_size=args.chunk_size, workers=args.workers)
+    print(f"Wrote {total} words x {args.k} translations to {table_folder(args.version)}")
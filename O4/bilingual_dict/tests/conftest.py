@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app modules are imported from O4/bilingual_dict (from model.x import ..., import importtime)
+sys.path.insert(0, str(Path(__file__).parents[1]))
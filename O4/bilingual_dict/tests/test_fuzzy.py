@@ -0,0 +1,16 @@
+import pytest
+
+from model.fuzzy import FuzzyIndex
+
+
+@pytest.mark.parametrize("policy", ["autocorrect", "suggest"])
+def test_accent_and_case_variants_are_resolved(policy):
+    index = FuzzyIndex(["ahón", "ahan", "bata"])
+    assert index.correct("AHON", policy)[0] == "ahón"
+
+
+def test_suggest_holds_back_edits():
+    index = FuzzyIndex(["ahón", "ahan", "bata"])
+    assert index.correct("baat", "suggest") == (None, ["bata"])
+    assert index.correct("baat", "autocorrect") == ("bata", ["bata"])
+    assert index.correct("AHON", "off") == (None, [])
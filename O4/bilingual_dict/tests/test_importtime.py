@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from importtime import BUDGETS, measure
+
+# Multiplies every budget, like importtime.py --scale (slow machines, CI)
+SCALE = float(os.environ.get("IMPORTTIME_SCALE", 1.0))
+
+
+@pytest.mark.parametrize("module", list(BUDGETS))
+def test_import_budget(module):
+    budget, forbidden = BUDGETS[module]
+    elapsed, loaded = measure(module)
+    heavy = [name for name in forbidden if name in loaded]
+    assert elapsed is not None, f"{module} does not appear in the -X importtime output"
+    assert elapsed <= budget * SCALE, f"{module} took {elapsed:.0f} ms to import (budget {budget * SCALE:.0f} ms)"
+    assert not heavy, f"{module} imports {', '.join(heavy)}"
@@ -0,0 +1,29 @@
+from model.lexicon import Lexicon, build_lexicon, dictionary_translation, read_toolbox
+
+TOOLBOX = """\\lx ahón (1)
+\\ps s
+\\sn 1
+\\gn primero
+\\dn def uno
+\\sn 2
+\\gn segundo
+\\dn def dos
+\\lx bata
+\\rn dulce
+"""
+
+
+def test_every_sense_is_searchable(tmp_path):
+    toolbox = tmp_path / "diccionario.txt"
+    toolbox.write_text(TOOLBOX, encoding="utf-8")
+    entries = list(read_toolbox(toolbox))
+    # The single-valued columns keep the first sense, like the original parse_txt
+    assert (entries[0]["gloss_es"], entries[0]["def_es"]) == ("primero", "def uno")
+    assert [sense["gloss_es"] for sense in entries[0]["senses"]] == ["primero", "segundo"]
+
+    build_lexicon(entries, tmp_path / "lexicon.sqlite")
+    lexicon = Lexicon(tmp_path / "lexicon.sqlite")
+    assert [entry["headword"] for entry in lexicon.lookup_gloss("segundo")] == ["ahón"]
+    assert [entry["headword"] for entry in lexicon.search_definitions("dos")] == ["ahón"]
+    assert dictionary_translation(lexicon.lookup("AHON")) == [("primero", 10), ("segundo", 10)]
+    assert dictionary_translation(lexicon.translate("dulce", "es-isc"), "es-isc") == [("bata", 10)]